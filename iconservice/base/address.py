@@ -31,6 +31,22 @@ ICON_CONTRACT_ADDRESS_BYTES_SIZE = 21
 ICON_ADDRESS_BYTES_SIZE = 21
 ICON_ADDRESS_BODY_SIZE = 20
 
+# The maximum number of the addresses interned by Address.from_string() and Address.from_bytes()
+MAX_INTERNED_ADDRESSES = 100_000
+# str or bytes: Address
+_interned_addresses = {}
+
+
+def _intern_address(key: (str, bytes), address: 'Address') -> 'Address':
+    """Keeps an address created from a given key to share it with the next ones created from the same key
+
+    The table is cleared when it is full. It is enough to share the addresses repeated in a block.
+    """
+    if len(_interned_addresses) >= MAX_INTERNED_ADDRESSES:
+        _interned_addresses.clear()
+    _interned_addresses[key] = address
+    return address
+
 
 def is_icon_address_valid(address: str) -> bool:
     """Check whether address is in icon address format or not
@@ -90,7 +106,10 @@ class AddressPrefix(IntEnum):
 
 class Address(object):
     """Address class
+
+    An address is immutable, so its hash, bytes and str are cached on the first use.
     """
+    __slots__ = ('__prefix', '__body', '__hash', '__bytes', '__str')
 
     def __init__(self,
                  address_prefix: AddressPrefix,
@@ -112,6 +131,9 @@ class Address(object):
 
         self.__prefix = address_prefix
         self.__body = address_body
+        self.__hash = None
+        self.__bytes = None
+        self.__str = None
 
     @property
     def prefix(self) -> AddressPrefix:
@@ -135,9 +157,10 @@ class Address(object):
         :return: bool
         """
         return \
-            isinstance(other, Address) \
-            and self.__prefix == other.prefix \
-            and self.__body == other.body
+            self is other \
+            or isinstance(other, Address) \
+            and self.__body == other.__body \
+            and self.__prefix == other.__prefix
 
     def __ne__(self, other) -> bool:
         """operator != overriding
@@ -153,14 +176,18 @@ class Address(object):
 
         :return: (str) 42-char address
         """
-        return f'{str(self.prefix)}{self.body.hex()}'
+        if self.__str is None:
+            self.__str = f'{str(self.__prefix)}{self.__body.hex()}'
+        return self.__str
 
     def __hash__(self) -> int:
         """Returns a hash value for this object
 
         :return: hash value
         """
-        return hash(self.__prefix.to_bytes(1, DATA_BYTE_ORDER) + self.__body)
+        if self.__hash is None:
+            self.__hash = hash(self.__prefix.to_bytes(1, DATA_BYTE_ORDER) + self.__body)
+        return self.__hash
 
     @property
     def is_contract(self) -> bool:
@@ -179,6 +206,10 @@ class Address(object):
         :return: :class:`.Address`
         """
 
+        interned_address = _interned_addresses.get(address)
+        if interned_address is not None:
+            return interned_address
+
         if not is_icon_address_valid(address):
             raise InvalidParamsException('Invalid address')
 
@@ -187,7 +218,7 @@ class Address(object):
         address_prefix = AddressPrefix.from_string(prefix)
         address_body = bytes.fromhex(body)
 
-        return Address(address_prefix, address_body)
+        return _intern_address(address, Address(address_prefix, address_body))
 
     @staticmethod
     def from_data(prefix: AddressPrefix, data: bytes):
@@ -208,15 +239,20 @@ class Address(object):
         :param buf: :class:`.bytes` bytes data including Address information
         :return: :class:`.Address`
         """
+        interned_address = _interned_addresses.get(buf)
+        if interned_address is not None:
+            return interned_address
+
         buf_size = len(buf)
 
         prefix = AddressPrefix.EOA
+        body = buf
         if buf_size != ICON_EOA_ADDRESS_BYTES_SIZE:
             prefix_byte = buf[0:1]
             prefix_int = int.from_bytes(prefix_byte, DATA_BYTE_ORDER)
             prefix = AddressPrefix(prefix_int)
-            buf = buf[1:]
-        return Address(prefix, buf)
+            body = buf[1:]
+        return _intern_address(buf, Address(prefix, body))
 
     def to_bytes(self) -> bytes:
         """
@@ -224,13 +260,14 @@ class Address(object):
 
         :return: :class:`.bytes` data including information of Address object
         """
-        body_bytes = self.body
-        if self.prefix != AddressPrefix.EOA:
-            prefix_byte = self.prefix.value.to_bytes(1, DATA_BYTE_ORDER)
-            address_bytes = prefix_byte + body_bytes
-        else:
-            address_bytes = body_bytes
-        return address_bytes
+        if self.__bytes is None:
+            body_bytes = self.__body
+            if self.__prefix != AddressPrefix.EOA:
+                prefix_byte = self.__prefix.value.to_bytes(1, DATA_BYTE_ORDER)
+                self.__bytes = prefix_byte + body_bytes
+            else:
+                self.__bytes = body_bytes
+        return self.__bytes
 
     @staticmethod
     def from_prefix_and_int(prefix: 'AddressPrefix', num: int):
@@ -244,6 +281,8 @@ class Address(object):
 class MalformedAddress(Address):
     """This class only exists to support an invalid format address which was created by legacy bug
     """
+    __slots__ = ()
+
     def __init__(self,
                  address_prefix: AddressPrefix,
                  address_body: bytes) -> None:
@@ -14,7 +14,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from copy import deepcopy
 from typing import Union, Any, get_type_hints
 
 from iconservice.base.type_converter_templates import ParamType, \
@@ -26,109 +25,376 @@ from ..utils import get_main_type_from_annotations_type
 score_base_support_type = (int, str, bytes, bool, Address)
 
 
+class LazyParams(dict):
+    """Params whose values are converted on the first access
+
+    The params are kept as they are until any of their values is accessed.
+    Then all the values including the nested ones are converted at once,
+    so a transaction in a block is converted when it is executed.
+    dict(), ** and json.dumps() read the values stored only, so call resolve() before them.
+    Only the items of a list such as the transactions become LazyParams
+    and the values in them are plain dicts and lists.
+    """
+    __slots__ = ('_params', '_convert', '_template')
+
+    def __init__(self, params: dict, convert: callable, template: dict) -> None:
+        super().__init__()
+        # params not converted yet
+        self._params = params
+        self._convert = convert
+        self._template = template
+
+    def _load(self) -> None:
+        if self._params is not None:
+            dict.update(self, self._convert(self._params))
+            self._params = None
+
+    def resolve(self) -> None:
+        """Converts all the values
+        """
+        self._load()
+
+    def peek(self, keys: tuple, convert: bool = True) -> Any:
+        """Returns the value at the path of keys converted alone
+
+        The other values are left as they are until the first access.
+
+        :param keys: path to the value e.g. ('params', 'txHash')
+        :param convert: if False, the value is returned as it is in the params not converted yet
+        :return: None if there is no value at the path
+        """
+        if self._params is None:
+            return TypeConverter._get_value(self, keys)
+
+        value = self._params
+        template = self._template
+        for i, key in enumerate(keys):
+            if not isinstance(value, dict):
+                return None
+            if not isinstance(template, dict):
+                # The values not in the template are not converted
+                return TypeConverter._get_value(value, keys[i:])
+
+            key_converter: dict = template.get(KEY_CONVERTER)
+            if key_converter is None:
+                raw_key = key
+            elif key in key_converter:
+                # The old keys are replaced with the new ones
+                return None
+            else:
+                raw_key = key
+                if key not in value:
+                    for old_key, new_key in key_converter.items():
+                        if new_key == key and old_key in value:
+                            raw_key = old_key
+
+            if raw_key not in value:
+                return None
+            value = value[raw_key]
+            template = template.get(key)
+            if convert and isinstance(template, dict) and CONVERT_USING_SWITCH_KEY in template:
+                self._load()
+                return TypeConverter._get_value(self, keys)
+
+        if not convert or not template:
+            return value
+        if isinstance(template, ValueType):
+            if value is None:
+                TypeConverter._raise_none_value(template)
+            if not isinstance(value, str) and not value:
+                return value
+            return TypeConverter._convert_value(value, template)
+
+        self._load()
+        return TypeConverter._get_value(self, keys)
+
+    def __getitem__(self, key):
+        self._load()
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key, value):
+        self._load()
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._load()
+        dict.__delitem__(self, key)
+
+    def __contains__(self, key):
+        self._load()
+        return dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._load()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._load()
+        return dict.__len__(self)
+
+    def __eq__(self, other):
+        self._load()
+        if isinstance(other, LazyParams):
+            other._load()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self):
+        self._load()
+        return dict.__repr__(self)
+
+    def get(self, key, default=None):
+        self._load()
+        return dict.get(self, key, default)
+
+    def setdefault(self, key, default=None):
+        self._load()
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key, *args):
+        self._load()
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        self._load()
+        return dict.popitem(self)
+
+    def update(self, *args, **kwargs):
+        self._load()
+        dict.update(self, *args, **kwargs)
+
+    def clear(self):
+        self._params = None
+        dict.clear(self)
+
+    def copy(self) -> dict:
+        self._load()
+        return dict.copy(self)
+
+    def keys(self):
+        self._load()
+        return dict.keys(self)
+
+    def values(self):
+        self._load()
+        return dict.values(self)
+
+    def items(self):
+        self._load()
+        return dict.items(self)
+
+
 class TypeConverter:
+    # (ParamType, lazy): converter compiled from the template
+    _converters = {}
+
     @staticmethod
-    def convert(params: dict, param_type: ParamType) -> Any:
+    def convert(params: dict, param_type: ParamType, lazy: bool = False) -> Any:
+        """Converts the values of params according to the template of param_type
+
+        params are not modified. The values which are not converted by the template
+        such as ValueType.LATER are shared with the result.
+
+        :param params: params whose values are strings
+        :param param_type: type of the template
+        :param lazy: if True, the dicts in the lists of params such as the transactions
+            are converted to LazyParams whose values are converted on the first access
+        :return: params converted
+        """
         if param_type is None:
             return params
 
-        copied_params = deepcopy(params)  # to avoid corrupting original data
-        converted_params = TypeConverter._convert(copied_params, type_convert_templates[param_type])
-        return converted_params
+        converter = TypeConverter._converters.get((param_type, lazy))
+        if converter is None:
+            converter = TypeConverter._compile(type_convert_templates[param_type], {}, lazy)
+            TypeConverter._converters[(param_type, lazy)] = converter
 
-    @staticmethod
-    def _convert(params: Union[str, dict, None], template: Union[list, dict, ValueType]) -> Any:
-        if TypeConverter._skip_params(params, template):
-            return params
+        return converter(params)
 
-        if isinstance(template, dict) and KEY_CONVERTER in template:
-            params = TypeConverter._convert_key(params, template[KEY_CONVERTER])
+    @staticmethod
+    def resolve(params: Any) -> None:
+        """Converts the values of the LazyParams in params which have not been accessed yet
 
-        if isinstance(params, dict) and isinstance(template, dict):
-            new_params = {}
-            for key, value in params.items():
-                if TypeConverter._check_convert_using_method(key, template):
-                    ref_key_table = deepcopy(new_params)
-                    target_template = TypeConverter._get_convert_using_method_template(key, template)
-                    new_value = TypeConverter._convert_using_switch(value, ref_key_table, target_template)
-                else:
-                    new_value = TypeConverter._convert(value, template.get(key))
-                new_params[key] = new_value
-        elif isinstance(params, list) and isinstance(template, list):
-            new_params = []
+        :param params: params converted by convert()
+        """
+        if isinstance(params, LazyParams):
+            params.resolve()
+        elif isinstance(params, dict):
+            for value in params.values():
+                TypeConverter.resolve(value)
+        elif isinstance(params, list):
             for item in params:
-                new_item = TypeConverter._convert(item, template[0])
-                new_params.append(new_item)
-        elif isinstance(template, ValueType):
-            new_params = TypeConverter._convert_value(params, template)
-        else:
-            new_params = params
-
-        return new_params
+                TypeConverter.resolve(item)
 
     @staticmethod
-    def _convert_key(params, key_convert_dict):
-        new_params = {}
-        for key in params:
-            if key in key_convert_dict:
-                old_key = key
-                new_key = key_convert_dict[old_key]
-                new_params[new_key] = params[old_key]
-            else:
-                new_params[key] = params[key]
+    def peek(params: Any, *keys: str, convert: bool = True) -> Any:
+        """Returns the value in params at the path of keys
+
+        If params is a LazyParams which has not been accessed yet, the value is converted alone
+        and the other values are left for the first access.
 
-        return new_params
+        :param params: params converted by convert()
+        :param keys: path to the value e.g. 'params', 'txHash'
+        :param convert: if False, the value of a LazyParams not accessed yet is returned not converted
+        :return: None if there is no value at the path
+        """
+        if isinstance(params, LazyParams):
+            return params.peek(keys, convert)
+        return TypeConverter._get_value(params, keys)
 
     @staticmethod
-    def _check_convert_using_method(param: str, template: dict) -> bool:
-        params = template.get(param)
-        if isinstance(params, dict):
-            return CONVERT_USING_SWITCH_KEY in params
-        return False
+    def _get_value(params: Any, keys: tuple) -> Any:
+        for key in keys:
+            if not isinstance(params, dict):
+                return None
+            params = params.get(key)
+        return params
 
     @staticmethod
-    def _get_convert_using_method_template(key: str, template: dict) -> dict:
-        tmp_params = template.get(key)
-        return tmp_params.get(CONVERT_USING_SWITCH_KEY)
+    def _compile(template: Union[list, dict, ValueType, None], compiled: dict, lazy: bool = False) -> callable:
+        """Compiles a template into a function which converts params
+
+        :param template: template to compile
+        :param compiled: (id of template, lazy): converter compiled already.
+            The templates shared by other templates are compiled once.
+        :param lazy: if True, the dicts in the lists are converted to LazyParams
+        :return: converter(params) -> converted params
+        """
+        converter = compiled.get((id(template), lazy))
+        if converter is not None:
+            return converter
+
+        if not template:
+            # params are not converted
+            converter = TypeConverter._compile_skip(template)
+        elif isinstance(template, dict):
+            converter = TypeConverter._compile_dict(template, compiled, lazy)
+        elif isinstance(template, list):
+            converter = TypeConverter._compile_list(template, compiled, lazy)
+        elif isinstance(template, ValueType):
+            converter = TypeConverter._compile_value(template)
+        else:
+            converter = TypeConverter._compile_skip(template)
+
+        compiled[(id(template), lazy)] = converter
+        return converter
 
     @staticmethod
-    def _skip_params(params: Union[str, dict, None], template: Union[list, dict, ValueType]) -> bool:
-        if params is None:
-            raise InvalidParamsException(f'TypeConvert Exception None value, template: {str(template)}')
-        if isinstance(params, str):
-            if params != "" and not template:
-                return True
-        elif not params or not template:
-            return True
-        return False
-    
+    def _raise_none_value(template: Any) -> None:
+        raise InvalidParamsException(f'TypeConvert Exception None value, template: {str(template)}')
+
     @staticmethod
-    def _convert_using_switch(params: Union[str, dict, None],
-                              tmp_params: dict,
-                              template: Union[list, dict, ValueType]) -> Any:
-        if TypeConverter._skip_params(params, template):
+    def _compile_skip(template: Any) -> callable:
+        def convert(params: Any) -> Any:
+            if params is None:
+                TypeConverter._raise_none_value(template)
             return params
 
-        switch_key = template.get(SWITCH_KEY)
-        template_key = tmp_params.get(switch_key)
-        target_template = template.get(template_key)
+        return convert
+
+    @staticmethod
+    def _compile_dict(template: dict, compiled: dict, lazy: bool) -> callable:
+        key_converter: dict = template.get(KEY_CONVERTER, {})
+        # key: converter(value)
+        converters = {}
+        # key: converter(value, the values converted before it)
+        switch_converters = {}
+        for key, value_template in template.items():
+            if key == KEY_CONVERTER:
+                continue
+            if isinstance(value_template, dict) and CONVERT_USING_SWITCH_KEY in value_template:
+                switch_converters[key] = \
+                    TypeConverter._compile_switch(value_template[CONVERT_USING_SWITCH_KEY], compiled, lazy)
+            else:
+                converters[key] = TypeConverter._compile(value_template, compiled, lazy)
+        convert_unknown = TypeConverter._compile(None, compiled, lazy)
+
+        def convert(params: Any) -> Any:
+            if params is None:
+                TypeConverter._raise_none_value(template)
+            if not isinstance(params, dict) or not params:
+                return params
 
-        if isinstance(params, dict) and isinstance(target_template, dict):
             new_params = {}
             for key, value in params.items():
-                new_value = TypeConverter._convert(value, target_template.get(key))
-                new_params[key] = new_value
-        elif isinstance(params, list) and isinstance(target_template, list):
-            new_params = []
-            for item in params:
-                new_item = TypeConverter._convert(item, target_template[0])
-                new_params.append(new_item)
-        elif isinstance(target_template, ValueType):
-            new_params = TypeConverter._convert_value(params, target_template)
-        else:
-            new_params = params
+                key = key_converter.get(key, key)
+                switch_converter = switch_converters.get(key)
+                if switch_converter is None:
+                    new_params[key] = converters.get(key, convert_unknown)(value)
+                else:
+                    new_params[key] = switch_converter(value, new_params)
+            return new_params
+
+        return convert
+
+    @staticmethod
+    def _compile_list(template: list, compiled: dict, lazy: bool) -> callable:
+        item_template = template[0]
+        # The values in an item are converted at once on the first access
+        convert_item = TypeConverter._compile(item_template, compiled, False)
+
+        def convert(params: Any) -> Any:
+            if params is None:
+                TypeConverter._raise_none_value(template)
+            if not isinstance(params, list):
+                return params
+
+            return [convert_item(item) for item in params]
+
+        def convert_lazily(params: Any) -> Any:
+            if params is None:
+                TypeConverter._raise_none_value(template)
+            if not isinstance(params, list):
+                return params
+
+            return [LazyParams(item, convert_item, item_template) if isinstance(item, dict) and item
+                    else convert_item(item) for item in params]
 
-        return new_params
+        if lazy and isinstance(item_template, dict):
+            return convert_lazily
+
+        return convert
+
+    @staticmethod
+    def _compile_value(value_type: ValueType) -> callable:
+        def convert(params: Any) -> Any:
+            if params is None:
+                TypeConverter._raise_none_value(value_type)
+            if not isinstance(params, str) and not params:
+                return params
+
+            return TypeConverter._convert_value(params, value_type)
+
+        return convert
+
+    @staticmethod
+    def _compile_switch(template: dict, compiled: dict, lazy: bool) -> callable:
+        """Compiles a template whose value template is chosen by the value of another key
+
+        :param template: {SWITCH_KEY: key to refer, value of the key: value template, ...}
+        :param compiled: (id of template, lazy): converter compiled already
+        :param lazy: if True, the dicts in the lists are converted to LazyParams
+        :return: converter(value, the values converted before it) -> converted value
+        """
+        switch_key: str = template.get(SWITCH_KEY)
+        converters = {key: TypeConverter._compile(value_template, compiled, lazy)
+                      for key, value_template in template.items() if key != SWITCH_KEY}
+
+        def convert(params: Any, converted_params: dict) -> Any:
+            if params is None:
+                TypeConverter._raise_none_value(template)
+            if not isinstance(params, str) and not params:
+                return params
+
+            converter = converters.get(converted_params.get(switch_key))
+            if converter is None:
+                return params
+            return converter(params)
+
+        return convert
 
     @staticmethod
     def _convert_value(value: Any, value_type: ValueType) -> Any:
@@ -27,6 +27,7 @@ class ParamType(IntEnum):
     TRANSACTION_PARAMS_DATA = 104
 
     INVOKE = 200
+    BUILD_BLOCK = 201
 
     QUERY = 300
     ICX_CALL = 301
@@ -34,6 +35,7 @@ class ParamType(IntEnum):
     ICX_GET_TOTAL_SUPPLY = 303
     ICX_GET_SCORE_API = 304
     ISE_GET_STATUS = 305
+    ISE_GET_PROOF = 306
 
     WRITE_PRECOMMIT = 400
     REMOVE_PRECOMMIT = 500
@@ -100,14 +102,17 @@ class ConstantKeys:
 
     BLOCK = "block"
     TRANSACTIONS = "transactions"
+    STEP_BUDGET = "stepBudget"
 
     FILTER = "filter"
+    KEY = "key"
 
     ICX_CALL = "icx_call"
     ICX_GET_BALANCE = "icx_getBalance"
     ICX_GET_TOTAL_SUPPLY = "icx_getTotalSupply"
     ICX_GET_SCORE_API = "icx_getScoreApi"
     ISE_GET_STATUS = "ise_getStatus"
+    ISE_GET_PROOF = "ise_getProof"
 
 
 type_convert_templates[ParamType.BLOCK] = {
@@ -176,6 +181,14 @@ type_convert_templates[ParamType.INVOKE] = {
     ]
 }
 
+type_convert_templates[ParamType.BUILD_BLOCK] = {
+    ConstantKeys.BLOCK: type_convert_templates[ParamType.BLOCK],
+    ConstantKeys.TRANSACTIONS: [
+        type_convert_templates[ParamType.INVOKE_TRANSACTION]
+    ],
+    ConstantKeys.STEP_BUDGET: ValueType.INT
+}
+
 type_convert_templates[ParamType.ICX_CALL] = {
     ConstantKeys.VERSION: ValueType.INT,
     ConstantKeys.FROM: ValueType.ADDRESS,
@@ -196,6 +209,11 @@ type_convert_templates[ParamType.ISE_GET_STATUS] = {
     ConstantKeys.FILTER: [ValueType.STRING]
 }
 
+type_convert_templates[ParamType.ISE_GET_PROOF] = {
+    ConstantKeys.ADDRESS: ValueType.ADDRESS,
+    ConstantKeys.KEY: ValueType.BYTES
+}
+
 type_convert_templates[ParamType.QUERY] = {
     ConstantKeys.METHOD: ValueType.STRING,
     ConstantKeys.PARAMS: {
@@ -205,7 +223,8 @@ type_convert_templates[ParamType.QUERY] = {
             ConstantKeys.ICX_GET_BALANCE: type_convert_templates[ParamType.ICX_GET_BALANCE],
             ConstantKeys.ICX_GET_TOTAL_SUPPLY: type_convert_templates[ParamType.ICX_GET_TOTAL_SUPPLY],
             ConstantKeys.ICX_GET_SCORE_API: type_convert_templates[ParamType.ICX_GET_SCORE_API],
-            ConstantKeys.ISE_GET_STATUS: type_convert_templates[ParamType.ISE_GET_STATUS]
+            ConstantKeys.ISE_GET_STATUS: type_convert_templates[ParamType.ISE_GET_STATUS],
+            ConstantKeys.ISE_GET_PROOF: type_convert_templates[ParamType.ISE_GET_PROOF]
         }
     }
 }
@@ -166,8 +166,8 @@ class Governance(IconScoreBase):
     def _fill_status_with_str(db: DictDB):
         count = 0
         status = {}
-        for key in VALID_STATUS_KEYS:
-            value: bytes = db[key]
+        values: list = db.get_many(VALID_STATUS_KEYS)
+        for key, value in zip(VALID_STATUS_KEYS, values):
             if value:
                 if key == STATUS:
                     status[key] = value.decode()
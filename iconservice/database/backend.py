@@ -0,0 +1,712 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Storage backends which KeyValueDatabase runs on
+
+Every backend provides the subset of plyvel.DB interface used by KeyValueDatabase,
+so plyvel.DB itself is used as the LevelDB backend.
+"""
+
+import mmap
+import os
+import struct
+from bisect import bisect_left, insort
+from heapq import merge
+from threading import Lock
+from typing import Optional, Any
+from weakref import WeakSet
+
+import plyvel
+
+from ..base.exception import DatabaseException
+
+
+# entry of a key which is not present
+_ABSENT = object()
+
+
+class StorageBackendType(object):
+    LEVELDB = 'leveldb'
+    MEMORY = 'memory'
+    MMAP = 'mmap'
+
+
+def get_prefix_upper_bound(prefix: bytes) -> Optional[bytes]:
+    """Returns the smallest key which is greater than all keys starting with prefix
+
+    :param prefix:
+    :return: upper bound or None if there is no such key
+    """
+    prefix = prefix.rstrip(b'\xff')
+    if len(prefix) == 0:
+        return None
+
+    return prefix[:-1] + bytes([prefix[-1] + 1])
+
+
+def get_iterator_range(prefix: Optional[bytes],
+                       start: Optional[bytes],
+                       stop: Optional[bytes]) -> tuple:
+    """Narrows the range of an iterator to the keys starting with prefix
+
+    :param prefix: only keys starting with prefix are included
+    :param start: the first key to include (inclusive)
+    :param stop: the key to stop at (exclusive)
+    :return: (start, stop)
+    """
+    if prefix:
+        if start is None or start < prefix:
+            start = prefix
+
+        upper_bound = get_prefix_upper_bound(prefix)
+        if upper_bound is not None and (stop is None or stop > upper_bound):
+            stop = upper_bound
+
+    return start, stop
+
+
+def create_backend(backend_type: str, path: str, create_if_missing: bool = True):
+    """Creates a storage backend
+
+    :param backend_type: one of StorageBackendType
+    :param path: db path. The memory backend ignores it
+    :param create_if_missing:
+    :return: storage backend
+    """
+    if backend_type == StorageBackendType.LEVELDB:
+        return plyvel.DB(path, create_if_missing=create_if_missing)
+    elif backend_type == StorageBackendType.MEMORY:
+        return MemoryBackend()
+    elif backend_type == StorageBackendType.MMAP:
+        return MmapBackend(path, create_if_missing)
+
+    raise DatabaseException(f'Invalid storage backend: {backend_type}')
+
+
+class StorageBackend(object):
+    """An abstract class of storage backend
+    """
+
+    def get(self, key: bytes, default: Optional[bytes] = None) -> Optional[bytes]:
+        raise NotImplementedError()
+
+    def put(self, key: bytes, value: bytes) -> None:
+        self._write({key: value})
+
+    def delete(self, key: bytes) -> None:
+        self._write({key: None})
+
+    def write_batch(self) -> 'WriteBatch':
+        return WriteBatch(self)
+
+    def iterator(self, start: Optional[bytes] = None, stop: Optional[bytes] = None) -> 'Iterator':
+        """Returns an iterator over the states at this moment in key order
+
+        :param start: the first key to include (inclusive)
+        :param stop: the key to stop at (exclusive)
+        """
+        return self.snapshot().iterator(start, stop)
+
+    def snapshot(self) -> 'Snapshot':
+        raise NotImplementedError()
+
+    def prefixed_db(self, prefix: bytes) -> 'PrefixedBackend':
+        return PrefixedBackend(self, prefix)
+
+    def close(self) -> None:
+        pass
+
+    def _write(self, states: dict) -> None:
+        """Writes states atomically
+
+        :param states: key/value pairs. None value means deletion
+        """
+        raise NotImplementedError()
+
+
+class WriteBatch(object):
+    """Collects changes and writes them atomically on exiting the with block
+    """
+
+    def __init__(self, backend: 'StorageBackend') -> None:
+        self._backend = backend
+        self._states = {}
+
+    def put(self, key: bytes, value: bytes) -> None:
+        self._states[key] = value
+
+    def delete(self, key: bytes) -> None:
+        self._states[key] = None
+
+    def clear(self) -> None:
+        self._states.clear()
+
+    def write(self) -> None:
+        if self._states:
+            self._backend._write(self._states)
+            self._states = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.write()
+
+
+class Iterator(object):
+    def __init__(self, items: iter) -> None:
+        self._items = items
+
+    def close(self) -> None:
+        self._items = iter(())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> tuple:
+        return next(self._items)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class Snapshot(object):
+    """Read-only view of an IndexedBackend at a moment
+
+    A snapshot shares the index of its backend instead of copying it.
+    The backend keeps the entries changed after the snapshot is taken in the undo log of the snapshot
+    until it is closed.
+
+    :param backend: backend which the snapshot is taken of
+    :param segment: segment of the backend at the moment
+    """
+
+    def __init__(self, backend: 'IndexedBackend', segment: '_Segment') -> None:
+        self._backend = backend
+        self._segment = segment
+        # key: entry at the moment or _ABSENT
+        self._undo = {}
+
+    def get(self, key: bytes, default: Optional[bytes] = None) -> Optional[bytes]:
+        entry = self._get_entry(key)
+        if entry is _ABSENT:
+            return default
+
+        return self._backend._read_entry(self._segment, entry)
+
+    def iterator(self, start: Optional[bytes] = None, stop: Optional[bytes] = None) -> 'Iterator':
+        keys: list = self._backend._get_snapshot_keys(self, start, stop)
+        return Iterator(self._iterate(keys))
+
+    def close(self) -> None:
+        self._backend._release_snapshot(self)
+        self._undo = {}
+
+    def _get_entry(self, key: bytes) -> Any:
+        # The index is read before the undo log.
+        # The backend puts the old entry to the undo log before changing the index.
+        entry = self._segment.index.get(key, _ABSENT)
+        return self._undo.get(key, entry)
+
+    def _iterate(self, keys: list) -> iter:
+        read_entry = self._backend._read_entry
+        segment = self._segment
+        for key in keys:
+            entry = self._get_entry(key)
+            if entry is not _ABSENT:
+                yield key, read_entry(segment, entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class PrefixedBackend(StorageBackend):
+    """Backend whose keys are prefixed with a given prefix in its parent backend
+    """
+
+    def __init__(self, backend: 'StorageBackend', prefix: bytes) -> None:
+        self._backend = backend
+        self._prefix = prefix
+
+    def get(self, key: bytes, default: Optional[bytes] = None) -> Optional[bytes]:
+        return self._backend.get(self._prefix + key, default)
+
+    def iterator(self, start: Optional[bytes] = None, stop: Optional[bytes] = None) -> 'Iterator':
+        prefix = self._prefix
+        start = prefix if start is None else prefix + start
+        stop = get_prefix_upper_bound(prefix) if stop is None else prefix + stop
+        offset = len(prefix)
+
+        it = self._backend.iterator(start=start, stop=stop)
+        return Iterator((key[offset:], value) for key, value in it)
+
+    def snapshot(self) -> 'Snapshot':
+        return _PrefixedSnapshot(self._backend.snapshot(), self._prefix)
+
+    def prefixed_db(self, prefix: bytes) -> 'PrefixedBackend':
+        return PrefixedBackend(self._backend, self._prefix + prefix)
+
+    def _write(self, states: dict) -> None:
+        self._backend._write({self._prefix + key: value for key, value in states.items()})
+
+
+class _PrefixedSnapshot(object):
+    def __init__(self, snapshot: 'Snapshot', prefix: bytes) -> None:
+        self._snapshot = snapshot
+        self._prefix = prefix
+
+    def get(self, key: bytes, default: Optional[bytes] = None) -> Optional[bytes]:
+        return self._snapshot.get(self._prefix + key, default)
+
+    def iterator(self, start: Optional[bytes] = None, stop: Optional[bytes] = None) -> 'Iterator':
+        prefix = self._prefix
+        start = prefix if start is None else prefix + start
+        stop = get_prefix_upper_bound(prefix) if stop is None else prefix + stop
+        offset = len(prefix)
+
+        it = self._snapshot.iterator(start=start, stop=stop)
+        return Iterator((key[offset:], value) for key, value in it)
+
+    def close(self) -> None:
+        self._snapshot.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SortedKeys(object):
+    """Keys kept in order in sorted chunks
+
+    A change sorts one chunk in place and a range scan bisects to its first chunk,
+    so neither of them sorts all the keys.
+    """
+
+    # A chunk is split in 2 when it grows to 2 * CHUNK_SIZE
+    CHUNK_SIZE = 1024
+
+    def __init__(self, keys: iter = ()) -> None:
+        keys = sorted(keys)
+        size = self.CHUNK_SIZE
+        self._chunks = [keys[i:i + size] for i in range(0, len(keys), size)]
+        # the last key of each chunk
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        self._len = len(keys)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key: bytes) -> None:
+        """Adds a key which is not present
+        """
+        chunks, maxes = self._chunks, self._maxes
+        self._len += 1
+        if not chunks:
+            chunks.append([key])
+            maxes.append(key)
+            return
+
+        i = min(bisect_left(maxes, key), len(maxes) - 1)
+        chunk = chunks[i]
+        insort(chunk, key)
+        maxes[i] = chunk[-1]
+
+        size = self.CHUNK_SIZE
+        if len(chunk) >= size * 2:
+            chunks[i:i + 1] = [chunk[:size], chunk[size:]]
+            maxes[i:i + 1] = [chunk[size - 1], chunk[-1]]
+
+    def remove(self, key: bytes) -> None:
+        """Removes a key which is present
+        """
+        chunks, maxes = self._chunks, self._maxes
+        i = bisect_left(maxes, key)
+        chunk = chunks[i]
+        del chunk[bisect_left(chunk, key)]
+        self._len -= 1
+
+        if chunk:
+            maxes[i] = chunk[-1]
+        else:
+            del chunks[i]
+            del maxes[i]
+
+    def range(self, start: Optional[bytes] = None, stop: Optional[bytes] = None) -> list:
+        """Returns the keys in [start, stop) in order
+
+        :param start: the first key to include (inclusive)
+        :param stop: the key to stop at (exclusive)
+        """
+        chunks = self._chunks
+        keys = []
+        i = 0 if start is None else bisect_left(self._maxes, start)
+
+        while i < len(chunks):
+            chunk = chunks[i]
+            begin = 0 if start is None else bisect_left(chunk, start)
+            end = len(chunk) if stop is None else bisect_left(chunk, stop)
+            keys.extend(chunk[begin:end])
+            if end < len(chunk):
+                break
+            i += 1
+
+        return keys
+
+
+def _in_range(key: bytes, start: Optional[bytes], stop: Optional[bytes]) -> bool:
+    return (start is None or key >= start) and (stop is None or key < stop)
+
+
+class _Segment(object):
+    """Index of the states of an IndexedBackend with the storage it refers to
+
+    :param index: key: entry
+    :param keys: keys of index in order
+    :param mm: mmap which the entries of MmapBackend refer to
+    """
+    __slots__ = ('index', 'keys', 'mm')
+
+    def __init__(self, index: dict, keys: 'SortedKeys', mm: Optional[mmap.mmap] = None) -> None:
+        self.index = index
+        self.keys = keys
+        self.mm = mm
+
+
+class IndexedBackend(StorageBackend):
+    """An abstract class of the backend which finds the states with an index in memory
+
+    The index is updated in place. Taking a snapshot copies nothing:
+    the old entries are kept in the undo logs of the snapshots alive when they are changed.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._segment = _Segment({}, SortedKeys())
+        self._snapshots = WeakSet()
+
+    def get(self, key: bytes, default: Optional[bytes] = None) -> Optional[bytes]:
+        segment = self._segment
+        entry = segment.index.get(key, _ABSENT)
+        if entry is _ABSENT:
+            return default
+
+        return self._read_entry(segment, entry)
+
+    def snapshot(self) -> 'Snapshot':
+        with self._lock:
+            snapshot = Snapshot(self, self._segment)
+            self._snapshots.add(snapshot)
+            return snapshot
+
+    def _release_snapshot(self, snapshot: 'Snapshot') -> None:
+        with self._lock:
+            self._snapshots.discard(snapshot)
+
+    def _get_snapshot_keys(self, snapshot: 'Snapshot', start: Optional[bytes], stop: Optional[bytes]) -> list:
+        """Returns the keys in [start, stop) present at the moment of a snapshot and maybe more
+
+        The keys added after the snapshot is taken are filtered out by the snapshot.
+        """
+        with self._lock:
+            keys: list = snapshot._segment.keys.range(start, stop)
+            removed_keys = [key for key, entry in snapshot._undo.items()
+                            if entry is not _ABSENT and _in_range(key, start, stop)]
+
+        if not removed_keys:
+            return keys
+
+        keys_set = set(keys)
+        removed_keys = sorted(key for key in removed_keys if key not in keys_set)
+        return list(merge(keys, removed_keys))
+
+    def _update_index(self, key: bytes, entry: Any) -> Any:
+        """Updates the index of the current segment. It must be called with the lock held
+
+        :param key:
+        :param entry: new entry or _ABSENT to remove the key
+        :return: old entry or _ABSENT
+        """
+        segment = self._segment
+        index = segment.index
+        old_entry = index.get(key, _ABSENT)
+        if entry is _ABSENT and old_entry is _ABSENT:
+            return old_entry
+
+        for snapshot in self._snapshots:
+            snapshot._undo.setdefault(key, old_entry)
+
+        if entry is _ABSENT:
+            del index[key]
+            segment.keys.remove(key)
+        else:
+            if old_entry is _ABSENT:
+                segment.keys.add(key)
+            index[key] = entry
+
+        return old_entry
+
+    def _read_entry(self, segment: '_Segment', entry: Any) -> bytes:
+        raise NotImplementedError()
+
+
+class MemoryBackend(IndexedBackend):
+    """Backend which holds all states in a dict
+
+    The states are lost on closing. It is used for tests and benchmarks.
+    """
+
+    def close(self) -> None:
+        with self._lock:
+            self._segment = _Segment({}, SortedKeys())
+            self._snapshots = WeakSet()
+
+    def _read_entry(self, segment: '_Segment', entry: bytes) -> bytes:
+        return entry
+
+    def _write(self, states: dict) -> None:
+        with self._lock:
+            for key, value in states.items():
+                self._update_index(key, _ABSENT if value is None else value)
+
+
+class MmapBackend(IndexedBackend):
+    """Backend which appends states to a log file and reads them through mmap
+
+    Log record: op(1) | key length(4) | value length(4) | key | value
+    The records of a write batch are followed by a commit record,
+    so a batch torn by a crash is discarded on opening.
+
+    The file is extended by GROWTH_SIZE at a time and mapped again only then.
+    The log is compacted into a new file when the records overwritten or deleted
+    take more than half of it. The snapshots taken before keep reading the old file.
+    """
+
+    FILE_NAME = 'states.log'
+    COMPACTION_FILE_NAME = 'states.log.compaction'
+
+    # The size by which the file is extended
+    GROWTH_SIZE = 16 * 1024 * 1024
+    # The log is not compacted below this size
+    COMPACTION_MIN_SIZE = 64 * 1024 * 1024
+
+    _HEADER = struct.Struct('>BII')
+    # 0 is the padding at the end of the file
+    _OP_PUT = 1
+    _OP_DELETE = 2
+    _OP_COMMIT = 3
+
+    def __init__(self, path: str, create_if_missing: bool = True) -> None:
+        """Constructor
+
+        :param path: directory where the log file is placed
+        :param create_if_missing:
+        """
+        if not os.path.isdir(path):
+            if not create_if_missing:
+                raise DatabaseException(f'Database not found: {path}')
+            os.makedirs(path)
+
+        super().__init__()
+        self._path = os.path.join(path, self.FILE_NAME)
+        self._file = open(self._path, 'r+b' if os.path.exists(self._path) else 'w+b')
+        # the end of the committed records
+        self._size = 0
+        # the size of the records which the index refers to
+        self._live_size = 0
+
+        self._load()
+        self._reserve(0)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                # The padding is cut off
+                self._file.truncate(self._size)
+                self._file.close()
+                self._file = None
+                self._segment = _Segment({}, SortedKeys())
+                self._snapshots = WeakSet()
+
+    def _read_entry(self, segment: '_Segment', entry: tuple) -> bytes:
+        offset, length = entry
+        # The mmap is read after the entry, so it always covers the entry.
+        mm = segment.mm
+        return mm[offset:offset + length]
+
+    def _write(self, states: dict) -> None:
+        with self._lock:
+            header = self._HEADER
+            offset = self._size
+            records = []
+            entries = []
+
+            for key, value in states.items():
+                if value is None:
+                    records.append(header.pack(self._OP_DELETE, len(key), 0))
+                    records.append(key)
+                    offset += header.size + len(key)
+                    entries.append((key, _ABSENT))
+                else:
+                    records.append(header.pack(self._OP_PUT, len(key), len(value)))
+                    records.append(key)
+                    records.append(value)
+                    offset += header.size + len(key)
+                    entries.append((key, (offset, len(value))))
+                    offset += len(value)
+
+            records.append(header.pack(self._OP_COMMIT, 0, 0))
+            data = b''.join(records)
+
+            self._reserve(len(data))
+            self._file.seek(self._size)
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+
+            for key, entry in entries:
+                if entry is not _ABSENT:
+                    self._live_size += self._get_record_size(key, entry)
+                old_entry = self._update_index(key, entry)
+                if old_entry is not _ABSENT:
+                    self._live_size -= self._get_record_size(key, old_entry)
+
+            if self._size > self.COMPACTION_MIN_SIZE and self._size > self._live_size * 2:
+                self._compact()
+
+    def _get_record_size(self, key: bytes, entry: tuple) -> int:
+        return self._HEADER.size + len(key) + entry[1]
+
+    def _reserve(self, size: int) -> None:
+        """Extends the file and maps it again if the records to write do not fit in it
+        """
+        segment = self._segment
+        if segment.mm is not None and self._size + size <= len(segment.mm):
+            return
+
+        capacity = self._size + size + self.GROWTH_SIZE
+        self._file.truncate(capacity)
+        # The previous mmap is not closed explicitly because readers may still be using it.
+        # The new one is set before any entry refers to the extended part.
+        segment.mm = mmap.mmap(self._file.fileno(), capacity, access=mmap.ACCESS_READ)
+
+    def _load(self) -> None:
+        """Builds the index scanning the log file through mmap
+
+        A torn batch at the end is cut off.
+        """
+        file_size = os.path.getsize(self._path)
+        if file_size == 0:
+            return
+
+        mm = mmap.mmap(self._file.fileno(), file_size, access=mmap.ACCESS_READ)
+        header = self._HEADER
+        header_size = header.size
+        index = {}
+        pending = []
+        offset = 0
+        committed_size = 0
+
+        while offset + header_size <= file_size:
+            op, key_length, value_length = header.unpack_from(mm, offset)
+            offset += header_size
+
+            if op == self._OP_COMMIT:
+                for key, entry in pending:
+                    if entry is None:
+                        index.pop(key, None)
+                    else:
+                        index[key] = entry
+                pending.clear()
+                committed_size = offset
+                continue
+
+            end = offset + key_length + value_length
+            if op not in (self._OP_PUT, self._OP_DELETE) or end > file_size:
+                break
+
+            key = mm[offset:offset + key_length]
+            if op == self._OP_PUT:
+                pending.append((key, (offset + key_length, value_length)))
+            else:
+                pending.append((key, None))
+            offset = end
+
+        mm.close()
+
+        # A torn batch is cut off not to be taken as a part of the next batches
+        self._file.truncate(committed_size)
+        self._size = committed_size
+        self._live_size = sum(self._get_record_size(key, entry) for key, entry in index.items())
+        self._segment = _Segment(index, SortedKeys(index))
+
+    def _compact(self) -> None:
+        """Writes the live records to a new log file and replaces the log with it
+
+        It must be called with the lock held.
+        """
+        header = self._HEADER
+        segment = self._segment
+        compaction_path = os.path.join(os.path.dirname(self._path), self.COMPACTION_FILE_NAME)
+
+        index = {}
+        offset = 0
+        with open(compaction_path, 'wb') as f:
+            records = []
+            records_size = 0
+            for key in segment.keys.range():
+                value = self._read_entry(segment, segment.index[key])
+                records.append(header.pack(self._OP_PUT, len(key), len(value)))
+                records.append(key)
+                records.append(value)
+                offset += header.size + len(key)
+                index[key] = (offset, len(value))
+                offset += len(value)
+
+                records_size += header.size + len(key) + len(value)
+                if records_size >= self.GROWTH_SIZE:
+                    f.write(b''.join(records))
+                    records.clear()
+                    records_size = 0
+
+            records.append(header.pack(self._OP_COMMIT, 0, 0))
+            offset += header.size
+            f.write(b''.join(records))
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(compaction_path, self._path)
+
+        self._file.close()
+        self._file = open(self._path, 'r+b')
+        self._size = offset
+        self._live_size = offset - header.size
+
+        capacity = offset + self.GROWTH_SIZE
+        self._file.truncate(capacity)
+        mm = mmap.mmap(self._file.fileno(), capacity, access=mmap.ACCESS_READ)
+
+        # The snapshots taken before keep the old segment which is not changed any more
+        self._segment = _Segment(index, SortedKeys(index), mm)
+        self._snapshots = WeakSet()
@@ -16,6 +16,7 @@
 
 
 import hashlib
+from bisect import bisect_right
 from collections import OrderedDict
 from typing import TYPE_CHECKING, Optional
 from collections.abc import MutableMapping
@@ -26,16 +27,37 @@ if TYPE_CHECKING:
     from ..base.block import Block
 
 
+# The number of items joined at once before being fed to the hash
+DIGEST_CHUNK_SIZE = 1024
+
+
 def digest(ordered_dict: OrderedDict):
+    """Returns sha3_256(b'|'.join(keys and values which are not None))
+
+    Items are hashed chunk by chunk
+    not to build one large bytes object for a large batch.
+    """
     # items in data MUST be byte-like objects
+    hash_obj = hashlib.sha3_256()
     data = []
+    separator = b''
 
     for key, value in ordered_dict.items():
         data.append(key)
         if value is not None:
             data.append(value)
 
-    return hashlib.sha3_256(b'|'.join(data)).digest()
+        if len(data) >= DIGEST_CHUNK_SIZE:
+            hash_obj.update(separator)
+            hash_obj.update(b'|'.join(data))
+            data.clear()
+            separator = b'|'
+
+    if data:
+        hash_obj.update(separator)
+        hash_obj.update(b'|'.join(data))
+
+    return hash_obj.digest()
 
 
 class Batch(OrderedDict):
@@ -60,9 +82,38 @@ class Batch(OrderedDict):
         return digest(self)
 
 
+_ABSENT = object()
+
+
+class _CallFrame(object):
+    """The states written in a call of TransactionBatch
+
+    A frame does not hold the states themselves.
+    It only keeps the position of the journal where its undo records start
+    and the numbers needed to tell the size of a call batch.
+    """
+    __slots__ = ('id', 'marker', 'size', 'overlaps')
+
+    def __init__(self, frame_id: int, marker: int) -> None:
+        self.id = frame_id
+        # Index of the first undo record of this frame in the journal
+        self.marker = marker
+        # The number of keys written in this frame
+        self.size = 0
+        # Level of an outer frame in the call stack:
+        # the number of keys in this frame which had been written in that frame before
+        self.overlaps = {}
+
+
 class TransactionBatch(MutableMapping):
     """Contains the states changed by a transaction.
 
+    All states are kept in one dict with an undo journal.
+    A call frame is pushed on enter_call() and the journal records
+    the previous value of a key only when the key is written first in the frame.
+    revert_call() rolls back the records of the current frame
+    and leave_call() just pops the frame, so every operation is O(1) amortised.
+
     key: Score Address
     value: IconScoreBatch
     """
@@ -73,68 +124,111 @@ class TransactionBatch(MutableMapping):
         """
         super().__init__()
         self.hash = tx_hash
-        self._call_batches = [OrderedDict()]
+        self._init_states()
+
+    def _init_states(self):
+        self._states = OrderedDict()
+        # key: the id of the frame where the key is written last
+        self._owners = {}
+        # (key, previous value, previous owner)
+        self._journal = []
+        self._frames = [_CallFrame(0, 0)]
+        # Frame ids in the call stack in ascending order
+        self._frame_ids = [0]
+        self._next_frame_id = 1
+        self._length = 0
 
     def __getitem__(self, item):
-        for call_batch in reversed(self._call_batches):
-            if item in call_batch:
-                return call_batch[item]
-
-        return None
+        return self._states.get(item)
 
     def __setitem__(self, key, value):
-        call_batch: OrderedDict = self._call_batches[-1]
-        call_batch[key] = value
+        frame: '_CallFrame' = self._frames[-1]
+        owner: Optional[int] = self._owners.get(key)
+
+        # Frames whose id is greater than the current one are the children left already
+        if owner is not None and owner >= frame.id:
+            self._states[key] = value
+            return
+
+        if owner is None:
+            self._journal.append((key, _ABSENT, None))
+        else:
+            self._journal.append((key, self._states[key], owner))
+            level: int = bisect_right(self._frame_ids, owner) - 1
+            frame.overlaps[level] = frame.overlaps.get(level, 0) + 1
+
+        self._states[key] = value
+        self._owners[key] = frame.id
+        frame.size += 1
+        self._length += 1
 
     def __delitem__(self, key):
         raise ServerErrorException('To delete item is not allowed')
 
     def __contains__(self, item):
-        for call_batch in self._call_batches:
-            if item in call_batch:
-                return True
-
-        return False
+        return item in self._states
 
     def __iter__(self):
-        for call_batch in self._call_batches:
-            for key in call_batch:
-                yield key
+        return iter(self._states)
 
     def __len__(self):
-        length = 0
-
-        for call_batch in self._call_batches:
-            length += len(call_batch)
-
-        return length
+        """Returns the sum of the number of keys written in each call
+        """
+        return self._length
 
     def enter_call(self):
-        self._call_batches.append(OrderedDict())
+        frame = _CallFrame(self._next_frame_id, len(self._journal))
+        self._next_frame_id += 1
+        self._frames.append(frame)
+        self._frame_ids.append(frame.id)
 
     def revert_call(self):
-        call_batch: OrderedDict = self._call_batches[-1]
-        call_batch.clear()
+        frame: '_CallFrame' = self._frames[-1]
+        states = self._states
+        owners = self._owners
+
+        for i in range(len(self._journal) - 1, frame.marker - 1, -1):
+            key, value, owner = self._journal[i]
+            if value is _ABSENT:
+                del states[key]
+                del owners[key]
+            else:
+                states[key] = value
+                owners[key] = owner
+
+        del self._journal[frame.marker:]
+        self._length -= frame.size
+        frame.size = 0
+        frame.overlaps = {}
 
     def leave_call(self):
-        call_batch: OrderedDict = self._call_batches.pop()
+        frame: '_CallFrame' = self._frames.pop()
+        self._frame_ids.pop()
+
+        parent_level: int = len(self._frames) - 1
+        parent: '_CallFrame' = self._frames[parent_level]
+
+        # The keys written in both frames are counted once in the parent
+        overlap: int = frame.overlaps.pop(parent_level, 0)
+        for level, count in frame.overlaps.items():
+            parent.overlaps[level] = parent.overlaps.get(level, 0) + count
 
-        if call_batch:
-            self._call_batches[-1].update(call_batch)
+        parent.size += frame.size - overlap
+        self._length -= overlap
 
     def digest(self) -> bytes:
-        if len(self._call_batches) != 1:
-            raise ServerErrorException(f'Wrong call_batch count: {len(self._call_batches)}')
+        if len(self._frames) != 1:
+            raise ServerErrorException(f'Wrong call_batch count: {len(self._frames)}')
 
-        return digest(self._call_batches[0])
+        return digest(self._states)
 
     @property
     def call_count(self) -> int:
-        return len(self._call_batches)
+        return len(self._frames)
 
     def clear(self):
         self.hash = None
-        self._call_batches = [OrderedDict()]
+        self._init_states()
 
 
 class BlockBatch(Batch):
@@ -143,14 +237,30 @@ class BlockBatch(Batch):
     key: Address
     value: IconScoreBatch
     """
-    def __init__(self, block: Optional['Block'] = None):
+    def __init__(self, block: Optional['Block'] = None, parent: Optional['BlockBatch'] = None):
         """Constructor
 
         :param block: block info
+        :param parent: the batch of the parent block which has not been committed yet
+            States which are not in this batch are looked up in the parent
         """
         super().__init__()
         self.block = block
+        self.parent = parent
+
+    def get_chain(self) -> list:
+        """Returns the uncommitted batches from the oldest ancestor to this batch
+        """
+        chain = []
+        batch = self
+        while batch is not None:
+            chain.append(batch)
+            batch = batch.parent
+
+        chain.reverse()
+        return chain
 
     def clear(self) -> None:
         self.block = None
+        self.parent = None
         super().clear()
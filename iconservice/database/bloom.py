@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+import os
+import struct
+from hashlib import blake2b
+from typing import Callable, Iterable, Optional
+
+
+class BloomFilter(object):
+    """Set of the keys which exist in a state db
+
+    If might_contain() returns False, the key is surely absent and the db need not be read.
+    Deleted keys are not removed, so they only raise the false positive rate
+    until the filter is rebuilt.
+
+    File format
+    version(1) | hash count(1) | capacity(8) | key count(8) | bits
+    """
+
+    VERSION = 1
+    # 10 bits per key gives about 1% false positive rate
+    BITS_PER_KEY = 10
+
+    _HEADER = struct.Struct('>BBQQ')
+
+    def __init__(self, capacity: int) -> None:
+        """Constructor
+
+        :param capacity: the number of keys which the filter holds at the expected false positive rate
+        """
+        self._capacity = max(capacity, 1)
+        self._bit_count = self._capacity * self.BITS_PER_KEY
+        self._hash_count = max(1, round(self.BITS_PER_KEY * math.log(2)))
+        self._bits = bytearray((self._bit_count + 7) // 8)
+        self._count = 0
+
+        self._lookups = 0
+        self._negatives = 0
+        self._false_positives = 0
+
+    @classmethod
+    def build(cls, iterate_keys: Callable[[], Iterable[bytes]], capacity: int) -> 'BloomFilter':
+        """Builds a filter of the keys in a db
+
+        The keys are scanned once more only if they are more than the capacity,
+        then the filter is sized with their exact count.
+
+        :param iterate_keys: returns an iterator over the keys. The keys must not change between the calls
+        :param capacity: the minimum capacity
+        :return: filter which is not full
+        """
+        bloom_filter = cls(capacity)
+        count = 0
+        for key in iterate_keys():
+            bloom_filter.add(key)
+            count += 1
+
+        if count > capacity:
+            bloom_filter = cls(count * 2)
+            bloom_filter.update(iterate_keys())
+
+        # The keys in a db are distinct
+        bloom_filter._count = count
+        return bloom_filter
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def count(self) -> int:
+        """The estimated number of distinct keys added
+
+        A key which looks present already is not counted.
+        """
+        return self._count
+
+    def is_full(self) -> bool:
+        return self._count > self._capacity
+
+    @property
+    def metrics(self) -> dict:
+        return {
+            'keys': self._count,
+            'capacity': self._capacity,
+            'lookups': self._lookups,
+            'savedLookups': self._negatives,
+            'falsePositives': self._false_positives
+        }
+
+    def _get_positions(self, key: bytes) -> list:
+        digest = blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        bit_count = self._bit_count
+
+        return [(h1 + i * h2) % bit_count for i in range(self._hash_count)]
+
+    def add(self, key: bytes) -> None:
+        bits = self._bits
+        is_new = False
+
+        for position in self._get_positions(key):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                is_new = True
+
+        if is_new:
+            self._count += 1
+
+    def update(self, keys: iter) -> None:
+        for key in keys:
+            self.add(key)
+
+    def might_contain(self, key: bytes) -> bool:
+        """Returns False if a given key has never been added
+
+        :param key:
+        :return: False: absent, True: present or false positive
+        """
+        self._lookups += 1
+
+        bits = self._bits
+        for position in self._get_positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                self._negatives += 1
+                return False
+
+        return True
+
+    def on_false_positive(self) -> None:
+        """Called when might_contain() returned True for a key absent in the db
+        """
+        self._false_positives += 1
+
+    def to_bytes(self) -> bytes:
+        header = self._HEADER.pack(self.VERSION, self._hash_count, self._capacity, self._count)
+        return header + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Optional['BloomFilter']:
+        """Restores a filter from to_bytes()
+
+        :param data:
+        :return: None if data is not a valid filter
+        """
+        header_size = cls._HEADER.size
+        if len(data) < header_size:
+            return None
+
+        version, hash_count, capacity, count = cls._HEADER.unpack_from(data)
+        bloom_filter = BloomFilter(capacity)
+        if version != cls.VERSION \
+                or hash_count != bloom_filter._hash_count \
+                or len(data) - header_size != len(bloom_filter._bits):
+            return None
+
+        bloom_filter._bits[:] = data[header_size:]
+        bloom_filter._count = count
+        return bloom_filter
+
+    def save(self, path: str) -> None:
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.to_bytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['BloomFilter']:
+        """Loads the filter saved on the last close
+
+        The file is removed on load. The filter misses the keys written afterwards
+        if the process crashes, so it is saved again only on a clean close.
+
+        :param path: file path
+        :return: None if there is no valid filter
+        """
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        os.remove(path)
+
+        return cls.from_bytes(data)
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+
+class LRUCache(object):
+    """Bounded LRU cache for committed states
+
+    The size of the cache is the sum of the lengths of the keys and values it holds.
+    It is shared by the invoke thread and the query thread, so every access is locked.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Constructor
+
+        :param max_size: the maximum size of the cache in bytes
+        """
+        self._lock = Lock()
+        self._items = OrderedDict()
+        self._max_size = max_size
+        self._size = 0
+        # Increased whenever states are written or invalidated.
+        # A value read from StateDB is not cached if it has been changed while reading.
+        self._version = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._items
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Returns the cached value for a given key
+
+        :param key:
+        :return: cached value or None if not cached
+        """
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+
+            self._items.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def fill(self, key: bytes, value: bytes, version: int) -> None:
+        """Caches a value which has been read from StateDB
+
+        :param key:
+        :param value: value read from StateDB
+        :param version: the version of the cache before reading the value
+        """
+        with self._lock:
+            if version == self._version:
+                self._put(key, value)
+
+    def put(self, key: bytes, value: Optional[bytes]) -> None:
+        """Updates the cache with a value written to StateDB
+
+        :param key:
+        :param value: None or empty bytes means that the key has been deleted
+        """
+        with self._lock:
+            self._version += 1
+            if value:
+                self._put(key, value)
+            else:
+                self._delete(key)
+
+    def update(self, states: dict) -> None:
+        """Updates the cache with the states written to StateDB at once
+
+        :param states: key/value pairs
+        """
+        with self._lock:
+            self._version += 1
+            for key, value in states.items():
+                if value:
+                    self._put(key, value)
+                else:
+                    self._delete(key)
+
+    def delete(self, key: bytes) -> None:
+        with self._lock:
+            self._version += 1
+            self._delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._items.clear()
+            self._size = 0
+
+    def _put(self, key: bytes, value: bytes) -> None:
+        entry_size = len(key) + len(value)
+        if entry_size > self._max_size:
+            self._delete(key)
+            return
+
+        old_value = self._items.get(key)
+        if old_value is not None:
+            self._size -= len(key) + len(old_value)
+
+        self._items[key] = value
+        self._items.move_to_end(key)
+        self._size += entry_size
+
+        while self._size > self._max_size:
+            old_key, old_value = self._items.popitem(last=False)
+            self._size -= len(old_key) + len(old_value)
+            self._evictions += 1
+
+    def _delete(self, key: bytes) -> None:
+        value = self._items.pop(key, None)
+        if value is not None:
+            self._size -= len(key) + len(value)
@@ -14,12 +14,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from threading import Lock, Thread
 from typing import TYPE_CHECKING, Optional
 
-import plyvel
-
 from iconcommons.logger import Logger
 from iconservice.base.exception import DatabaseException
+from iconservice.database.backend import StorageBackendType, create_backend, get_iterator_range
+from iconservice.database.bloom import BloomFilter
+from iconservice.database.cache import LRUCache
 from iconservice.icon_constant import ICON_DB_LOG_TAG
 from iconservice.iconscore.icon_score_context import ContextGetter
 from iconservice.iconscore.icon_score_context import IconScoreContextType
@@ -27,6 +29,8 @@ from iconservice.iconscore.icon_score_context import IconScoreContextType
 if TYPE_CHECKING:
     from iconservice.iconscore.icon_score_context import IconScoreContext
     from iconservice.base.address import Address
+    from iconservice.database.pipeline import CommitPipeline
+    from iconservice.database.snapshot import StateSnapshot
 
 
 def _get_context_type(context: 'IconScoreContext') -> 'IconScoreContextType':
@@ -36,6 +40,13 @@ def _get_context_type(context: 'IconScoreContext') -> 'IconScoreContextType':
         return context.type
 
 
+def _get_snapshot(context: 'IconScoreContext') -> Optional['StateSnapshot']:
+    if context is None:
+        return None
+    else:
+        return context.snapshot
+
+
 def _is_db_writable_on_context(context: 'IconScoreContext'):
     """Check if db is writable on a given context
 
@@ -48,23 +59,39 @@ def _is_db_writable_on_context(context: 'IconScoreContext'):
         return not context.readonly
 
 
+def _is_key_in_range(key: bytes,
+                     prefix: bytes,
+                     start: Optional[bytes],
+                     stop: Optional[bytes]) -> bool:
+    if not key.startswith(prefix):
+        return False
+    if start is not None and key < start:
+        return False
+    if stop is not None and key >= stop:
+        return False
+
+    return True
+
+
 class KeyValueDatabase(object):
     @staticmethod
     def from_path(path: str,
-                  create_if_missing: bool=True) -> 'KeyValueDatabase':
+                  create_if_missing: bool=True,
+                  backend_type: str=StorageBackendType.LEVELDB) -> 'KeyValueDatabase':
         """
 
         :param path: db path
         :param create_if_missing:
+        :param backend_type: storage backend type (leveldb, memory or mmap)
         :return: KeyValueDatabase instance
         """
-        db = plyvel.DB(path, create_if_missing=create_if_missing)
+        db = create_backend(backend_type, path, create_if_missing)
         return KeyValueDatabase(db)
 
-    def __init__(self, db: plyvel.DB) -> None:
+    def __init__(self, db) -> None:
         """Constructor
 
-        :param db: plyvel db instance
+        :param db: storage backend instance (plyvel.DB or StorageBackend)
         """
         self._db = db
 
@@ -76,6 +103,18 @@ class KeyValueDatabase(object):
         """
         return self._db.get(key)
 
+    def get_many(self, keys: list) -> list:
+        """Get the values for the specified keys from one snapshot.
+
+        :param keys: (list): keys to retrieve
+        :return: values in the same order as keys, None if not found
+        """
+        if len(keys) == 1:
+            return [self._db.get(keys[0])]
+
+        with self._db.snapshot() as snapshot:
+            return [snapshot.get(key) for key in keys]
+
     def put(self, key: bytes, value: bytes) -> None:
         """Set a value for the specified key.
 
@@ -105,8 +144,29 @@ class KeyValueDatabase(object):
         """
         return KeyValueDatabase(self._db.prefixed_db(prefix))
 
-    def iterator(self) -> iter:
-        return self._db.iterator()
+    def iterator(self,
+                 prefix: Optional[bytes]=None,
+                 start: Optional[bytes]=None,
+                 stop: Optional[bytes]=None) -> iter:
+        """Return an iterator over the key/value pairs in key order.
+
+        :param prefix: (bytes): only keys starting with prefix are included
+        :param start: (bytes): the first key to include (inclusive)
+        :param stop: (bytes): the key to stop at (exclusive)
+        :return: iterator of (key, value) tuples
+        """
+        if prefix is None and start is None and stop is None:
+            return self._db.iterator()
+
+        start, stop = get_iterator_range(prefix, start, stop)
+        return self._db.iterator(start=start, stop=stop)
+
+    def snapshot(self):
+        """Returns a read-only view of the database at this moment
+
+        The view provides get() and iterator() and must be closed after use.
+        """
+        return self._db.snapshot()
 
     def write_batch(self, states: dict) -> None:
         """Write a batch to the database for the specified states dict.
@@ -186,14 +246,45 @@ class ContextDatabase(object):
     Cache + LevelDB
     """
 
-    def __init__(self, db: 'KeyValueDatabase', is_shared: bool=False) -> None:
+    def __init__(self,
+                 db: 'KeyValueDatabase',
+                 is_shared: bool=False,
+                 cache: Optional['LRUCache']=None,
+                 pipeline: Optional['CommitPipeline']=None,
+                 bloom_filter: Optional['BloomFilter']=None) -> None:
         """Constructor
 
         :param db: KeyValueDatabase instance
+        :param cache: LRU cache for committed states. None means no cache
+        :param pipeline: commit pipeline whose overlay holds committed states
+            not written to this db yet. None means that commit writes synchronously
+        :param bloom_filter: filter of the keys existing in db.
+            Every write to db must go through this instance. None means no filter.
+            Once it is full, a filter twice as large is built in the background and replaces it
         """
         self.key_value_db = db
         # True: this db is shared with all SCOREs
         self._is_shared = is_shared
+        self._cache = cache
+        self._pipeline = pipeline
+        self._bloom_filter = bloom_filter
+        self._bloom_filter_lock = Lock()
+        # The keys added while a larger filter is built. None if no filter is being built
+        self._bloom_filter_pending_keys: Optional[list] = None
+        self._bloom_filter_thread: Optional['Thread'] = None
+        self._bloom_filter_growth_stopped = False
+
+    @property
+    def cache(self) -> Optional['LRUCache']:
+        return self._cache
+
+    @property
+    def pipeline(self) -> Optional['CommitPipeline']:
+        return self._pipeline
+
+    @property
+    def bloom_filter(self) -> Optional['BloomFilter']:
+        return self._bloom_filter
 
     def get(self, context: Optional['IconScoreContext'], key: bytes) -> bytes:
         """Returns value indicated by key from batch or StateDB
@@ -205,7 +296,7 @@ class ContextDatabase(object):
         context_type = _get_context_type(context)
 
         if context_type in (IconScoreContextType.DIRECT, IconScoreContextType.QUERY):
-            return self.key_value_db.get(key)
+            return self._get_from_state_db(key, _get_snapshot(context))
         else:
             return self.get_from_batch(context, key)
 
@@ -216,8 +307,11 @@ class ContextDatabase(object):
 
         Search order
         1. TransactionBatch
-        2. BlockBatch
-        3. StateDB
+        2. BlockBatch and the batches of its uncommitted parent blocks
+        3. CommitOverlay
+        4. StateDB
+
+        If the context is bound to a StateSnapshot, 3 and 4 are read from the snapshot.
 
         :param context:
         :param key:
@@ -227,16 +321,259 @@ class ContextDatabase(object):
         block_batch = context.block_batch
         tx_batch = context.tx_batch
 
+        if context.read_set is not None:
+            context.read_set.add(key)
+
         # get value from tx_batch
         if key in tx_batch:
             return tx_batch[key]
 
-        # get value from block_batch
-        if key in block_batch:
-            return block_batch[key]
+        # get value from block_batch and its parents
+        while block_batch is not None:
+            if key in block_batch:
+                return block_batch[key]
+            block_batch = block_batch.parent
 
         # get value from state_db
-        return self.key_value_db.get(key)
+        return self._get_from_state_db(key, context.snapshot)
+
+    def get_many(self,
+                 context: Optional['IconScoreContext'],
+                 keys: list) -> list:
+        """Returns values indicated by keys from batch or StateDB at once
+
+        Search order of each key is the same as get_from_batch().
+        Keys which are not found in batches are read from one snapshot of StateDB.
+
+        :param context:
+        :param keys:
+        :return: values in the same order as keys
+        """
+        context_type = _get_context_type(context)
+
+        if context_type in (IconScoreContextType.DIRECT, IconScoreContextType.QUERY):
+            return self._get_many_from_state_db(keys, _get_snapshot(context))
+
+        block_batch = context.block_batch
+        tx_batch = context.tx_batch
+
+        if context.read_set is not None:
+            context.read_set.update(keys)
+
+        values = [None] * len(keys)
+        missing_indexes = []
+
+        for i, key in enumerate(keys):
+            if key in tx_batch:
+                values[i] = tx_batch[key]
+                continue
+
+            batch = block_batch
+            while batch is not None:
+                if key in batch:
+                    values[i] = batch[key]
+                    break
+                batch = batch.parent
+            else:
+                missing_indexes.append(i)
+
+        if missing_indexes:
+            missing_values = self._get_many_from_state_db(
+                [keys[i] for i in missing_indexes], context.snapshot)
+            for i, value in zip(missing_indexes, missing_values):
+                values[i] = value
+
+        return values
+
+    def iterator(self,
+                 context: Optional['IconScoreContext'],
+                 prefix: bytes,
+                 start: Optional[bytes]=None,
+                 stop: Optional[bytes]=None) -> iter:
+        """Returns an iterator over the key/value pairs in key order
+
+        Pending states in TransactionBatch, BlockBatch and CommitOverlay are merged
+        with the states in StateDB in the same precedence as get_from_batch().
+        Deleted keys (None values) are skipped.
+        States changed during the iteration are not reflected.
+
+        :param context:
+        :param prefix: only keys starting with prefix are included
+        :param start: the first key to include (inclusive)
+        :param stop: the key to stop at (exclusive)
+        :return: iterator of (key, value) tuples
+        """
+        context_type = _get_context_type(context)
+        snapshot = _get_snapshot(context)
+
+        def is_in_range(key: bytes) -> bool:
+            return _is_key_in_range(key, prefix, start, stop)
+
+        pending = {}
+        if snapshot is not None:
+            pending.update(snapshot.overlay_items(is_in_range))
+            db_iterator = snapshot.iterator(self, prefix, start, stop)
+        else:
+            if self._pipeline is not None:
+                pending.update(self._pipeline.overlay.items(is_in_range))
+            db_iterator = self.key_value_db.iterator(prefix=prefix, start=start, stop=stop)
+
+        if context_type not in (IconScoreContextType.DIRECT, IconScoreContextType.QUERY):
+            if context.read_set is not None:
+                context.read_set.add_range(prefix, start, stop)
+
+            for block_batch in context.block_batch.get_chain():
+                for key, value in block_batch.items():
+                    if is_in_range(key):
+                        pending[key] = value
+
+            tx_batch = context.tx_batch
+            for key in tx_batch:
+                if is_in_range(key):
+                    pending[key] = tx_batch[key]
+
+        return self._merge_iterator(sorted(pending.items()), db_iterator)
+
+    @staticmethod
+    def _merge_iterator(pending_items: list, db_iterator: iter) -> iter:
+        """Merges sorted pending states with sorted StateDB states
+
+        :param pending_items: sorted (key, value) pairs in batches
+        :param db_iterator: StateDB iterator
+        :return: iterator of (key, value) tuples
+        """
+        index = 0
+        count = len(pending_items)
+
+        try:
+            for db_key, db_value in db_iterator:
+                while index < count and pending_items[index][0] <= db_key:
+                    key, value = pending_items[index]
+                    index += 1
+                    if value is not None:
+                        yield key, value
+                    if key == db_key:
+                        break
+                else:
+                    yield db_key, db_value
+
+            for key, value in pending_items[index:]:
+                if value is not None:
+                    yield key, value
+        finally:
+            db_iterator.close()
+
+    def _get_from_state_db(self, key: bytes, snapshot: Optional['StateSnapshot']=None) -> bytes:
+        """Returns a committed value for a given key from overlay, cache or StateDB
+
+        :param key:
+        :param snapshot: reads the states at the snapshot if given
+        :return: a value for a given key
+        """
+        if snapshot is not None:
+            return snapshot.get(self, key)
+
+        if self._pipeline is not None:
+            found, value = self._pipeline.overlay.get(key)
+            if found:
+                return value
+
+        cache = self._cache
+        if cache is None:
+            return self._get_from_db(key)
+
+        value = cache.get(key)
+        if value is None:
+            version = cache.version
+            value = self._get_from_db(key)
+            if value is not None:
+                cache.fill(key, value, version)
+
+        return value
+
+    def _get_many_from_state_db(self, keys: list, snapshot: Optional['StateSnapshot']=None) -> list:
+        """Returns committed values for given keys from overlay, cache or one snapshot of StateDB
+
+        :param keys:
+        :param snapshot: reads the states at the snapshot if given
+        :return: values in the same order as keys
+        """
+        if snapshot is not None:
+            return snapshot.get_many(self, keys)
+
+        if self._pipeline is not None:
+            values = [None] * len(keys)
+            missing_indexes = []
+            overlay = self._pipeline.overlay
+
+            for i, key in enumerate(keys):
+                found, value = overlay.get(key)
+                if found:
+                    values[i] = value
+                else:
+                    missing_indexes.append(i)
+
+            if missing_indexes:
+                missing_values = self._get_many_from_cache_or_db(
+                    [keys[i] for i in missing_indexes])
+                for i, value in zip(missing_indexes, missing_values):
+                    values[i] = value
+
+            return values
+
+        return self._get_many_from_cache_or_db(keys)
+
+    def _get_many_from_cache_or_db(self, keys: list) -> list:
+        cache = self._cache
+        if cache is None:
+            return self._get_many_from_db(keys)
+
+        values = [cache.get(key) for key in keys]
+        missing_indexes = [i for i, value in enumerate(values) if value is None]
+
+        if missing_indexes:
+            version = cache.version
+            missing_values = self._get_many_from_db(
+                [keys[i] for i in missing_indexes])
+
+            for i, value in zip(missing_indexes, missing_values):
+                if value is not None:
+                    values[i] = value
+                    cache.fill(keys[i], value, version)
+
+        return values
+
+    def _get_from_db(self, key: bytes) -> Optional[bytes]:
+        """Reads StateDB unless the bloom filter tells that the key is absent
+        """
+        bloom_filter = self._bloom_filter
+        if bloom_filter is None:
+            return self.key_value_db.get(key)
+
+        if not bloom_filter.might_contain(key):
+            return None
+
+        value = self.key_value_db.get(key)
+        if value is None:
+            bloom_filter.on_false_positive()
+
+        return value
+
+    def _get_many_from_db(self, keys: list) -> list:
+        bloom_filter = self._bloom_filter
+        if bloom_filter is None:
+            return self.key_value_db.get_many(keys)
+
+        values = [None] * len(keys)
+        indexes = [i for i, key in enumerate(keys) if bloom_filter.might_contain(key)]
+
+        if indexes:
+            for i, value in zip(indexes, self.key_value_db.get_many([keys[i] for i in indexes])):
+                if value is None:
+                    bloom_filter.on_false_positive()
+                values[i] = value
+
+        return values
 
     def put(self,
             context: Optional['IconScoreContext'],
@@ -254,7 +591,14 @@ class ContextDatabase(object):
         context_type = _get_context_type(context)
 
         if context_type == IconScoreContextType.DIRECT:
+            if self._pipeline is not None:
+                # Committed states in the overlay must not override this write
+                self._pipeline.flush()
+            if self._bloom_filter is not None:
+                self._add_to_bloom_filter([key])
             self.key_value_db.put(key, value)
+            if self._cache is not None:
+                self._cache.put(key, value)
         else:
             context.tx_batch[key] = value
 
@@ -270,7 +614,12 @@ class ContextDatabase(object):
         context_type = _get_context_type(context)
 
         if context_type == IconScoreContextType.DIRECT:
+            if self._pipeline is not None:
+                # Committed states in the overlay must not override this write
+                self._pipeline.flush()
             self.key_value_db.delete(key)
+            if self._cache is not None:
+                self._cache.delete(key)
         else:
             context.tx_batch[key] = None
 
@@ -284,6 +633,7 @@ class ContextDatabase(object):
                 'close is not allowed on readonly context')
 
         if not self._is_shared:
+            self.stop_bloom_filter_growth()
             return self.key_value_db.close()
 
     def write_batch(self,
@@ -294,13 +644,80 @@ class ContextDatabase(object):
             raise DatabaseException(
                 'write_batch is not allowed on readonly context')
 
-        return self.key_value_db.write_batch(states)
+        if self._bloom_filter is not None:
+            # Keys are added before written not to be missed by readers
+            self._add_to_bloom_filter([key for key, value in states.items() if value])
+
+        self.key_value_db.write_batch(states)
+        if self._cache is not None and states:
+            self._cache.update(states)
+
+    def _add_to_bloom_filter(self, keys: list) -> None:
+        with self._bloom_filter_lock:
+            self._bloom_filter.update(keys)
+
+            if self._bloom_filter_pending_keys is not None:
+                self._bloom_filter_pending_keys.extend(keys)
+            elif self._bloom_filter.is_full() and not self._bloom_filter_growth_stopped:
+                # The keys are written to db after the snapshot,
+                # so they are added to the new filter after it is built with the keys written from now on
+                self._bloom_filter_pending_keys = list(keys)
+                snapshot = self.key_value_db.snapshot()
+                self._bloom_filter_thread = Thread(target=self._grow_bloom_filter,
+                                                   args=(snapshot, self._bloom_filter.capacity * 2),
+                                                   name='BloomFilterBuilder',
+                                                   daemon=True)
+                self._bloom_filter_thread.start()
+
+    def _grow_bloom_filter(self, snapshot, capacity: int) -> None:
+        """Builds a filter of the keys in a snapshot and replaces the full one with it
+        """
+        def iterate_keys():
+            for key, _ in snapshot.iterator():
+                if self._bloom_filter_growth_stopped:
+                    break
+                yield key
+
+        try:
+            bloom_filter = BloomFilter.build(iterate_keys, capacity)
+        finally:
+            snapshot.close()
+
+        with self._bloom_filter_lock:
+            if self._bloom_filter_growth_stopped:
+                return
+
+            bloom_filter.update(self._bloom_filter_pending_keys)
+            self._bloom_filter = bloom_filter
+            self._bloom_filter_pending_keys = None
+
+        Logger.info(f'Bloom filter grown: keys={bloom_filter.count} capacity={bloom_filter.capacity}',
+                    ICON_DB_LOG_TAG)
+
+    def stop_bloom_filter_growth(self) -> None:
+        """Stops building a larger bloom filter before db is closed
+        """
+        self._bloom_filter_growth_stopped = True
+        if self._bloom_filter_thread is not None:
+            self._bloom_filter_thread.join()
+            self._bloom_filter_thread = None
 
     @staticmethod
     def from_path(path: str,
-                  create_if_missing: bool=True) -> 'ContextDatabase':
-        db = KeyValueDatabase.from_path(path, create_if_missing)
-        return ContextDatabase(db)
+                  create_if_missing: bool=True,
+                  cache_size: int=0,
+                  backend_type: str=StorageBackendType.LEVELDB) -> 'ContextDatabase':
+        """
+
+        :param path: db path
+        :param create_if_missing:
+        :param cache_size: the size of LRU cache in bytes. 0 means no cache
+        :param backend_type: storage backend type (leveldb, memory or mmap)
+        :return: ContextDatabase instance
+        """
+        db = KeyValueDatabase.from_path(path, create_if_missing, backend_type)
+        cache = LRUCache(cache_size) if cache_size > 0 else None
+        return ContextDatabase(db, cache=cache)
 
 
 class IconScoreDatabase(ContextGetter):
@@ -336,6 +753,50 @@ class IconScoreDatabase(ContextGetter):
             self._observer.on_get(self._context, key, value)
         return value
 
+    def get_many(self, keys: list) -> list:
+        """
+        Gets the values for the specified keys at once
+
+        :param keys: keys to retrieve
+        :return: values in the same order as keys, None if not found
+        """
+        hashed_keys = [self._hash_key(key) for key in keys]
+        values = self._context_db.get_many(self._context, hashed_keys)
+        if self._observer:
+            for key, value in zip(keys, values):
+                self._observer.on_get(self._context, key, value)
+        return values
+
+    def iterator(self,
+                 prefix: bytes=b'',
+                 start: Optional[bytes]=None,
+                 stop: Optional[bytes]=None) -> iter:
+        """
+        Iterates the key/value pairs of this db in key order
+
+        States which are not committed yet are included
+        and the steps for get are charged per item read.
+
+        :param prefix: only keys starting with prefix are included
+        :param start: the first key to include (inclusive)
+        :param stop: the key to stop at (exclusive)
+        :return: iterator of (key, value) tuples
+        """
+        namespace = self._hash_key(b'')
+        offset = len(namespace)
+
+        if start is not None:
+            start = namespace + start
+        if stop is not None:
+            stop = namespace + stop
+
+        it = self._context_db.iterator(self._context, namespace + prefix, start, stop)
+        for hashed_key, value in it:
+            key = hashed_key[offset:]
+            if self._observer:
+                self._observer.on_get(self._context, key, value)
+            yield key, value
+
     def put(self, key: bytes, value: bytes):
         """
         Sets a value for the specified key.
@@ -16,11 +16,25 @@
 
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from enum import IntEnum
+from threading import Lock
+from typing import TYPE_CHECKING, Optional
+
+from iconcommons.logger import Logger
 
 from ..base.address import Address
-from ..icon_constant import ICON_DEX_DB_NAME
+from ..icon_constant import ICON_DEX_DB_NAME, ICON_DB_LOG_TAG
+from .backend import StorageBackendType
+from .bloom import BloomFilter
+from .cache import LRUCache
 from .db import KeyValueDatabase, ContextDatabase
+from .journal import CommitJournal
+from .pipeline import CommitPipeline
+from .snapshot import SnapshotManager, StateSnapshot
+
+if TYPE_CHECKING:
+    from ..iconscore.icon_score_context import IconScoreContext
 
 
 class ContextDatabaseFactory(object):
@@ -29,24 +43,77 @@ class ContextDatabaseFactory(object):
         SINGLE_DB = 0
         MULTIPLE_DB = 1
 
+    COMMIT_JOURNAL_FILE_NAME = 'commit_journal'
+    BLOOM_FILTER_FILE_EXTENSION = '.bloom'
+    # The number of threads writing shards in MULTIPLE_DB mode
+    MAX_WRITE_WORKERS = 4
+
     _state_db_root_path: str = None
     _mode: 'Mode' = Mode.SINGLE_DB
+    _cache_size: int = 0
+    _bloom_filter_capacity: int = 0
+    _backend_type: str = StorageBackendType.LEVELDB
     _shared_context_db: 'ContextDatabase' = None
+    # db name: ContextDatabase used in MULTIPLE_DB mode
+    _context_dbs: dict = {}
+    _journal: Optional['CommitJournal'] = None
+    _executor: Optional['ThreadPoolExecutor'] = None
+    _pipeline: Optional['CommitPipeline'] = None
+    # Dbs are opened by the background writer as well
+    _open_lock = Lock()
+    # Excludes commits while a snapshot is being taken
+    _commit_lock = Lock()
+    _snapshot_manager: 'SnapshotManager' = SnapshotManager()
 
     @classmethod
-    def open(cls, state_db_root_path: str, mode: 'Mode'):
+    def open(cls,
+             state_db_root_path: str,
+             mode: 'Mode',
+             cache_size: int = 0,
+             backend_type: str = StorageBackendType.LEVELDB,
+             commit_queue_size: int = 0,
+             bloom_filter_capacity: int = 0):
+        """
+
+        :param state_db_root_path:
+        :param mode: SINGLE_DB or MULTIPLE_DB
+        :param cache_size: the size of LRU cache for committed states in bytes.
+            0 means that states are always read from LevelDB
+        :param backend_type: storage backend type (leveldb, memory or mmap)
+        :param commit_queue_size: the maximum number of committed blocks
+            waiting to be written by the background writer.
+            0 means that write_batch() writes synchronously
+        :param bloom_filter_capacity: the expected number of keys in a db
+            for the bloom filter which skips reading absent keys. 0 means no filter
+        """
         cls.close()
 
         cls._state_db_root_path = state_db_root_path
         cls._mode = mode
+        cls._cache_size = cache_size
+        cls._backend_type = backend_type
+        cls._bloom_filter_capacity = bloom_filter_capacity
+
+        if mode == cls.Mode.MULTIPLE_DB:
+            cls._journal = CommitJournal(
+                os.path.join(state_db_root_path, cls.COMMIT_JOURNAL_FILE_NAME))
+            cls._executor = ThreadPoolExecutor(max_workers=cls.MAX_WRITE_WORKERS)
+            cls._recover()
+
+        if commit_queue_size > 0:
+            cls._pipeline = CommitPipeline(cls._write_batch_now, commit_queue_size)
+
+        cls._snapshot_manager = SnapshotManager()
+        if mode == cls.Mode.MULTIPLE_DB:
+            # Snapshots are taken of the opened dbs only
+            cls.get_all_dbs()
 
     @classmethod
     def get_shared_db(cls) -> ContextDatabase:
         if cls._shared_context_db is None:
-            path = os.path.join(cls._state_db_root_path, ICON_DEX_DB_NAME)
-            key_value_db = KeyValueDatabase.from_path(path)
-            cls._shared_context_db = ContextDatabase(
-                key_value_db, is_shared=True)
+            with cls._open_lock:
+                if cls._shared_context_db is None:
+                    cls._shared_context_db = cls._create_context_db(ICON_DEX_DB_NAME)
 
         return cls._shared_context_db
 
@@ -61,12 +128,289 @@ class ContextDatabaseFactory(object):
     def create_by_name(cls, name: str) -> ContextDatabase:
         if cls._mode == cls.Mode.SINGLE_DB:
             return cls.get_shared_db()
+
+        context_db = cls._context_dbs.get(name)
+        if context_db is None:
+            with cls._open_lock:
+                context_db = cls._context_dbs.get(name)
+                if context_db is None:
+                    context_db = cls._create_context_db(name)
+                    cls._context_dbs[name] = context_db
+
+        return context_db
+
+    @classmethod
+    def get_all_dbs(cls) -> list:
+        """Returns all context dbs under the state db root path
+
+        Committed states may not have been written yet in the commit pipeline.
+        Call flush() before reading the dbs directly.
+
+        :return: ContextDatabase list
+        """
+        if cls._mode == cls.Mode.SINGLE_DB:
+            return [cls.get_shared_db()]
+
+        names = [name for name in os.listdir(cls._state_db_root_path)
+                 if os.path.isdir(os.path.join(cls._state_db_root_path, name))]
+        return [cls.create_by_name(name) for name in sorted(names)]
+
+    @classmethod
+    def write_batch(cls, context: Optional['IconScoreContext'], states: dict) -> None:
+        """Writes the states of a block to the databases which own them
+
+        In MULTIPLE_DB mode, the states are split by the owner SCORE
+        and each shard is written in parallel.
+        The commit journal is written in advance when more than one db is involved.
+
+        If the commit pipeline is enabled, the states are queued
+        and written by the background writer. They are visible to reads in the meantime.
+
+        :param context:
+        :param states: block batch. It must not be modified after this call
+        """
+        with cls._commit_lock:
+            cls._snapshot_manager.on_commit()
+
+            if cls._pipeline is not None:
+                cls._pipeline.submit(states)
+            else:
+                cls._write_batch_now(states, context)
+
+    @classmethod
+    def acquire_snapshot(cls) -> 'StateSnapshot':
+        """Returns the snapshot of the states at the last committed block
+
+        The snapshot is shared by the queries until the next commit.
+
+        :return: snapshot which must be released with release_snapshot()
+        """
+        snapshot: Optional['StateSnapshot'] = cls._snapshot_manager.acquire()
+        if snapshot is None:
+            with cls._commit_lock:
+                snapshot = cls._snapshot_manager.acquire(cls._create_snapshot)
+
+        return snapshot
+
+    @classmethod
+    def release_snapshot(cls, snapshot: 'StateSnapshot') -> None:
+        cls._snapshot_manager.release(snapshot)
+
+    @classmethod
+    def get_commit_seq(cls) -> int:
+        """Returns the sequence number of the last commit which is the same as the one of the latest snapshot
+        """
+        return cls._snapshot_manager.seq
+
+    @classmethod
+    def get_snapshot_metrics(cls) -> dict:
+        return cls._snapshot_manager.metrics
+
+    @classmethod
+    def _create_snapshot(cls, manager: 'SnapshotManager', seq: int) -> 'StateSnapshot':
+        # The overlay is frozen before the dbs so that
+        # the states written in the meantime are found in the overlay
+        overlay = None if cls._pipeline is None else cls._pipeline.overlay.freeze()
+
+        if cls._mode == cls.Mode.SINGLE_DB:
+            context_dbs = [cls.get_shared_db()]
         else:
-            path = os.path.join(cls._state_db_root_path, name)
-            return ContextDatabase.from_path(path)
+            with cls._open_lock:
+                context_dbs = list(cls._context_dbs.values())
+                if cls._shared_context_db is not None:
+                    context_dbs.append(cls._shared_context_db)
+
+        db_snapshots = {context_db: context_db.key_value_db.snapshot() for context_db in context_dbs}
+        return StateSnapshot(manager, seq, overlay, db_snapshots)
+
+    @classmethod
+    def flush(cls) -> None:
+        """Blocks until all committed states have been written to the dbs
+        """
+        if cls._pipeline is not None:
+            cls._pipeline.flush()
+
+    @classmethod
+    def get_commit_metrics(cls) -> Optional[dict]:
+        """Returns the commit lag metrics of the commit pipeline
+
+        :return: None if the commit pipeline is disabled
+        """
+        if cls._pipeline is None:
+            return None
+
+        return cls._pipeline.metrics
+
+    @classmethod
+    def _write_batch_now(cls, states: dict, context: Optional['IconScoreContext'] = None) -> None:
+        if cls._mode == cls.Mode.SINGLE_DB:
+            cls.get_shared_db().write_batch(context, states)
+            return
+
+        shards: dict = cls.split_states(states)
+        if len(shards) == 1:
+            name, shard = shards.popitem()
+            cls.create_by_name(name).write_batch(context, shard)
+            return
+
+        cls._journal.write(shards)
+        cls._write_shards(context, shards)
+        cls._journal.remove()
+
+    @staticmethod
+    def get_db_name_by_key(key: bytes) -> str:
+        """Returns the name of the db which owns a given key in MULTIPLE_DB mode
+
+        IconScoreDatabase keys start with b'\\x01' + score address body + b'|'
+        and belong to the db of the SCORE. The others belong to icon_dex db.
+
+        :param key:
+        :return: db name
+        """
+        if len(key) > 22 and key[0] == 1 and key[21] == ord('|'):
+            return key[1:21].hex()
+
+        return ICON_DEX_DB_NAME
+
+    @classmethod
+    def split_states(cls, states: dict) -> dict:
+        """Splits states by the db which owns them
+
+        :param states:
+        :return: db name: states
+        """
+        shards = {}
+        for key, value in states.items():
+            name = cls.get_db_name_by_key(key)
+            shard = shards.get(name)
+            if shard is None:
+                shard = shards[name] = {}
+            shard[key] = value
+
+        return shards
+
+    @classmethod
+    def _write_shards(cls, context: Optional['IconScoreContext'], shards: dict) -> None:
+        futures = [
+            cls._executor.submit(cls.create_by_name(name).write_batch, context, shard)
+            for name, shard in shards.items()
+        ]
+
+        for future in futures:
+            future.result()
+
+    @classmethod
+    def _recover(cls) -> None:
+        """Replays the commit interrupted by a crash
+        """
+        shards: Optional[dict] = cls._journal.read()
+        if shards is None:
+            return
+
+        cls._write_shards(None, shards)
+        cls._journal.remove()
+
+    @classmethod
+    def _create_context_db(cls, name: str) -> 'ContextDatabase':
+        path = os.path.join(cls._state_db_root_path, name)
+        key_value_db = KeyValueDatabase.from_path(path, backend_type=cls._backend_type)
+
+        return ContextDatabase(key_value_db,
+                               is_shared=True,
+                               cache=cls._create_cache(),
+                               pipeline=cls._pipeline,
+                               bloom_filter=cls._create_bloom_filter(name, key_value_db))
+
+    @classmethod
+    def _create_cache(cls) -> Optional['LRUCache']:
+        if cls._cache_size > 0:
+            return LRUCache(cls._cache_size)
+
+        return None
+
+    @classmethod
+    def _get_bloom_filter_path(cls, name: str) -> Optional[str]:
+        # Nothing is left to filter on the next start
+        if cls._backend_type == StorageBackendType.MEMORY:
+            return None
+
+        return os.path.join(cls._state_db_root_path, f'{name}{cls.BLOOM_FILTER_FILE_EXTENSION}')
+
+    @classmethod
+    def _create_bloom_filter(cls, name: str, key_value_db: 'KeyValueDatabase') -> Optional['BloomFilter']:
+        """Loads the bloom filter saved on the last close or rebuilds it from the keys in db
+        """
+        if cls._bloom_filter_capacity <= 0:
+            return None
+
+        path: Optional[str] = cls._get_bloom_filter_path(name)
+        if path is not None:
+            bloom_filter: Optional['BloomFilter'] = BloomFilter.load(path)
+            if bloom_filter is not None and not bloom_filter.is_full():
+                return bloom_filter
+
+        bloom_filter = BloomFilter.build(lambda: (key for key, _ in key_value_db.iterator()),
+                                         cls._bloom_filter_capacity)
+        Logger.info(f'Bloom filter rebuilt: {name} keys={bloom_filter.count} capacity={bloom_filter.capacity}',
+                    ICON_DB_LOG_TAG)
+        return bloom_filter
+
+    @classmethod
+    def get_bloom_filter_metrics(cls) -> Optional[dict]:
+        """Returns the bloom filter metrics summed over the open dbs
+
+        :return: None if the bloom filter is disabled
+        """
+        if cls._bloom_filter_capacity <= 0:
+            return None
+
+        with cls._open_lock:
+            context_dbs = list(cls._context_dbs.values())
+            if cls._shared_context_db is not None:
+                context_dbs.append(cls._shared_context_db)
+
+        metrics = {'keys': 0, 'capacity': 0, 'lookups': 0, 'savedLookups': 0, 'falsePositives': 0}
+        for context_db in context_dbs:
+            for key, value in context_db.bloom_filter.metrics.items():
+                metrics[key] += value
+
+        # The rate among the lookups of absent keys
+        absent_lookups = metrics['savedLookups'] + metrics['falsePositives']
+        metrics['falsePositiveRate'] = metrics['falsePositives'] / absent_lookups if absent_lookups > 0 else 0.0
+        return metrics
 
     @classmethod
     def close(cls):
+        pipeline, cls._pipeline = cls._pipeline, None
+        try:
+            if pipeline:
+                # Every committed state is written before the dbs are closed
+                pipeline.close()
+        finally:
+            cls._snapshot_manager.close()
+            cls._close_dbs()
+
+    @classmethod
+    def _close_dbs(cls):
         if cls._shared_context_db:
-            cls._shared_context_db.key_value_db.close()
+            cls._close_db(ICON_DEX_DB_NAME, cls._shared_context_db)
             cls._shared_context_db = None
+
+        for name, context_db in cls._context_dbs.items():
+            cls._close_db(name, context_db)
+        cls._context_dbs = {}
+
+        if cls._executor:
+            cls._executor.shutdown()
+            cls._executor = None
+        cls._journal = None
+
+    @classmethod
+    def _close_db(cls, name: str, context_db: 'ContextDatabase') -> None:
+        context_db.stop_bloom_filter_growth()
+        context_db.key_value_db.close()
+
+        path: Optional[str] = cls._get_bloom_filter_path(name)
+        if context_db.bloom_filter is not None and path is not None:
+            context_db.bloom_filter.save(path)
+
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import struct
+from typing import Optional
+
+from ..base.exception import DatabaseException
+
+
+class CommitJournal(object):
+    """Redo journal which makes a commit over multiple databases atomic
+
+    The states of a block are written to the journal before they are written to databases
+    and the journal is removed after all databases have been written.
+    If the process crashes in the middle of a commit,
+    the journal left is replayed on the next start.
+    Writing the same states again is harmless because they are absolute values.
+
+    Journal format
+    name length(4) | name | state count(4) | (key length(4) | key | value length(4) | value)*
+    value length 0xffffffff means that the key is deleted.
+    """
+
+    _LENGTH = struct.Struct('>I')
+    _NONE_LENGTH = 0xffffffff
+
+    def __init__(self, path: str) -> None:
+        """Constructor
+
+        :param path: journal file path
+        """
+        self._path = path
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def exists(self) -> bool:
+        return os.path.exists(self._path)
+
+    def write(self, shards: dict) -> None:
+        """Writes the states to be committed durably
+
+        :param shards: db name: states
+        """
+        data = []
+        pack = self._LENGTH.pack
+
+        for name, states in shards.items():
+            name = name.encode()
+            data.append(pack(len(name)))
+            data.append(name)
+            data.append(pack(len(states)))
+
+            for key, value in states.items():
+                data.append(pack(len(key)))
+                data.append(key)
+                if value is None:
+                    data.append(pack(self._NONE_LENGTH))
+                else:
+                    data.append(pack(len(value)))
+                    data.append(value)
+
+        # The journal appears at once so that a torn journal is never replayed
+        tmp_path = f'{self._path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path)
+
+    def read(self) -> Optional[dict]:
+        """Reads the states which have not been committed completely
+
+        :return: db name: states, None if there is no journal
+        """
+        if not self.exists():
+            return None
+
+        with open(self._path, 'rb') as f:
+            data = f.read()
+
+        shards = {}
+        offset = 0
+
+        try:
+            while offset < len(data):
+                name, offset = self._read_bytes(data, offset)
+                count, offset = self._read_length(data, offset)
+
+                states = {}
+                for _ in range(count):
+                    key, offset = self._read_bytes(data, offset)
+                    value, offset = self._read_bytes(data, offset)
+                    states[key] = value
+
+                shards[name.decode()] = states
+        except struct.error:
+            raise DatabaseException(f'Broken commit journal: {self._path}')
+
+        return shards
+
+    def remove(self) -> None:
+        if self.exists():
+            os.remove(self._path)
+
+    def _read_length(self, data: bytes, offset: int) -> tuple:
+        length, = self._LENGTH.unpack_from(data, offset)
+        return length, offset + self._LENGTH.size
+
+    def _read_bytes(self, data: bytes, offset: int) -> tuple:
+        length, offset = self._read_length(data, offset)
+        if length == self._NONE_LENGTH:
+            return None, offset
+
+        end = offset + length
+        if end > len(data):
+            raise struct.error('out of range')
+
+        return data[offset:end], end
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from queue import Queue
+from threading import Condition, Lock, Thread
+from typing import Optional
+
+from iconcommons.logger import Logger
+
+from ..base.exception import DatabaseException
+from ..icon_constant import ICON_DB_LOG_TAG
+
+
+class CommitOverlay(object):
+    """States which have been committed but not written to the db yet
+
+    Reads consult the overlay before the cache and the db
+    so that committed states are visible as soon as commit returns.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        # ((seq, states), ...) from the oldest
+        # The tuple is replaced on every change so that readers need no lock
+        self._entries = ()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def push(self, seq: int, states: dict) -> None:
+        with self._lock:
+            self._entries = self._entries + ((seq, states),)
+
+    def freeze(self) -> 'CommitOverlay':
+        """Returns a copy of the overlay at this moment which is not changed afterwards
+        """
+        overlay = CommitOverlay()
+        overlay._entries = self._entries
+        return overlay
+
+    def pop(self, seq: int) -> None:
+        """Removes the entry which has been written to the db
+        """
+        with self._lock:
+            self._entries = tuple(entry for entry in self._entries if entry[0] != seq)
+
+    def get(self, key: bytes) -> tuple:
+        """Returns the latest value for a given key
+
+        :param key:
+        :return: (found, value). A falsy value is returned as None like the db does
+        """
+        for _, states in reversed(self._entries):
+            if key in states:
+                return True, states[key] or None
+
+        return False, None
+
+    def items(self, is_in_range: callable) -> dict:
+        """Returns the latest states whose keys are in range
+
+        :param is_in_range: returns True if a key is in range
+        :return: key: value. A deleted key has None value
+        """
+        items = {}
+        for _, states in self._entries:
+            for key, value in states.items():
+                if is_in_range(key):
+                    items[key] = value or None
+
+        return items
+
+
+class CommitPipeline(object):
+    """Writes committed states to the db on a background thread
+
+    Committed states are put into CommitOverlay and queued.
+    The writer thread writes them in commit order and removes them from the overlay.
+    The queue is bounded, so commit blocks when the writer falls behind too much.
+    If a write fails, the pipeline stops and the error is raised on the next submit or flush.
+    """
+
+    def __init__(self, write_func: callable, max_pending: int) -> None:
+        """Constructor
+
+        :param write_func: writes states to the db synchronously
+        :param max_pending: the maximum number of queued states
+        """
+        self._write_func = write_func
+        self._overlay = CommitOverlay()
+        self._queue = Queue(maxsize=max_pending)
+        self._condition = Condition()
+        self._submitted = 0
+        self._written = 0
+        self._error: Optional[BaseException] = None
+
+        # Commit lag: the time from submit to the end of the write
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+        self._total_lag = 0.0
+        self._write_time = 0.0
+
+        self._thread = Thread(target=self._run, name='CommitWriter', daemon=True)
+        self._thread.start()
+
+    @property
+    def overlay(self) -> 'CommitOverlay':
+        return self._overlay
+
+    @property
+    def pending_count(self) -> int:
+        with self._condition:
+            return self._submitted - self._written
+
+    @property
+    def metrics(self) -> dict:
+        with self._condition:
+            written = self._written
+            return {
+                'pending': self._submitted - written,
+                'written': written,
+                'lastLag': self._last_lag,
+                'maxLag': self._max_lag,
+                'averageLag': self._total_lag / written if written > 0 else 0.0,
+                'writeTime': self._write_time
+            }
+
+    def submit(self, states: dict) -> None:
+        """Queues states to be written
+
+        The states become visible through the overlay immediately.
+        This method blocks while the queue is full.
+
+        :param states: states to write. It must not be modified afterwards
+        """
+        with self._condition:
+            self._raise_if_failed()
+            self._submitted += 1
+            seq = self._submitted
+
+        self._overlay.push(seq, states)
+        self._queue.put((seq, states, time.monotonic()))
+
+    def flush(self) -> None:
+        """Durability barrier
+
+        Blocks until all submitted states have been written to the db
+        """
+        with self._condition:
+            while self._written < self._submitted and self._error is None:
+                self._condition.wait()
+            self._raise_if_failed()
+
+    def close(self) -> None:
+        """Writes all submitted states and stops the writer thread
+        """
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise DatabaseException(f'Commit pipeline stopped: {self._error}')
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            if self._error is not None:
+                # Drains the queue not to block submit() after failure
+                continue
+
+            seq, states, submitted_at = item
+            started_at = time.monotonic()
+            try:
+                self._write_func(states)
+            except BaseException as e:
+                Logger.exception(f'Failed to write committed states: {e}', ICON_DB_LOG_TAG)
+                with self._condition:
+                    self._error = e
+                    self._condition.notify_all()
+                continue
+
+            self._overlay.pop(seq)
+
+            finished_at = time.monotonic()
+            lag = finished_at - submitted_at
+            with self._condition:
+                self._written = seq
+                self._last_lag = lag
+                self._max_lag = max(self._max_lag, lag)
+                self._total_lag += lag
+                self._write_time += finished_at - started_at
+                self._condition.notify_all()
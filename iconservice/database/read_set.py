@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Optional
+
+
+class ReadSet(object):
+    """Keys and key ranges which a transaction has read through ContextDatabase
+
+    It is used to find out whether a transaction executed before its block arrives
+    has read a state which is written after it, by a commit or an earlier transaction in the block.
+    """
+
+    def __init__(self) -> None:
+        self._keys = set()
+        # (prefix, start, stop) read by iterators
+        self._ranges = []
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._ranges)
+
+    def add(self, key: bytes) -> None:
+        self._keys.add(key)
+
+    def update(self, keys: list) -> None:
+        self._keys.update(keys)
+
+    def add_range(self, prefix: bytes, start: Optional[bytes], stop: Optional[bytes]) -> None:
+        self._ranges.append((prefix, start, stop))
+
+    def conflicts_with(self, written_keys: set) -> bool:
+        """Returns True if any of written_keys has been read
+
+        :param written_keys: keys written by the earlier transactions
+        :return:
+        """
+        if not self._keys.isdisjoint(written_keys):
+            return True
+
+        for prefix, start, stop in self._ranges:
+            for key in written_keys:
+                if key.startswith(prefix) \
+                        and (start is None or key >= start) \
+                        and (stop is None or key < stop):
+                    return True
+
+        return False
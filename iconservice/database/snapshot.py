@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from threading import Lock
+from typing import TYPE_CHECKING, Optional
+
+from .backend import get_iterator_range
+
+if TYPE_CHECKING:
+    from .db import ContextDatabase
+    from .pipeline import CommitOverlay
+
+
+class StateSnapshot(object):
+    """Committed states of all state dbs at a block
+
+    It consists of the committed states which are not written yet (CommitOverlay)
+    and a db snapshot of each ContextDatabase taken at the same moment.
+    So a query bound to it never sees a block applied halfway.
+
+    The cache of a ContextDatabase is used only while no block has been committed
+    since the snapshot was taken.
+    """
+
+    def __init__(self,
+                 manager: 'SnapshotManager',
+                 seq: int,
+                 overlay: Optional['CommitOverlay'],
+                 db_snapshots: dict) -> None:
+        """Constructor
+
+        :param manager: the manager which counts references to this snapshot
+        :param seq: commit sequence number at the moment
+        :param overlay: frozen overlay. None if the commit pipeline is disabled
+        :param db_snapshots: ContextDatabase: db snapshot
+            A db which is not included had no states at the moment
+        """
+        self._manager = manager
+        self._seq = seq
+        self._overlay = overlay
+        self._db_snapshots = db_snapshots
+        self._refcount = 0
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    @property
+    def refcount(self) -> int:
+        return self._refcount
+
+    def is_latest(self) -> bool:
+        """Returns True if no block has been committed since the snapshot was taken
+        """
+        return self._seq == self._manager.seq
+
+    def get(self, context_db: 'ContextDatabase', key: bytes) -> Optional[bytes]:
+        if self._overlay is not None:
+            found, value = self._overlay.get(key)
+            if found:
+                return value
+
+        cache = context_db.cache if self.is_latest() else None
+        if cache is not None:
+            version = cache.version
+            value = cache.get(key)
+            # A commit may have started while reading the cache
+            if not self.is_latest():
+                cache = None
+            elif value is not None:
+                return value
+
+        db_snapshot = self._db_snapshots.get(context_db)
+        if db_snapshot is None:
+            return None
+
+        # The filter holds every key in the snapshot because keys are never removed from it
+        bloom_filter = context_db.bloom_filter
+        if bloom_filter is not None and not bloom_filter.might_contain(key):
+            return None
+
+        value = db_snapshot.get(key)
+        if value is None:
+            if bloom_filter is not None:
+                bloom_filter.on_false_positive()
+        elif cache is not None:
+            cache.fill(key, value, version)
+
+        return value
+
+    def get_many(self, context_db: 'ContextDatabase', keys: list) -> list:
+        return [self.get(context_db, key) for key in keys]
+
+    def overlay_items(self, is_in_range: callable) -> dict:
+        """Returns the committed states in range which were not written at the moment
+
+        :param is_in_range: returns True if a key is in range
+        :return: key: value. A deleted key has None value
+        """
+        if self._overlay is None:
+            return {}
+
+        return self._overlay.items(is_in_range)
+
+    def iterator(self,
+                 context_db: 'ContextDatabase',
+                 prefix: Optional[bytes],
+                 start: Optional[bytes],
+                 stop: Optional[bytes]) -> iter:
+        """Returns an iterator over the states of a db at the moment
+
+        States in the overlay are not included. See overlay_items()
+        """
+        db_snapshot = self._db_snapshots.get(context_db)
+        if db_snapshot is None:
+            return _EmptyIterator()
+
+        start, stop = get_iterator_range(prefix, start, stop)
+        return db_snapshot.iterator(start=start, stop=stop)
+
+    def close(self) -> None:
+        for db_snapshot in self._db_snapshots.values():
+            db_snapshot.close()
+        self._db_snapshots = {}
+
+
+class _EmptyIterator(object):
+    def close(self) -> None:
+        pass
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        raise StopIteration
+
+
+class SnapshotManager(object):
+    """Shares one StateSnapshot among the queries made between two commits
+
+    The snapshot of the last committed block is taken by the first query after a commit.
+    A snapshot is closed when it is replaced by a newer one and no query refers to it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._seq = 0
+        self._current: Optional['StateSnapshot'] = None
+        self._alive = set()
+
+        self._created = 0
+        self._acquired = 0
+        self._max_refcount = 0
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    @property
+    def metrics(self) -> dict:
+        with self._lock:
+            current = self._current
+            return {
+                'commitSeq': self._seq,
+                'aliveSnapshots': len(self._alive),
+                'createdSnapshots': self._created,
+                'acquired': self._acquired,
+                'refcount': 0 if current is None else current.refcount,
+                'maxRefcount': self._max_refcount
+            }
+
+    def acquire(self, create_func: Optional[callable] = None) -> Optional['StateSnapshot']:
+        """Returns the snapshot of the last committed block increasing its reference count
+
+        :param create_func: takes a snapshot if there is none. It is called with (self, seq).
+            The caller must exclude commits while this method runs with create_func
+        :return: snapshot which must be released with release()
+            None if there is no snapshot and create_func is not given
+        """
+        with self._lock:
+            snapshot = self._current
+            if snapshot is None:
+                if create_func is None:
+                    return None
+
+                snapshot = self._current = create_func(self, self._seq)
+                self._alive.add(snapshot)
+                self._created += 1
+
+            snapshot._refcount += 1
+            self._acquired += 1
+            self._max_refcount = max(self._max_refcount, snapshot._refcount)
+
+            return snapshot
+
+    def release(self, snapshot: 'StateSnapshot') -> None:
+        with self._lock:
+            snapshot._refcount -= 1
+            if snapshot._refcount == 0 and snapshot is not self._current:
+                self._close(snapshot)
+
+    def on_commit(self) -> None:
+        """Called before the states of a new block are applied
+        """
+        with self._lock:
+            self._seq += 1
+
+            snapshot, self._current = self._current, None
+            if snapshot is not None and snapshot._refcount == 0:
+                self._close(snapshot)
+
+    def close(self) -> None:
+        with self._lock:
+            for snapshot in self._alive:
+                snapshot.close()
+            self._alive.clear()
+            self._current = None
+
+    def _close(self, snapshot: 'StateSnapshot') -> None:
+        snapshot.close()
+        self._alive.discard(snapshot)
@@ -0,0 +1,629 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import shutil
+import struct
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, Tuple
+
+from ..base.exception import InvalidParamsException, DatabaseException
+from .cache import LRUCache
+from .db import KeyValueDatabase
+
+if TYPE_CHECKING:
+    from .db import ContextDatabase
+
+# Every trie node is stored in the state db with this prefix and its hash
+TRIE_NODE_PREFIX = b'trie|'
+# The root hash of the state trie of the last committed block
+TRIE_ROOT_KEY = b'trie_root'
+# The hashes of the nodes replaced by a block are stored with this prefix and the block height
+TRIE_STALE_PREFIX = b'trie_stale|'
+# The root hash of an empty trie
+EMPTY_TRIE_ROOT = hashlib.sha3_256(b'').digest()
+# The number of nodes written at once while building a trie
+BUILD_FLUSH_SIZE = 10_000
+
+_LEAF = 0
+_EXTENSION = 1
+_BRANCH = 2
+
+_LENGTH = struct.Struct('>I')
+
+
+def _to_nibbles(key: bytes) -> bytes:
+    """Returns the path of a state key in the trie
+
+    Keys are hashed so that every path has the same length (64 nibbles)
+    """
+    return _bytes_to_nibbles(hashlib.sha3_256(key).digest())
+
+
+def _bytes_to_nibbles(data: bytes) -> bytes:
+    nibbles = bytearray()
+    for b in data:
+        nibbles.append(b >> 4)
+        nibbles.append(b & 0x0f)
+
+    return bytes(nibbles)
+
+
+def _common_prefix_length(a: bytes, b: bytes) -> int:
+    length = min(len(a), len(b))
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+
+    return length
+
+
+def _encode(node_type: int, fields: list) -> bytes:
+    data = [bytes([node_type])]
+    for field in fields:
+        data.append(_LENGTH.pack(len(field)))
+        data.append(field)
+
+    return b''.join(data)
+
+
+def _decode(data: bytes) -> tuple:
+    """Decodes a node
+
+    :return: (node type, fields)
+    """
+    node_type = data[0]
+    fields = []
+    offset = 1
+
+    while offset < len(data):
+        length, = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        fields.append(data[offset:offset + length])
+        offset += length
+
+    return node_type, fields
+
+
+def _is_excluded_key(key: bytes) -> bool:
+    return key.startswith(TRIE_NODE_PREFIX) or key.startswith(TRIE_STALE_PREFIX) or key == TRIE_ROOT_KEY
+
+
+def _get_stale_key(height: int) -> bytes:
+    return TRIE_STALE_PREFIX + height.to_bytes(8, 'big')
+
+
+def _split_hashes(data: bytes) -> list:
+    return [data[i:i + 32] for i in range(0, len(data), 32)]
+
+
+class _PendingNodes(dict):
+    """New nodes made during an update: node hash: encoded node
+
+    :param uncommitted: the trie states of uncommitted parent blocks from the newest
+    """
+
+    def __init__(self, uncommitted: Optional[list]) -> None:
+        super().__init__()
+        self.uncommitted = uncommitted or ()
+        # The nodes made before the update and replaced during it
+        self.stale = set()
+
+    def replace(self, node_hash: bytes) -> None:
+        if node_hash not in self:
+            self.stale.add(node_hash)
+
+
+class StateTrie(object):
+    """Merkle Patricia trie over the states in the state db
+
+    Leaf: path | value
+    Extension: path | child hash
+    Branch: 16 child hashes (empty bytes if a child does not exist)
+
+    A node is referred by sha3_256 of its encoded bytes.
+    Nodes are never modified, so an update creates new nodes
+    from the changed leaves to the root and they are committed with the block.
+    The nodes replaced by a block are recorded with its height
+    and removed by prune() once the block is older than the retention period.
+    """
+
+    def __init__(self, db: 'ContextDatabase', cache_size: int, retention: int = 0) -> None:
+        """Constructor
+
+        :param db: the db where trie nodes are stored
+        :param cache_size: the size of node cache in bytes
+        :param retention: the number of the latest blocks whose replaced nodes are kept.
+            0 means that the nodes are never removed
+        """
+        self._db = db
+        self._cache = LRUCache(cache_size) if cache_size > 0 else None
+        self._retention = retention
+        # height: the hashes of the nodes replaced at the height. Loaded on the first prune()
+        self._stale_nodes: Optional[dict] = None
+        # node hash: the height where the node is replaced
+        self._stale_heights: dict = {}
+
+    @property
+    def cache(self) -> Optional['LRUCache']:
+        return self._cache
+
+    def get_committed_root(self) -> Optional[bytes]:
+        """Returns the root hash of the last committed block
+
+        :return: None if the state trie has never been built
+        """
+        return self._db.get(None, TRIE_ROOT_KEY)
+
+    def build(self, states: Iterable[Tuple[bytes, bytes]], work_path: str,
+              write: Callable[[dict], None], flush_size: int = BUILD_FLUSH_SIZE) -> bytes:
+        """Builds the trie of given states from scratch
+
+        The states are sorted by their paths in a temporary db
+        and the nodes are made bottom-up in one pass.
+        Only the branches on the path of the current leaf are kept in memory
+        and the other nodes are written every flush_size nodes.
+        The root hash is written last, so an interrupted build starts over.
+
+        :param states: (key, value) pairs. Keys excluded from the trie are skipped
+        :param work_path: the path of the temporary db which is removed after the build
+        :param write: writes the states of the nodes to the db like ContextDatabase.write_batch()
+        :param flush_size: the number of nodes written at once
+        :return: root hash
+        """
+        shutil.rmtree(work_path, ignore_errors=True)
+        sort_db = KeyValueDatabase.from_path(work_path)
+
+        try:
+            batch = {}
+            for key, value in states:
+                if value and not _is_excluded_key(key):
+                    batch[hashlib.sha3_256(key).digest()] = value
+                    if len(batch) >= flush_size:
+                        sort_db.write_batch(batch)
+                        batch.clear()
+            sort_db.write_batch(batch)
+
+            nodes = {}
+
+            def put_node(node_type: int, fields: list) -> bytes:
+                data = _encode(node_type, fields)
+                node_hash = hashlib.sha3_256(data).digest()
+                nodes[TRIE_NODE_PREFIX + node_hash] = data
+                if len(nodes) >= flush_size:
+                    write(dict(nodes))
+                    nodes.clear()
+                return node_hash
+
+            leaves = ((_bytes_to_nibbles(key), value) for key, value in sort_db.iterator())
+            root = self._build_nodes(leaves, put_node)
+        finally:
+            sort_db.close()
+            shutil.rmtree(work_path, ignore_errors=True)
+
+        nodes[TRIE_ROOT_KEY] = root
+        write(nodes)
+        return root
+
+    @staticmethod
+    def _build_nodes(leaves: Iterable[Tuple[bytes, bytes]], put_node: Callable[[int, list], bytes]) -> bytes:
+        """Makes the nodes of the leaves sorted by their paths
+
+        A leaf hangs on the branch at the longest common prefix with its neighbours.
+        Once no following leaf goes under a branch, the branch is made
+        and hung on its parent with an extension if nibbles are skipped between them.
+
+        :param leaves: (path, value) pairs in path order
+        :param put_node: makes a node and returns its hash
+        :return: root hash
+        """
+        # (depth, children) of the open branches from the root
+        stack = []
+        root = EMPTY_TRIE_ROOT
+        prev_path = None
+
+        leaves = iter(leaves)
+        current = next(leaves, None)
+        while current is not None:
+            path, value = current
+            following = next(leaves, None)
+            prev_common = -1 if prev_path is None else _common_prefix_length(prev_path, path)
+            next_common = -1 if following is None else _common_prefix_length(path, following[0])
+
+            depth = max(prev_common, next_common)
+            if depth < 0:
+                # The only leaf
+                root = put_node(_LEAF, [path, value])
+
+            else:
+                if not stack or stack[-1][0] < depth:
+                    stack.append((depth, [b''] * 16))
+                stack[-1][1][path[depth]] = put_node(_LEAF, [path[depth + 1:], value])
+
+                while stack and stack[-1][0] > next_common:
+                    branch_depth, children = stack.pop()
+                    child = put_node(_BRANCH, children)
+
+                    if stack and stack[-1][0] >= next_common:
+                        parent_depth = stack[-1][0]
+                    else:
+                        parent_depth = next_common
+                        if parent_depth >= 0:
+                            stack.append((parent_depth, [b''] * 16))
+
+                    if branch_depth > parent_depth + 1:
+                        child = put_node(_EXTENSION, [path[parent_depth + 1:branch_depth], child])
+
+                    if parent_depth < 0:
+                        root = child
+                    else:
+                        stack[-1][1][path[parent_depth]] = child
+
+            prev_path = path
+            current = following
+
+        return root
+
+    def update(self, root: bytes, states: dict, uncommitted: Optional[list] = None,
+               height: Optional[int] = None) -> Tuple[bytes, dict]:
+        """Applies changed states to a trie
+
+        :param root: the root hash to start with
+        :param states: changed states. A falsy value means deletion like write_batch()
+        :param uncommitted: the trie states returned by update() for the uncommitted parent blocks
+            from the newest. The root may refer to their nodes
+        :param height: the height of the block which changes the states.
+            The replaced nodes are recorded with it if pruning is enabled
+        :return: (new root hash, the states to be written to commit the trie)
+            The states contain new nodes, the new root hash and the replaced nodes
+        """
+        pending = _PendingNodes(uncommitted)
+        node_hash = None if root == EMPTY_TRIE_ROOT else root
+
+        for key, value in states.items():
+            if _is_excluded_key(key):
+                continue
+
+            path = _to_nibbles(key)
+            if value:
+                node_hash = self._insert(pending, node_hash, path, value)
+            else:
+                node_hash = self._delete(pending, node_hash, path)
+
+        new_root = EMPTY_TRIE_ROOT if node_hash is None else node_hash
+
+        trie_states = {}
+        self._collect_new_nodes(pending, node_hash, trie_states)
+        trie_states[TRIE_ROOT_KEY] = new_root
+
+        if height is not None and self._retention > 0:
+            # A node made again in the update is still in use
+            stale = [node_hash for node_hash in pending.stale if TRIE_NODE_PREFIX + node_hash not in trie_states]
+            if stale:
+                trie_states[_get_stale_key(height)] = b''.join(sorted(stale))
+
+        return new_root, trie_states
+
+    def prune(self, trie_states: dict, height: int) -> dict:
+        """Returns the states which remove the nodes replaced before the retention period
+
+        They are written with the trie states of the committed block.
+
+        :param trie_states: the states returned by update() for the committed block
+        :param height: the height of the committed block
+        :return: the states to be written with the trie states
+        """
+        if self._retention <= 0:
+            return {}
+
+        self._load_stale_nodes()
+        new_hashes = {key[len(TRIE_NODE_PREFIX):] for key in trie_states if key.startswith(TRIE_NODE_PREFIX)}
+        dirty_heights = set()
+
+        # The nodes made again are in use
+        for node_hash in new_hashes:
+            stale_height = self._stale_heights.pop(node_hash, None)
+            if stale_height is not None:
+                self._stale_nodes[stale_height].discard(node_hash)
+                dirty_heights.add(stale_height)
+
+        for key, value in trie_states.items():
+            if not key.startswith(TRIE_STALE_PREFIX):
+                continue
+
+            # A node which is both made and replaced in the merged blocks is kept
+            stale_height = int.from_bytes(key[len(TRIE_STALE_PREFIX):], 'big')
+            hashes = self._stale_nodes.setdefault(stale_height, set())
+            for node_hash in _split_hashes(value):
+                if node_hash not in new_hashes:
+                    hashes.add(node_hash)
+                    self._stale_heights[node_hash] = stale_height
+            dirty_heights.add(stale_height)
+
+        states = {}
+        last_height = height - self._retention
+        for stale_height in sorted(h for h in self._stale_nodes if h <= last_height):
+            for node_hash in self._stale_nodes.pop(stale_height):
+                del self._stale_heights[node_hash]
+                states[TRIE_NODE_PREFIX + node_hash] = None
+            states[_get_stale_key(stale_height)] = None
+            dirty_heights.discard(stale_height)
+
+        for stale_height in dirty_heights:
+            hashes = self._stale_nodes[stale_height]
+            if hashes:
+                states[_get_stale_key(stale_height)] = b''.join(sorted(hashes))
+            else:
+                del self._stale_nodes[stale_height]
+                states[_get_stale_key(stale_height)] = None
+
+        return states
+
+    def _load_stale_nodes(self) -> None:
+        if self._stale_nodes is not None:
+            return
+
+        self._stale_nodes = {}
+        self._stale_heights = {}
+        for key, value in self._db.iterator(None, TRIE_STALE_PREFIX):
+            stale_height = int.from_bytes(key[len(TRIE_STALE_PREFIX):], 'big')
+            hashes = _split_hashes(value)
+            self._stale_nodes[stale_height] = set(hashes)
+            for node_hash in hashes:
+                self._stale_heights[node_hash] = stale_height
+
+    def commit(self, trie_states: dict) -> None:
+        """Caches nodes which have been written to the db and drops the removed ones
+
+        :param trie_states: the states returned by update() and prune()
+        """
+        if self._cache is None:
+            return
+
+        for key, value in trie_states.items():
+            if key.startswith(TRIE_NODE_PREFIX):
+                self._cache.put(key[len(TRIE_NODE_PREFIX):], value)
+
+    def get_proof(self, root: bytes, key: bytes) -> list:
+        """Returns the nodes from the root to the leaf of a given key
+
+        If the key does not exist, the nodes prove its absence.
+
+        :param root: root hash
+        :param key: state key
+        :return: encoded nodes
+        """
+        proof = []
+        if root == EMPTY_TRIE_ROOT:
+            return proof
+
+        path = _to_nibbles(key)
+        node_hash = root
+
+        while node_hash is not None:
+            data = self._get_node(None, node_hash)
+            proof.append(data)
+            node_type, fields = _decode(data)
+
+            if node_type == _LEAF:
+                break
+            elif node_type == _EXTENSION:
+                if path[:len(fields[0])] != fields[0]:
+                    break
+                path = path[len(fields[0]):]
+                node_hash = fields[1]
+            else:
+                node_hash = fields[path[0]] or None
+                path = path[1:]
+
+        return proof
+
+    @staticmethod
+    def verify_proof(root: bytes, key: bytes, proof: list) -> Optional[bytes]:
+        """Verifies a proof made by get_proof()
+
+        :param root: root hash
+        :param key: state key
+        :param proof: encoded nodes
+        :return: the value of the key or None if the key does not exist
+        """
+        if root == EMPTY_TRIE_ROOT and len(proof) == 0:
+            return None
+
+        path = _to_nibbles(key)
+        expected_hash = root
+
+        for data in proof:
+            if hashlib.sha3_256(data).digest() != expected_hash:
+                raise InvalidParamsException('Invalid proof: hash mismatch')
+
+            node_type, fields = _decode(data)
+            if node_type == _LEAF:
+                return fields[1] if fields[0] == path else None
+            elif node_type == _EXTENSION:
+                if path[:len(fields[0])] != fields[0]:
+                    return None
+                path = path[len(fields[0]):]
+                expected_hash = fields[1]
+            else:
+                expected_hash = fields[path[0]]
+                path = path[1:]
+                if not expected_hash:
+                    return None
+
+        raise InvalidParamsException('Invalid proof: incomplete')
+
+    def _get_node(self, pending: Optional['_PendingNodes'], node_hash: bytes) -> bytes:
+        if pending is not None:
+            data = pending.get(node_hash)
+            if data is not None:
+                return data
+
+            for trie_states in pending.uncommitted:
+                data = trie_states.get(TRIE_NODE_PREFIX + node_hash)
+                if data is not None:
+                    return data
+
+        cache = self._cache
+        if cache is not None:
+            data = cache.get(node_hash)
+            if data is not None:
+                return data
+
+            version = cache.version
+
+        data = self._db.get(None, TRIE_NODE_PREFIX + node_hash)
+        if data is None:
+            raise DatabaseException(f'Trie node not found: {node_hash.hex()}')
+
+        if cache is not None:
+            cache.fill(node_hash, data, version)
+
+        return data
+
+    @staticmethod
+    def _put_node(pending: dict, node_type: int, fields: list) -> bytes:
+        data = _encode(node_type, fields)
+        node_hash = hashlib.sha3_256(data).digest()
+        pending[node_hash] = data
+        return node_hash
+
+    def _insert(self, pending: '_PendingNodes', node_hash: Optional[bytes], path: bytes, value: bytes) -> bytes:
+        new_hash = self._insert_node(pending, node_hash, path, value)
+        if node_hash is not None and new_hash != node_hash:
+            pending.replace(node_hash)
+
+        return new_hash
+
+    def _insert_node(self, pending: '_PendingNodes', node_hash: Optional[bytes], path: bytes, value: bytes) -> bytes:
+        if node_hash is None:
+            return self._put_node(pending, _LEAF, [path, value])
+
+        node_type, fields = _decode(self._get_node(pending, node_hash))
+
+        if node_type == _BRANCH:
+            index = path[0]
+            child = fields[index] or None
+            fields[index] = self._insert(pending, child, path[1:], value)
+            return self._put_node(pending, _BRANCH, fields)
+
+        node_path = fields[0]
+        if node_type == _LEAF and node_path == path:
+            return self._put_node(pending, _LEAF, [path, value])
+
+        common = _common_prefix_length(node_path, path)
+        if node_type == _EXTENSION and common == len(node_path):
+            child = self._insert(pending, fields[1], path[common:], value)
+            return self._put_node(pending, _EXTENSION, [node_path, child])
+
+        # Split the node with a branch at the first different nibble
+        children = [b''] * 16
+        rest = node_path[common + 1:]
+        if node_type == _LEAF:
+            children[node_path[common]] = self._put_node(pending, _LEAF, [rest, fields[1]])
+        elif rest:
+            children[node_path[common]] = self._put_node(pending, _EXTENSION, [rest, fields[1]])
+        else:
+            children[node_path[common]] = fields[1]
+        children[path[common]] = self._put_node(pending, _LEAF, [path[common + 1:], value])
+
+        branch_hash = self._put_node(pending, _BRANCH, children)
+        if common == 0:
+            return branch_hash
+
+        return self._put_node(pending, _EXTENSION, [path[:common], branch_hash])
+
+    def _delete(self, pending: '_PendingNodes', node_hash: Optional[bytes], path: bytes) -> Optional[bytes]:
+        new_hash = self._delete_node(pending, node_hash, path)
+        if node_hash is not None and new_hash != node_hash:
+            pending.replace(node_hash)
+
+        return new_hash
+
+    def _delete_node(self, pending: '_PendingNodes', node_hash: Optional[bytes], path: bytes) -> Optional[bytes]:
+        if node_hash is None:
+            return None
+
+        node_type, fields = _decode(self._get_node(pending, node_hash))
+
+        if node_type == _LEAF:
+            return None if fields[0] == path else node_hash
+
+        if node_type == _EXTENSION:
+            node_path = fields[0]
+            if path[:len(node_path)] != node_path:
+                return node_hash
+
+            child = self._delete(pending, fields[1], path[len(node_path):])
+            if child == fields[1]:
+                return node_hash
+            if child is None:
+                return None
+
+            return self._join_path(pending, node_path, child)
+
+        index = path[0]
+        child = fields[index] or None
+        new_child = self._delete(pending, child, path[1:])
+        if new_child == child:
+            return node_hash
+
+        fields[index] = new_child or b''
+        remaining = [i for i, child in enumerate(fields) if child]
+        if len(remaining) == 0:
+            return None
+        if len(remaining) == 1:
+            # A branch with one child is merged into its child
+            i = remaining[0]
+            return self._join_path(pending, bytes([i]), fields[i])
+
+        return self._put_node(pending, _BRANCH, fields)
+
+    def _join_path(self, pending: '_PendingNodes', path: bytes, child_hash: bytes) -> bytes:
+        """Returns a node which has the path followed by the child
+
+        A leaf or an extension child is replaced with the node.
+        """
+        node_type, fields = _decode(self._get_node(pending, child_hash))
+        if node_type == _LEAF:
+            pending.replace(child_hash)
+            return self._put_node(pending, _LEAF, [path + fields[0], fields[1]])
+        if node_type == _EXTENSION:
+            pending.replace(child_hash)
+            return self._put_node(pending, _EXTENSION, [path + fields[0], fields[1]])
+
+        return self._put_node(pending, _EXTENSION, [path, child_hash])
+
+    def _collect_new_nodes(self, pending: dict, node_hash: Optional[bytes], trie_states: dict) -> None:
+        """Collects the new nodes reachable from the root
+        skipping the intermediate ones replaced during the update
+        """
+        if node_hash is None:
+            return
+
+        data = pending.get(node_hash)
+        if data is None:
+            # Committed already
+            return
+
+        trie_states[TRIE_NODE_PREFIX + node_hash] = data
+
+        node_type, fields = _decode(data)
+        if node_type == _EXTENSION:
+            self._collect_new_nodes(pending, fields[1], trie_states)
+        elif node_type == _BRANCH:
+            for child in fields:
+                if child:
+                    self._collect_new_nodes(pending, child, trie_states)
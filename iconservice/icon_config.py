@@ -11,7 +11,10 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from .icon_constant import ConfigKey
+from .icon_constant import ConfigKey, DEFAULT_STATE_DB_CACHE_SIZE, DEFAULT_STATE_DB_BACKEND, \
+    DEFAULT_STATE_TRIE_CACHE_SIZE, DEFAULT_COMMIT_QUEUE_SIZE, DEFAULT_QUERY_THREAD_COUNT, \
+    DEFAULT_STATE_DB_BLOOM_FILTER_CAPACITY, DEFAULT_PRE_EXECUTION_CACHE_SIZE, \
+    DEFAULT_SYNC_FLUSH_BLOCKS, DEFAULT_SYNC_FLUSH_BYTES, DEFAULT_STATE_TRIE_RETENTION, DEFAULT_LAZY_PARAMS_MIN_TX_COUNT
 
 
 default_icon_config = {
@@ -20,6 +23,26 @@ default_icon_config = {
     },
     ConfigKey.SCORE_ROOT_PATH: ".score",
     ConfigKey.STATE_DB_ROOT_PATH: ".statedb",
+    ConfigKey.STATE_DB_CACHE: True,
+    ConfigKey.STATE_DB_CACHE_SIZE: DEFAULT_STATE_DB_CACHE_SIZE,
+    ConfigKey.STATE_DB_BACKEND: DEFAULT_STATE_DB_BACKEND,
+    ConfigKey.STATE_DB_SHARDING: False,
+    ConfigKey.STATE_DB_BLOOM_FILTER: True,
+    ConfigKey.STATE_DB_BLOOM_FILTER_CAPACITY: DEFAULT_STATE_DB_BLOOM_FILTER_CAPACITY,
+    ConfigKey.STATE_TRIE_CACHE_SIZE: DEFAULT_STATE_TRIE_CACHE_SIZE,
+    ConfigKey.STATE_TRIE_RETENTION: DEFAULT_STATE_TRIE_RETENTION,
+    ConfigKey.STATE_TRIE_MIGRATION: False,
+    ConfigKey.ASYNC_COMMIT: False,
+    ConfigKey.COMMIT_QUEUE_SIZE: DEFAULT_COMMIT_QUEUE_SIZE,
+    ConfigKey.QUERY_THREAD_COUNT: DEFAULT_QUERY_THREAD_COUNT,
+    ConfigKey.LAZY_PARAMS_MIN_TX_COUNT: DEFAULT_LAZY_PARAMS_MIN_TX_COUNT,
+    ConfigKey.ACCOUNT_CACHE: True,
+    ConfigKey.ACCOUNT_PREFETCH: True,
+    ConfigKey.PRE_EXECUTION: False,
+    ConfigKey.PRE_EXECUTION_CACHE_SIZE: DEFAULT_PRE_EXECUTION_CACHE_SIZE,
+    ConfigKey.TX_CHECKPOINT: False,
+    ConfigKey.SYNC_FLUSH_BLOCKS: DEFAULT_SYNC_FLUSH_BLOCKS,
+    ConfigKey.SYNC_FLUSH_BYTES: DEFAULT_SYNC_FLUSH_BYTES,
     ConfigKey.CHANNEL: "loopchain_default",
     ConfigKey.AMQP_KEY: "7100",
     ConfigKey.AMQP_TARGET: "127.0.0.1",
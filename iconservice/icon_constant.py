@@ -40,6 +40,30 @@ MAX_EXTERNAL_CALL_COUNT = 1 + 1024
 MAX_CALL_STACK_SIZE = 64
 
 ICON_DEX_DB_NAME = 'icon_dex'
+# Default size of LRU cache for committed states: 64MB
+DEFAULT_STATE_DB_CACHE_SIZE = 64 * 1024 * 1024
+# Default storage backend of state db: leveldb, memory or mmap
+DEFAULT_STATE_DB_BACKEND = 'leveldb'
+# Default number of keys per state db which the bloom filter holds at 1% false positive rate
+DEFAULT_STATE_DB_BLOOM_FILTER_CAPACITY = 1024 * 1024
+# Default size of state trie node cache: 16MB
+DEFAULT_STATE_TRIE_CACHE_SIZE = 16 * 1024 * 1024
+# Default number of the latest blocks whose replaced state trie nodes are kept
+DEFAULT_STATE_TRIE_RETENTION = 10
+# Default number of committed blocks waiting to be written in the commit pipeline
+DEFAULT_COMMIT_QUEUE_SIZE = 4
+# Default number of threads which run queries concurrently on state snapshots
+DEFAULT_QUERY_THREAD_COUNT = 1
+# Default number of the transactions pre-executed in the transaction pool whose results are kept
+DEFAULT_PRE_EXECUTION_CACHE_SIZE = 10000
+# The number of the latest commits after which a pre-executed transaction can be reused
+PRE_EXECUTION_MAX_COMMIT_LAG = 8
+# Default number of the blocks synced in memory before they are written to the state db at once
+DEFAULT_SYNC_FLUSH_BLOCKS = 100
+# Default size of the states synced in memory before they are written to the state db at once: 64MB
+DEFAULT_SYNC_FLUSH_BYTES = 64 * 1024 * 1024
+# Default least number of the transactions in a block whose params are converted lazily. 0 means never
+DEFAULT_LAZY_PARAMS_MIN_TX_COUNT = 0
 PACKAGE_JSON_FILE = 'package.json'
 
 ICX_TRANSFER_EVENT_LOG = 'ICXTransfer(Address,Address,int)'
@@ -57,7 +81,11 @@ ZERO_TX_HASH = bytes(32)
 
 REVISION_2 = 2
 REVISION_3 = 3
-LATEST_REVISION = REVISION_3
+# State root hash is the root of the state trie since REVISION_4
+REVISION_4 = 4
+# Transaction fees are credited to the fee treasury once at the end of a block since REVISION_5
+REVISION_5 = 5
+LATEST_REVISION = REVISION_5
 
 
 class ConfigKey:
@@ -74,6 +102,26 @@ class ConfigKey:
     AMQP_TARGET = 'amqpTarget'
     CONFIG = 'config'
     TBEARS_MODE = 'tbearsMode'
+    STATE_DB_CACHE = 'stateDbCache'
+    STATE_DB_CACHE_SIZE = 'stateDbCacheSize'
+    STATE_DB_BACKEND = 'stateDbBackend'
+    STATE_DB_SHARDING = 'stateDbSharding'
+    STATE_DB_BLOOM_FILTER = 'stateDbBloomFilter'
+    STATE_DB_BLOOM_FILTER_CAPACITY = 'stateDbBloomFilterCapacity'
+    STATE_TRIE_CACHE_SIZE = 'stateTrieCacheSize'
+    STATE_TRIE_RETENTION = 'stateTrieRetention'
+    STATE_TRIE_MIGRATION = 'stateTrieMigration'
+    ASYNC_COMMIT = 'asyncCommit'
+    COMMIT_QUEUE_SIZE = 'commitQueueSize'
+    QUERY_THREAD_COUNT = 'queryThreadCount'
+    LAZY_PARAMS_MIN_TX_COUNT = 'lazyParamsMinTxCount'
+    ACCOUNT_CACHE = 'accountCache'
+    ACCOUNT_PREFETCH = 'accountPrefetch'
+    PRE_EXECUTION = 'preExecution'
+    PRE_EXECUTION_CACHE_SIZE = 'preExecutionCacheSize'
+    TX_CHECKPOINT = 'txCheckpoint'
+    SYNC_FLUSH_BLOCKS = 'syncFlushBlocks'
+    SYNC_FLUSH_BYTES = 'syncFlushBytes'
 
 
 class EnableThreadFlag(IntFlag):
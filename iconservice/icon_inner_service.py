@@ -24,9 +24,9 @@ from iconservice.base.block import Block
 from iconservice.base.exception import ExceptionCode, IconServiceBaseException
 from iconservice.base.type_converter import TypeConverter, ParamType
 from iconservice.icon_constant import ICON_INNER_LOG_TAG, ICON_SERVICE_LOG_TAG, \
-    EnableThreadFlag, ENABLE_THREAD_FLAG
+    EnableThreadFlag, ENABLE_THREAD_FLAG, ConfigKey, DEFAULT_QUERY_THREAD_COUNT, DEFAULT_LAZY_PARAMS_MIN_TX_COUNT
 from iconservice.icon_service_engine import IconServiceEngine
-from iconservice.utils import check_error_response, to_camel_case
+from iconservice.utils import check_error_response
 
 if TYPE_CHECKING:
     from earlgrey import RobustConnection
@@ -45,10 +45,17 @@ class IconScoreInnerTask(object):
         self._icon_service_engine = IconServiceEngine()
         self._open()
 
+        # Queries run concurrently on the snapshots of the last committed block
+        query_thread_count: int = max(1, conf.get(ConfigKey.QUERY_THREAD_COUNT, DEFAULT_QUERY_THREAD_COUNT))
+
         self._thread_pool = {THREAD_INVOKE: ThreadPoolExecutor(1),
-                             THREAD_QUERY: ThreadPoolExecutor(1),
+                             THREAD_QUERY: ThreadPoolExecutor(query_thread_count),
                              THREAD_VALIDATE: ThreadPoolExecutor(1)}
 
+        # The transactions in a block at least this large are converted when they are executed
+        self._lazy_params_min_tx_count: int = \
+            conf.get(ConfigKey.LAZY_PARAMS_MIN_TX_COUNT, DEFAULT_LAZY_PARAMS_MIN_TX_COUNT)
+
     def _open(self):
         Logger.info("icon_score_service open", ICON_INNER_LOG_TAG)
         self._icon_service_engine.open(self._conf)
@@ -60,6 +67,20 @@ class IconScoreInnerTask(object):
         Logger.exception(e, tag)
         Logger.error(e, tag)
 
+    def _convert_block_request(self, request: dict, param_type: 'ParamType') -> dict:
+        """Converts a request with the transactions in a block
+
+        The transactions in a large block are converted lazily to start executing the first one earlier.
+        Then an invalid transaction fails the block when it is executed after the ones before it.
+
+        :param request: invoke, sync_block or build_block request
+        :param param_type: type of the template
+        :return: params converted
+        """
+        transactions = request.get('transactions')
+        lazy: bool = isinstance(transactions, list) and 0 < self._lazy_params_min_tx_count <= len(transactions)
+        return TypeConverter.convert(request, param_type, lazy=lazy)
+
     @message_queue_task
     async def hello(self):
         Logger.info('icon_score_hello', ICON_INNER_LOG_TAG)
@@ -95,7 +116,7 @@ class IconScoreInnerTask(object):
 
         response = None
         try:
-            params = TypeConverter.convert(request, ParamType.INVOKE)
+            params = self._convert_block_request(request, ParamType.INVOKE)
             converted_block_params = params['block']
             block = Block.from_dict(converted_block_params)
 
@@ -104,12 +125,13 @@ class IconScoreInnerTask(object):
                 block=block, tx_requests=converted_tx_requests)
 
             convert_tx_results = \
-                {bytes.hex(tx_result.tx_hash): tx_result.to_dict(to_camel_case) for tx_result in tx_results}
+                {bytes.hex(tx_result.tx_hash): tx_result.to_response() for tx_result in tx_results}
             results = {
                 'txResults': convert_tx_results,
                 'stateRootHash': bytes.hex(state_root_hash)
             }
-            response = MakeResponse.make_response(results)
+            # The results are serialized already
+            response = results
         except IconServiceBaseException as icon_e:
             self._log_exception(icon_e, ICON_SERVICE_LOG_TAG)
             response = MakeResponse.make_error_response(icon_e.code, icon_e.message)
@@ -120,6 +142,96 @@ class IconScoreInnerTask(object):
             Logger.info(f'invoke response with {response}', ICON_INNER_LOG_TAG)
             return response
 
+    @message_queue_task
+    async def sync_block(self, request: dict):
+        Logger.info(f'sync_block request with {request}', ICON_INNER_LOG_TAG)
+        if self._is_thread_flag_on(EnableThreadFlag.INVOKE):
+            loop = get_event_loop()
+            return await loop.run_in_executor(self._thread_pool[THREAD_INVOKE],
+                                              self._sync_block, request)
+        else:
+            return self._sync_block(request)
+
+    def _sync_block(self, request: dict):
+        """Process transactions in a confirmed block while catching up with the chain
+
+        The block is written to the state db later together with the next blocks synced.
+        write_precommit_state is not needed for it.
+
+        :param request: the same as the one of invoke
+        :return:
+        """
+
+        response = None
+        try:
+            params = self._convert_block_request(request, ParamType.INVOKE)
+            block = Block.from_dict(params['block'])
+
+            tx_results, state_root_hash = self._icon_service_engine.sync_block(
+                block=block, tx_requests=params['transactions'])
+
+            convert_tx_results = \
+                {bytes.hex(tx_result.tx_hash): tx_result.to_response() for tx_result in tx_results}
+            results = {
+                'txResults': convert_tx_results,
+                'stateRootHash': bytes.hex(state_root_hash)
+            }
+            # The results are serialized already
+            response = results
+        except IconServiceBaseException as icon_e:
+            self._log_exception(icon_e, ICON_SERVICE_LOG_TAG)
+            response = MakeResponse.make_error_response(icon_e.code, icon_e.message)
+        except Exception as e:
+            self._log_exception(e, ICON_SERVICE_LOG_TAG)
+            response = MakeResponse.make_error_response(ExceptionCode.SERVER_ERROR, str(e))
+        finally:
+            Logger.info(f'sync_block response with {response}', ICON_INNER_LOG_TAG)
+            return response
+
+    @message_queue_task
+    async def build_block(self, request: dict):
+        Logger.info(f'build_block request with {request}', ICON_INNER_LOG_TAG)
+        if self._is_thread_flag_on(EnableThreadFlag.INVOKE):
+            loop = get_event_loop()
+            return await loop.run_in_executor(self._thread_pool[THREAD_INVOKE],
+                                              self._build_block, request)
+        else:
+            return self._build_block(request)
+
+    def _build_block(self, request: dict):
+        """Fill a block with the candidate transactions up to a step budget
+
+        :param request:
+        :return:
+        """
+
+        response = None
+        try:
+            params = self._convert_block_request(request, ParamType.BUILD_BLOCK)
+            block = Block.from_dict(params['block'])
+
+            _, tx_results, state_root_hash = self._icon_service_engine.build_block(
+                block=block, tx_requests=params['transactions'], step_budget=params['stepBudget'])
+
+            convert_tx_results = \
+                {bytes.hex(tx_result.tx_hash): tx_result.to_response() for tx_result in tx_results}
+            results = {
+                'txHashes': [bytes.hex(tx_result.tx_hash) for tx_result in tx_results],
+                'txResults': convert_tx_results,
+                'stateRootHash': bytes.hex(state_root_hash)
+            }
+            # The results are serialized already
+            response = results
+        except IconServiceBaseException as icon_e:
+            self._log_exception(icon_e, ICON_SERVICE_LOG_TAG)
+            response = MakeResponse.make_error_response(icon_e.code, icon_e.message)
+        except Exception as e:
+            self._log_exception(e, ICON_SERVICE_LOG_TAG)
+            response = MakeResponse.make_error_response(ExceptionCode.SERVER_ERROR, str(e))
+        finally:
+            Logger.info(f'build_block response with {response}', ICON_INNER_LOG_TAG)
+            return response
+
     @message_queue_task
     async def query(self, request: dict):
         Logger.info(f'query request with {request}', ICON_INNER_LOG_TAG)
@@ -14,6 +14,7 @@
 # limitations under the License.
 
 import os
+from collections import OrderedDict
 from typing import TYPE_CHECKING, List, Any, Optional
 
 from iconcommons.logger import Logger
@@ -22,16 +23,23 @@ from .base.address import Address, generate_score_address, generate_score_addres
 from .base.address import ZERO_SCORE_ADDRESS, GOVERNANCE_SCORE_ADDRESS
 from .base.block import Block
 from .base.exception import ExceptionCode, RevertException, ScoreErrorException
-from .base.exception import IconServiceBaseException, ServerErrorException
+from .base.exception import IconServiceBaseException, ServerErrorException, InvalidRequestException
+from .base.exception import InvalidParamsException
 from .base.message import Message
 from .base.transaction import Transaction
+from .base.type_converter import TypeConverter
 from .database.batch import BlockBatch, TransactionBatch
 from .database.factory import ContextDatabaseFactory
+from .database.read_set import ReadSet
+from .database.trie import StateTrie, TRIE_ROOT_KEY
 from .deploy.icon_builtin_score_loader import IconBuiltinScoreLoader
 from .deploy.icon_score_deploy_engine import IconScoreDeployEngine
 from .deploy.icon_score_deploy_storage import IconScoreDeployStorage
 from .icon_constant import ICON_DEX_DB_NAME, ICON_SERVICE_LOG_TAG, IconServiceFlag, ConfigKey, \
-    REVISION_3
+    REVISION_3, REVISION_4, REVISION_5, DEFAULT_STATE_DB_CACHE_SIZE, DEFAULT_STATE_DB_BACKEND, \
+    DEFAULT_STATE_TRIE_CACHE_SIZE, DEFAULT_STATE_TRIE_RETENTION, \
+    DEFAULT_COMMIT_QUEUE_SIZE, DEFAULT_STATE_DB_BLOOM_FILTER_CAPACITY, \
+    DEFAULT_PRE_EXECUTION_CACHE_SIZE, PRE_EXECUTION_MAX_COMMIT_LAG, DEFAULT_SYNC_FLUSH_BLOCKS, DEFAULT_SYNC_FLUSH_BYTES
 from .iconscore.icon_pre_validator import IconPreValidator
 from .iconscore.icon_score_class_loader import IconScoreClassLoader
 from .iconscore.icon_score_context import IconScoreContext, IconScoreFuncType, ContextContainer
@@ -41,19 +49,24 @@ from .iconscore.icon_score_engine import IconScoreEngine
 from .iconscore.icon_score_event_log import EventLogEmitter
 from .iconscore.icon_score_mapper import IconScoreMapper
 from .iconscore.icon_score_result import TransactionResult
-from .iconscore.icon_score_step import IconScoreStepCounterFactory, StepType, get_input_data_size, \
-    get_deploy_content_size
+from .iconscore.icon_score_step import IconScoreStepCounterFactory, IconScoreStepCounter, StepType, \
+    get_input_data_size, get_deploy_content_size
 from .iconscore.icon_score_trace import Trace, TraceType
 from .icx.icx_account import AccountType
+from .icx.icx_account_cache import AccountCache
+from .icx.icx_account_prefetcher import AccountPrefetcher
 from .icx.icx_engine import IcxEngine
 from .icx.icx_storage import IcxStorage
-from .precommit_data_manager import PrecommitData, PrecommitDataManager, PrecommitFlag
+from .pre_executor import PreExecutor
+from .precommit_data_manager import PrecommitData, PrecommitDataManager, PrecommitFlag, TransactionCheckpoint
 from .utils import sha3_256, int_to_bytes
 from .utils import to_camel_case
 from .utils.bloom import BloomFilter
 
 if TYPE_CHECKING:
     from .iconscore.icon_score_event_log import EventLog
+    from .icx.icx_account_prefetcher import PrefetchedAccounts
+    from .pre_executor import PreExecution
     from .builtin_scores.governance.governance import Governance
     from iconcommons.icon_config import IconConfig
 
@@ -76,6 +89,20 @@ class IconServiceEngine(ContextContainer):
         self._icon_score_deploy_engine = None
         self._step_counter_factory = None
         self._icon_pre_validator = None
+        self._state_trie = None
+        # Keep the state trie before the revision where the state root hash is its root
+        self._state_trie_migration = False
+        self._state_trie_build_path: Optional[str] = None
+        self._account_prefetcher: Optional['AccountPrefetcher'] = None
+        self._pre_executor: Optional['PreExecutor'] = None
+        self._tx_checkpoint_enabled = False
+        self._account_cache_enabled = False
+        self._sync_flush_blocks: int = DEFAULT_SYNC_FLUSH_BLOCKS
+        self._sync_flush_bytes: int = DEFAULT_SYNC_FLUSH_BYTES
+        # The last block synced which has not been written to the state db yet
+        self._synced_block: Optional['Block'] = None
+        self._synced_block_count = 0
+        self._synced_bytes = 0
 
         # JSON-RPC handlers
         self._handlers = {
@@ -85,7 +112,8 @@ class IconServiceEngine(ContextContainer):
             'icx_sendTransaction': self._handle_icx_send_transaction,
             'debug_estimateStep': self._handle_estimate_step,
             'icx_getScoreApi': self._handle_icx_get_score_api,
-            'ise_getStatus': self._handle_ise_get_status
+            'ise_getStatus': self._handle_ise_get_status,
+            'ise_getProof': self._handle_ise_get_proof
         }
 
         self._precommit_data_manager = PrecommitDataManager()
@@ -105,15 +133,50 @@ class IconServiceEngine(ContextContainer):
         os.makedirs(score_root_path, exist_ok=True)
         os.makedirs(state_db_root_path, exist_ok=True)
 
-        # Share one context db with all SCOREs
-        ContextDatabaseFactory.open(
-            state_db_root_path, ContextDatabaseFactory.Mode.SINGLE_DB)
+        state_db_cache_size = 0
+        if self._conf.get(ConfigKey.STATE_DB_CACHE, False):
+            state_db_cache_size: int = self._conf.get(
+                ConfigKey.STATE_DB_CACHE_SIZE, DEFAULT_STATE_DB_CACHE_SIZE)
+
+        state_db_backend: str = self._conf.get(ConfigKey.STATE_DB_BACKEND, DEFAULT_STATE_DB_BACKEND)
+
+        # Share one context db with all SCOREs or give each SCORE its own db
+        if self._conf.get(ConfigKey.STATE_DB_SHARDING, False):
+            state_db_mode = ContextDatabaseFactory.Mode.MULTIPLE_DB
+        else:
+            state_db_mode = ContextDatabaseFactory.Mode.SINGLE_DB
+
+        # Write committed blocks on a background writer
+        commit_queue_size = 0
+        if self._conf.get(ConfigKey.ASYNC_COMMIT, False):
+            commit_queue_size: int = self._conf.get(
+                ConfigKey.COMMIT_QUEUE_SIZE, DEFAULT_COMMIT_QUEUE_SIZE)
+
+        # Skip reading the keys which do not exist in the state db
+        bloom_filter_capacity = 0
+        if self._conf.get(ConfigKey.STATE_DB_BLOOM_FILTER, False):
+            bloom_filter_capacity: int = self._conf.get(
+                ConfigKey.STATE_DB_BLOOM_FILTER_CAPACITY, DEFAULT_STATE_DB_BLOOM_FILTER_CAPACITY)
+
+        ContextDatabaseFactory.open(state_db_root_path,
+                                    state_db_mode,
+                                    state_db_cache_size,
+                                    state_db_backend,
+                                    commit_queue_size,
+                                    bloom_filter_capacity)
 
         self._icx_engine = IcxEngine()
         self._icon_score_deploy_engine = IconScoreDeployEngine()
 
         self._icx_context_db = ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME)
         self._icx_storage = IcxStorage(self._icx_context_db)
+        self._state_trie = StateTrie(
+            self._icx_context_db,
+            self._conf.get(ConfigKey.STATE_TRIE_CACHE_SIZE, DEFAULT_STATE_TRIE_CACHE_SIZE),
+            self._conf.get(ConfigKey.STATE_TRIE_RETENTION, DEFAULT_STATE_TRIE_RETENTION))
+        # The state db root path holds the dbs only, so the trie is built next to it
+        self._state_trie_build_path = f'{state_db_root_path}_trie_build'
+        self._state_trie_migration: bool = self._conf.get(ConfigKey.STATE_TRIE_MIGRATION, False)
         icon_score_deploy_storage = IconScoreDeployStorage(self._icx_context_db)
 
         self._step_counter_factory = IconScoreStepCounterFactory()
@@ -131,9 +194,28 @@ class IconServiceEngine(ContextContainer):
         self._icx_engine.open(self._icx_storage)
         self._icon_score_deploy_engine.open(icon_score_deploy_storage)
 
+        # Keep the accounts decoded or encoded in a block not to decode them again
+        self._account_cache_enabled: bool = self._conf.get(ConfigKey.ACCOUNT_CACHE, False)
+        # Load the accounts of the transactions in a block on a background thread
+        if self._conf.get(ConfigKey.ACCOUNT_PREFETCH, False):
+            self._account_prefetcher = AccountPrefetcher(self._icx_storage)
+        # Execute the validated transactions in the transaction pool before their block arrives
+        if self._conf.get(ConfigKey.PRE_EXECUTION, False):
+            self._pre_executor = PreExecutor(
+                self._conf.get(ConfigKey.PRE_EXECUTION_CACHE_SIZE, DEFAULT_PRE_EXECUTION_CACHE_SIZE),
+                PRE_EXECUTION_MAX_COMMIT_LAG)
+        # Keep the states of each transaction to resume a competing block from the same leading transactions
+        self._tx_checkpoint_enabled: bool = self._conf.get(ConfigKey.TX_CHECKPOINT, False)
+        # Write the blocks synced with sync_block() at once
+        self._sync_flush_blocks: int = self._conf.get(ConfigKey.SYNC_FLUSH_BLOCKS, DEFAULT_SYNC_FLUSH_BLOCKS)
+        self._sync_flush_bytes: int = self._conf.get(ConfigKey.SYNC_FLUSH_BYTES, DEFAULT_SYNC_FLUSH_BYTES)
+
         self._load_builtin_scores()
         self._init_global_value_by_governance_score()
 
+        if self._state_trie_migration and self._state_trie.get_committed_root() is None:
+            self._build_state_trie()
+
         self._precommit_data_manager.last_block = self._icx_storage.last_block
 
     @staticmethod
@@ -251,6 +333,9 @@ class IconServiceEngine(ContextContainer):
         """Free all resources occupied by IconServiceEngine
         including db, memory and so on
         """
+        # The blocks synced are not lost on a graceful shutdown
+        self.flush_synced_blocks()
+
         context = IconScoreContext(IconScoreContextType.DIRECT)
         self._push_context(context)
         try:
@@ -262,6 +347,12 @@ class IconServiceEngine(ContextContainer):
             IconScoreClassLoader.exit(context.score_root_path)
         finally:
             self._pop_context()
+            if self._account_prefetcher is not None:
+                self._account_prefetcher.close()
+                self._account_prefetcher = None
+            if self._pre_executor is not None:
+                self._pre_executor.close()
+                self._pre_executor = None
             ContextDatabaseFactory.close()
             self._clear_context()
 
@@ -270,6 +361,10 @@ class IconServiceEngine(ContextContainer):
                tx_requests: list) -> tuple:
         """Process transactions in a block sent by loopchain
 
+        The transactions converted lazily are converted when they are executed.
+        Then an invalid transaction raises an exception after the transactions before it are executed,
+        and no state of the block is kept.
+
         :param block:
         :param tx_requests: transactions in a block
         :return: (TransactionResult[], bytes)
@@ -277,6 +372,10 @@ class IconServiceEngine(ContextContainer):
         # If the block has already been processed,
         # return the result from PrecommitDataManager
         precommit_data: 'PrecommitData' = self._precommit_data_manager.get(block.hash)
+        if precommit_data is None:
+            # The block filled by build_block() with a provisional block hash
+            precommit_data = self._precommit_data_manager.change_built_block_hash(
+                block, [TypeConverter.peek(tx_request, 'params', 'txHash') for tx_request in tx_requests])
         if precommit_data is not None:
             Logger.info(
                 f'The result of block(0x{block.hash.hex()} already exists',
@@ -284,17 +383,14 @@ class IconServiceEngine(ContextContainer):
             return precommit_data.block_result, precommit_data.state_root_hash
 
         # Check for block validation before invoke
-        self._precommit_data_manager.validate_block_to_invoke(block)
+        # The block can be invoked on top of an uncommitted parent block
+        parent: Optional['PrecommitData'] = self._precommit_data_manager.validate_block_to_invoke(block)
+        ancestors: list = [] if parent is None else self._precommit_data_manager.get_chain(parent.block.hash)
 
-        context = IconScoreContext(IconScoreContextType.INVOKE)
-        context.step_counter = self._step_counter_factory.create(IconScoreContextType.INVOKE)
-        context.block = block
-        context.block_batch = BlockBatch(Block.from_block(block))
-        context.tx_batch = TransactionBatch()
-        context.new_icon_score_mapper = IconScoreMapper()
-        self._set_revision_to_context(context)
+        context: 'IconScoreContext' = self._make_invoke_context(block, parent, ancestors)
         block_result = []
         precommit_flag = PrecommitFlag.NONE
+        checkpoints: Optional[list] = None
 
         if block.height == 0:
             # Assume that there is only one tx in genesis_block
@@ -303,23 +399,457 @@ class IconServiceEngine(ContextContainer):
             context.block_batch.update(context.tx_batch)
             context.tx_batch.clear()
         else:
-            for index, tx_request in enumerate(tx_requests):
-                tx_result = self._invoke_request(context, tx_request, index)
-                block_result.append(tx_result)
-                context.block_batch.update(context.tx_batch)
+            if self._tx_checkpoint_enabled:
+                # The leading transactions executed in a competing block are not executed again
+                checkpoints = self._precommit_data_manager.find_checkpoints(
+                    block, [TypeConverter.peek(tx_request, 'params', 'txHash') for tx_request in tx_requests])
+                block_result = self._restore_checkpoints(context, checkpoints)
+            start: int = len(block_result)
+
+            context.prefetched_accounts = self._prefetch_accounts(context, tx_requests)
+            # index: result executed in the transaction pool
+            pre_executions: dict = self._take_pre_executions(context, tx_requests, ancestors, start)
+            # Keys written by the transactions applied so far
+            written_keys = set(context.block_batch)
+            # Fees to credit to the fee treasury at the end of the block
+            deferred_fee = 0
+            if context.revision >= REVISION_5:
+                deferred_fee = sum(tx_result.step_used * tx_result.step_price for tx_result in block_result)
+
+            try:
+                for index in range(start, len(tx_requests)):
+                    tx_request: dict = tx_requests[index]
+                    pre_execution = pre_executions.pop(index, None)
+                    tx_result = None
+                    if pre_execution is not None:
+                        tx_result = self._apply_pre_execution(context, pre_execution, tx_request, index, written_keys)
+                    if tx_result is None:
+                        tx_result = self._invoke_request(context, tx_request, index)
+
+                    block_result.append(tx_result)
+                    if context.revision >= REVISION_5:
+                        deferred_fee += tx_result.step_used * tx_result.step_price
+                    if pre_executions:
+                        written_keys.update(context.tx_batch)
+                    if checkpoints is not None:
+                        checkpoints = self._make_checkpoint(context, tx_request, tx_result, checkpoints)
+                    precommit_flag |= self._apply_tx_to_block(context, tx_result)
+
+                self._credit_fee_treasury(context, deferred_fee)
+            finally:
+                if context.prefetched_accounts is not None:
+                    context.prefetched_accounts.cancel()
+
+        precommit_data = self._push_precommit_data(
+            context, block_result, precommit_flag, ancestors, checkpoints=checkpoints)
+        return block_result, precommit_data.state_root_hash
+
+    def build_block(self,
+                    block: 'Block',
+                    tx_requests: list,
+                    step_budget: int) -> tuple:
+        """Fills a block with the candidate transactions up to a step budget
+
+        The candidates are executed in order on the block
+        and a transaction is dropped if the steps used in the block exceed the budget with it.
+        The result is kept as the precommit data of the block,
+        so invoking the block with the chosen transactions returns it without executing them again.
+        It is found by the block hash
+        or by the height, the previous block hash, the timestamp and the transactions of the block
+        if the block hash has changed after the transactions are chosen.
+
+        :param block: block to fill. Its hash can be provisional
+        :param tx_requests: candidate transactions in order of priority
+        :param step_budget: the max steps used in the block
+        :return: (chosen transaction requests, TransactionResult[], state root hash)
+        """
+        if block.height == 0:
+            raise InvalidParamsException('Genesis block cannot be built')
+        if self._precommit_data_manager.get(block.hash) is not None:
+            raise InvalidParamsException(f'Block(0x{block.hash.hex()}) already exists')
+
+        parent: Optional['PrecommitData'] = self._precommit_data_manager.validate_block_to_invoke(block)
+        ancestors: list = [] if parent is None else self._precommit_data_manager.get_chain(parent.block.hash)
+
+        context: 'IconScoreContext' = self._make_invoke_context(block, parent, ancestors)
+        chosen_tx_requests = []
+        block_result = []
+        precommit_flag = PrecommitFlag.NONE
+        deferred_fee = 0
+
+        for tx_request in tx_requests:
+            score_mapper: 'IconScoreMapper' = context.new_icon_score_mapper
+            if tx_request['params'].get('dataType') == 'deploy':
+                # A SCORE deployed by a dropped transaction is thrown away as well
+                context.new_icon_score_mapper = IconScoreMapper()
+                context.new_icon_score_mapper.update(score_mapper)
+
+            tx_result = self._invoke_request(context, tx_request, len(block_result))
+            if context.cumulative_step_used > step_budget:
+                # The states of the transaction are thrown away
+                context.cumulative_step_used -= tx_result.step_used
                 context.tx_batch.clear()
-                self._update_revision_if_necessary(context, tx_result)
-                tx_precommit_flag = self._generate_precommit_flag(tx_result)
-                self._update_step_properties_if_necessary(context, tx_precommit_flag)
-                precommit_flag |= tx_precommit_flag
+                context.new_icon_score_mapper = score_mapper
+                continue
+
+            chosen_tx_requests.append(tx_request)
+            block_result.append(tx_result)
+            if context.revision >= REVISION_5:
+                deferred_fee += tx_result.step_used * tx_result.step_price
+            precommit_flag |= self._apply_tx_to_block(context, tx_result)
+
+        self._credit_fee_treasury(context, deferred_fee)
+
+        tx_hashes: list = [tx_request['params'].get('txHash') for tx_request in chosen_tx_requests]
+        precommit_data = self._push_precommit_data(context, block_result, precommit_flag, ancestors, tx_hashes)
+        return chosen_tx_requests, block_result, precommit_data.state_root_hash
+
+    def sync_block(self,
+                   block: 'Block',
+                   tx_requests: list) -> tuple:
+        """Processes a confirmed block while catching up with the chain
+
+        Consecutive blocks synced are merged into one precommit data in memory
+        and their states are written to the state db in one batch
+        every syncFlushBlocks blocks or syncFlushBytes bytes.
+        The last block info is written in the same batch,
+        so a node restarts from the last block written after a crash.
+        Queries see the states of the last block written.
+
+        :param block: confirmed block which follows the last block synced or committed
+        :param tx_requests: transactions in the block
+        :return: (TransactionResult[], bytes)
+        """
+        block_result, state_root_hash = self.invoke(block, tx_requests)
+
+        block_batch: 'BlockBatch' = self._precommit_data_manager.get(block.hash).block_batch
+        self._synced_bytes += sum(len(key) + len(value or b'') for key, value in block_batch.items())
+        self._synced_block_count += 1
+        self._synced_block = block
+        self._precommit_data_manager.merge_into_parent(block.hash)
+
+        if self._synced_block_count >= self._sync_flush_blocks or self._synced_bytes >= self._sync_flush_bytes:
+            self.flush_synced_blocks()
+
+        return block_result, state_root_hash
+
+    def flush_synced_blocks(self) -> None:
+        """Writes the blocks synced with sync_block() to the state db
+        """
+        block: Optional['Block'] = self._synced_block
+        if block is None or self._precommit_data_manager.get(block.hash) is None:
+            return
+
+        Logger.info(f'Flush {self._synced_block_count} blocks synced: {block}', ICON_SERVICE_LOG_TAG)
+        self.commit(block)
+
+    def _make_invoke_context(self,
+                             block: 'Block',
+                             parent: Optional['PrecommitData'],
+                             ancestors: list) -> 'IconScoreContext':
+        """Returns a context to invoke a block on top of its parent block
+
+        :param block: block to invoke
+        :param parent: precommit data of the parent block. None if it has been committed
+        :param ancestors: precommit data of the uncommitted parent blocks
+        :return: invoke context
+        """
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.step_counter = self._step_counter_factory.create(IconScoreContextType.INVOKE)
+        context.block = block
+        context.block_batch = BlockBatch(Block.from_block(block), None if parent is None else parent.block_batch)
+        context.tx_batch = TransactionBatch()
+        context.new_icon_score_mapper = IconScoreMapper()
+        if self._account_cache_enabled:
+            context.account_cache = AccountCache()
+        if parent is not None and parent.score_mapper is not None:
+            # SCOREs deployed in the parent blocks
+            context.new_icon_score_mapper.update(parent.score_mapper)
+        self._set_revision_to_context(context)
+
+        ancestor_flag = PrecommitFlag.NONE
+        for precommit_data in ancestors:
+            ancestor_flag |= precommit_data.precommit_flag
+        # Step properties changed by the parent blocks are not applied to the factory yet
+        self._update_step_properties_if_necessary(context, ancestor_flag)
+        return context
+
+    def _apply_tx_to_block(self,
+                           context: 'IconScoreContext',
+                           tx_result: 'TransactionResult') -> 'PrecommitFlag':
+        """Moves the states of a transaction to the block
+        and applies what the transaction has changed on the governance SCORE
+
+        :param context: invoke context
+        :param tx_result: result of the transaction
+        :return: precommit flag of the transaction
+        """
+        context.block_batch.update(context.tx_batch)
+        context.tx_batch.clear()
+        self._update_revision_if_necessary(context, tx_result)
+        tx_precommit_flag = self._generate_precommit_flag(tx_result)
+        self._update_step_properties_if_necessary(context, tx_precommit_flag)
+        return tx_precommit_flag
+
+    def _credit_fee_treasury(self, context: 'IconScoreContext', deferred_fee: int) -> None:
+        self._icx_engine.credit_fee_treasury(context, deferred_fee)
+        context.block_batch.update(context.tx_batch)
+        context.tx_batch.clear()
+
+    def _push_precommit_data(self,
+                             context: 'IconScoreContext',
+                             block_result: list,
+                             precommit_flag: 'PrecommitFlag',
+                             ancestors: list,
+                             tx_hashes: Optional[list] = None,
+                             checkpoints: Optional[list] = None) -> 'PrecommitData':
+        """Keeps the result of a block until it is committed
+
+        :param context: invoke context after the transactions are executed
+        :param block_result: transaction results
+        :param precommit_flag: precommit flag of the block
+        :param ancestors: precommit data of the uncommitted parent blocks
+        :param tx_hashes: hashes of the transactions chosen by build_block()
+        :param checkpoints: TransactionCheckpoint list of the leading transactions in the block
+        :return: precommit data
+        """
+        trie_root, trie_states = None, None
+        if context.revision >= REVISION_4 or self._state_trie_migration:
+            trie_root, trie_states = self._update_state_trie(context.block_batch, ancestors)
+            if context.revision < REVISION_4:
+                trie_root = None
 
         # Save precommit data
         # It will be written to levelDB on commit
-        precommit_data = PrecommitData(
-            context.block_batch, block_result, context.new_icon_score_mapper, precommit_flag)
+        precommit_data = PrecommitData(context.block_batch,
+                                       block_result,
+                                       context.new_icon_score_mapper,
+                                       precommit_flag,
+                                       trie_root,
+                                       trie_states,
+                                       tx_hashes,
+                                       checkpoints)
         self._precommit_data_manager.push(precommit_data)
+        return precommit_data
 
-        return block_result, precommit_data.state_root_hash
+    @staticmethod
+    def _restore_checkpoints(context: 'IconScoreContext', checkpoints: list) -> list:
+        """Applies the states of the leading transactions executed in a competing block
+
+        :param context: invoke context before any transaction is executed
+        :param checkpoints: TransactionCheckpoint list of the leading transactions
+        :return: transaction results bound to the block
+        """
+        block_result = []
+        for checkpoint in checkpoints:
+            context.block_batch.update(checkpoint.states)
+            tx_result: 'TransactionResult' = checkpoint.make_tx_result(context.block)
+            context.cumulative_step_used = tx_result.cumulative_step_used
+            block_result.append(tx_result)
+
+        if checkpoints:
+            Logger.debug(f'Restored {len(checkpoints)} transactions of block({context.block})', ICON_SERVICE_LOG_TAG)
+        return block_result
+
+    def _make_checkpoint(self,
+                         context: 'IconScoreContext',
+                         tx_request: dict,
+                         tx_result: 'TransactionResult',
+                         checkpoints: list) -> Optional[list]:
+        """Adds the checkpoint of a transaction executed in a block
+
+        The checkpoints stop at a transaction which can deploy a SCORE or change the governance
+        because it changes what is not kept in the block batch.
+
+        :param context: invoke context before the states of the transaction are applied to the block
+        :param tx_request: transaction request
+        :param tx_result: result of the transaction
+        :param checkpoints: checkpoints of the earlier transactions in the block
+        :return: None if the checkpoints stop
+        """
+        params: dict = tx_request['params']
+        if params.get('dataType') == 'deploy' or tx_result.to == GOVERNANCE_SCORE_ADDRESS:
+            return None
+
+        block_independent: bool = tx_request['method'] == 'icx_sendTransaction' and self._is_icx_transfer(params)
+        checkpoints.append(TransactionCheckpoint(context.tx_batch, tx_result, block_independent))
+        return checkpoints
+
+    def _prefetch_accounts(self, context: 'IconScoreContext', tx_requests: list) -> Optional['PrefetchedAccounts']:
+        """Starts loading the accounts of the senders, the receivers and the fee treasury
+
+        :param context: invoke context before any transaction is executed
+        :param tx_requests: transactions in a block
+        :return: None if the accounts are not prefetched
+        """
+        if self._account_prefetcher is None:
+            return None
+
+        addresses: list = AccountPrefetcher.collect_addresses(tx_requests, self._icx_engine.fee_treasury_address)
+        return self._account_prefetcher.start(context, addresses)
+
+    def _take_pre_executions(self,
+                             context: 'IconScoreContext',
+                             tx_requests: list,
+                             ancestors: list,
+                             start: int) -> dict:
+        """Takes the results of the transactions in a block executed in the transaction pool
+
+        A result is taken only if none of the keys it has read is written
+        by the blocks committed after it or the uncommitted parent blocks.
+
+        :param context: invoke context before any transaction is executed
+        :param tx_requests: transactions in a block
+        :param ancestors: precommit data of the uncommitted parent blocks
+        :param start: the index of the first transaction to execute
+        :return: index: pre-execution
+        """
+        executor: Optional['PreExecutor'] = self._pre_executor
+        if executor is None:
+            return {}
+
+        ancestor_keys = set()
+        for precommit_data in ancestors:
+            ancestor_keys.update(precommit_data.block_batch)
+
+        pre_executions = {}
+        # commit sequence number: keys written after it
+        written_keys_by_seq = {}
+        for index in range(start, len(tx_requests)):
+            pre_execution: Optional['PreExecution'] = executor.take(
+                TypeConverter.peek(tx_requests[index], 'params', 'txHash'))
+            if pre_execution is None:
+                continue
+
+            commit_seq: int = pre_execution.commit_seq
+            if commit_seq not in written_keys_by_seq:
+                written_keys: Optional[set] = executor.get_written_keys(commit_seq)
+                if written_keys is not None:
+                    written_keys.update(ancestor_keys)
+                written_keys_by_seq[commit_seq] = written_keys
+
+            written_keys: Optional[set] = written_keys_by_seq[commit_seq]
+            if written_keys is None \
+                    or not pre_execution.is_applicable(context) \
+                    or not pre_execution.is_valid(written_keys):
+                executor.on_discarded()
+                continue
+
+            pre_executions[index] = pre_execution
+
+        return pre_executions
+
+    def _apply_pre_execution(self,
+                             context: 'IconScoreContext',
+                             pre_execution: 'PreExecution',
+                             request: dict,
+                             index: int,
+                             written_keys: set) -> Optional['TransactionResult']:
+        """Applies the result of a transaction executed in the transaction pool to the block
+
+        :param context: invoke context
+        :param pre_execution: result of the transaction on the committed states
+        :param request: transaction request
+        :param index: the index of the transaction in the block
+        :param written_keys: keys written by the earlier transactions in the block
+        :return: None if the transaction should be executed again
+        """
+        if not pre_execution.is_valid(written_keys):
+            self._pre_executor.on_discarded()
+            return None
+
+        self._pre_executor.on_reused()
+
+        params: dict = request['params']
+        tx = Transaction(tx_hash=params['txHash'],
+                         index=index,
+                         origin=params['from'],
+                         timestamp=params['timestamp'],
+                         nonce=params.get('nonce', None))
+        tx_result: 'TransactionResult' = pre_execution.make_tx_result(tx, context.block)
+        context.tx_batch = pre_execution.tx_batch
+        context.cumulative_step_used += tx_result.step_used
+        tx_result.cumulative_step_used = context.cumulative_step_used
+        return tx_result
+
+    def _pre_execute(self, request: dict) -> None:
+        """Executes a validated transaction on the latest committed states in the background
+
+        Only plain icx transfers are executed
+        because their results do not depend on the block they will belong to.
+
+        :param request: transaction request which has been validated
+        """
+        params: dict = request['params']
+        if request['method'] != 'icx_sendTransaction' \
+                or 'timestamp' not in params \
+                or not self._is_icx_transfer(params) \
+                or self._icx_storage.last_block is None:
+            return
+
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.snapshot = ContextDatabaseFactory.acquire_snapshot()
+        try:
+            context.step_counter = self._step_counter_factory.create(IconScoreContextType.INVOKE)
+            context.block = self._icx_storage.last_block
+            context.block_batch = BlockBatch(Block.from_block(context.block))
+            context.tx_batch = TransactionBatch()
+            context.new_icon_score_mapper = IconScoreMapper()
+            self._set_revision_to_context(context)
+            context.read_set = ReadSet()
+        except BaseException:
+            ContextDatabaseFactory.release_snapshot(context.snapshot)
+            raise
+
+        self._pre_executor.submit(self._invoke_request, context, request)
+
+    def _update_state_trie(self, block_batch: 'BlockBatch', ancestors: list) -> tuple:
+        """Applies the states changed by a block to the state trie
+
+        The trie of the committed states is built
+        on the first block where the state trie is enabled.
+
+        :param block_batch: the states changed by a block
+        :param ancestors: the precommit data of uncommitted parent blocks from the oldest
+        :return: (trie root, trie states to be written on commit)
+        """
+        uncommitted: list = [precommit_data.trie_states
+                             for precommit_data in reversed(ancestors) if precommit_data.trie_states]
+        states: dict = block_batch
+        if ancestors and ancestors[-1].trie_states:
+            root: bytes = ancestors[-1].trie_states[TRIE_ROOT_KEY]
+        else:
+            root: Optional[bytes] = self._state_trie.get_committed_root()
+            if root is None:
+                root = self._build_state_trie()
+
+            if ancestors:
+                # The trie has not been updated for the uncommitted parent blocks
+                states = {}
+                for precommit_data in ancestors:
+                    states.update(precommit_data.block_batch)
+                states.update(block_batch)
+
+        return self._state_trie.update(root, states, uncommitted, block_batch.block.height)
+
+    def _build_state_trie(self) -> bytes:
+        """Builds the state trie of the committed states and writes it to the state db
+
+        :return: root hash
+        """
+        Logger.info(f'Build state trie: {self._icx_storage.last_block}', ICON_SERVICE_LOG_TAG)
+        ContextDatabaseFactory.flush()
+
+        def iter_states():
+            for context_db in ContextDatabaseFactory.get_all_dbs():
+                for key, value in context_db.key_value_db.iterator():
+                    if key != IcxStorage.LAST_BLOCK_KEY:
+                        yield key, value
+
+        root: bytes = self._state_trie.build(
+            iter_states(), self._state_trie_build_path, lambda states: self._icx_context_db.write_batch(None, states))
+        Logger.info(f'State trie built: {root.hex()}', ICON_SERVICE_LOG_TAG)
+        return root
 
     def _update_revision_if_necessary(self, context, tx_result):
         """
@@ -374,6 +904,22 @@ class IconServiceEngine(ContextContainer):
         finally:
             self._pop_context()
 
+    @staticmethod
+    def _make_parent_block_context(context: 'IconScoreContext') -> Optional['IconScoreContext']:
+        """Returns a context which reads the states at the end of the parent block
+
+        :param context: invoke context
+        :return: None if the parent block has been committed
+        """
+        parent_batch: Optional['BlockBatch'] = context.block_batch.parent
+        if parent_batch is None:
+            return None
+
+        parent_context = IconScoreContext(IconScoreContextType.INVOKE)
+        parent_context.block_batch = parent_batch
+        parent_context.tx_batch = TransactionBatch()
+        return parent_context
+
     @staticmethod
     def _is_genesis_block(
             tx_index: int, block_height: int, tx_params: dict) -> bool:
@@ -448,6 +994,9 @@ class IconServiceEngine(ContextContainer):
         :param index:
         :return:
         """
+        # The params of a block converted lazily are converted one transaction at a time.
+        # An invalid param fails the whole block as if it had been converted at once.
+        TypeConverter.resolve(request)
 
         method = request['method']
         params = request['params']
@@ -465,16 +1014,60 @@ class IconServiceEngine(ContextContainer):
                                  timestamp=params.get('timestamp', context.block.timestamp),
                                  nonce=params.get('nonce', None))
 
-        context.msg = Message(sender=from_, value=params.get('value', 0))
         context.current_address = to
         context.event_logs: List['EventLog'] = []
         context.traces: List['Trace'] = []
         context.step_counter.reset(step_limit)
+
+        if method == 'icx_sendTransaction' and self._is_icx_transfer(params):
+            return self._invoke_icx_transfer(context, params)
+
+        context.msg = Message(sender=from_, value=params.get('value', 0))
         context.msg_stack.clear()
         context.event_log_stack.clear()
 
         return self._call(context, method, params)
 
+    @staticmethod
+    def _is_icx_transfer(params: dict) -> bool:
+        """Returns True if a transaction only transfers icx to an EOA
+        """
+        return params.get('dataType') is None \
+            and params.get('data') is None \
+            and not params['to'].is_contract
+
+    def _invoke_icx_transfer(self,
+                             context: 'IconScoreContext',
+                             params: dict) -> 'TransactionResult':
+        """Invokes a plain icx transfer to an EOA
+
+        It gives the same result as _handle_icx_send_transaction()
+        without pushing the context and making a message for a SCORE call.
+
+        :param context: context which _invoke_request() has prepared
+        :param params: JSON-RPC params
+        :return: transaction result
+        """
+        tx_result = TransactionResult(context.tx, context.block)
+        tx_result.to = params['to']
+
+        try:
+            self._check_out_of_balance(context, params)
+
+            step_counter: 'IconScoreStepCounter' = context.step_counter
+            step_counter.apply_step(StepType.DEFAULT, 1)
+            step_counter.apply_step(StepType.INPUT, get_input_data_size(context.revision, None))
+
+            self._transfer_coin(context, params)
+            tx_result.status = TransactionResult.SUCCESS
+        except BaseException as e:
+            tx_result.failure = self._get_failure_from_exception(e)
+            context.tx_batch.clear()
+            context.traces.append(self._get_trace_from_exception(context.current_address, e))
+
+        self._finalize_tx_result(context, params, tx_result)
+        return tx_result
+
     def _estimate_step_by_request(self, request, context) -> int:
         """Calculates simply and estimates step with request data.
 
@@ -516,7 +1109,7 @@ class IconServiceEngine(ContextContainer):
         from_: Address = params['from']
         to: Address = params['to']
 
-        timestamp = params.get('timestamp', self._icx_storage.last_block.timestamp)
+        timestamp = params.get('timestamp', context.block.timestamp)
         context.tx = Transaction(tx_hash=sha3_256(int_to_bytes(timestamp)),
                                  index=0,
                                  origin=from_,
@@ -554,30 +1147,39 @@ class IconServiceEngine(ContextContainer):
         """
         context = IconScoreContext(IconScoreContextType.ESTIMATION)
         context.step_counter = self._step_counter_factory.create(IconScoreContextType.INVOKE)
-        context.block = self._precommit_data_manager.last_block
-        context.block_batch = BlockBatch(Block.from_block(context.block))
+        context.snapshot = ContextDatabaseFactory.acquire_snapshot()
+        context.block_batch = BlockBatch()
         context.tx_batch = TransactionBatch()
-        context.new_icon_score_mapper = IconScoreMapper()
-        self._set_revision_to_context(context)
-        # Fills the step_limit as the max step limit to proceed the transaction.
-        step_limit: int = context.step_counter.max_step_limit
-        context.step_counter.reset(step_limit)
 
-        params: dict = request['params']
-        data_type: str = params.get('dataType')
-        to: Address = params['to']
+        try:
+            # The last block is read from the snapshot not to mismatch with the states
+            context.block = self._icx_storage.get_last_block(context)
+            context.block_batch.block = Block.from_block(context.block)
+            context.new_icon_score_mapper = IconScoreMapper()
+            self._set_revision_to_context(context)
+            # Fills the step_limit as the max step limit to proceed the transaction.
+            step_limit: int = context.step_counter.max_step_limit
+            context.step_counter.reset(step_limit)
 
-        if data_type == "deploy" or not to.is_contract:
-            # Calculates simply and estimates step with request data.
-            return self._estimate_step_by_request(request, context)
-        else:
-            # Processes the transaction and estimates step.
-            return self._estimate_step_by_execution(request, context, step_limit)
+            params: dict = request['params']
+            data_type: str = params.get('dataType')
+            to: Address = params['to']
+
+            if data_type == "deploy" or not to.is_contract:
+                # Calculates simply and estimates step with request data.
+                return self._estimate_step_by_request(request, context)
+            else:
+                # Processes the transaction and estimates step.
+                return self._estimate_step_by_execution(request, context, step_limit)
+        finally:
+            ContextDatabaseFactory.release_snapshot(context.snapshot)
 
     def query(self, method: str, params: dict) -> Any:
         """Process a query message call from outside
 
         State change is not allowed in a query message call
+        A query reads the states of the last committed block from a snapshot
+        so that a block committed in the meantime does not affect it.
 
         * icx_getBalance
         * icx_getTotalSupply
@@ -588,20 +1190,25 @@ class IconServiceEngine(ContextContainer):
         :return: the result of query
         """
         context = IconScoreContext(IconScoreContextType.QUERY)
-        context.block = self._icx_storage.last_block
-        context.step_counter = self._step_counter_factory.create(IconScoreContextType.QUERY)
-        self._set_revision_to_context(context)
-        step_limit: int = context.step_counter.max_step_limit
+        context.snapshot = ContextDatabaseFactory.acquire_snapshot()
 
-        if params:
-            from_: 'Address' = params.get('from', None)
-            context.msg = Message(sender=from_)
-            step_limit: int = params.get('stepLimit', step_limit)
+        try:
+            context.block = self._icx_storage.get_last_block(context)
+            context.step_counter = self._step_counter_factory.create(IconScoreContextType.QUERY)
+            self._set_revision_to_context(context)
+            step_limit: int = context.step_counter.max_step_limit
 
-        context.traces: List['Trace'] = []
-        context.step_counter.reset(step_limit)
+            if params:
+                from_: 'Address' = params.get('from', None)
+                context.msg = Message(sender=from_)
+                step_limit: int = params.get('stepLimit', step_limit)
+
+            context.traces: List['Trace'] = []
+            context.step_counter.reset(step_limit)
 
-        ret = self._call(context, method, params)
+            ret = self._call(context, method, params)
+        finally:
+            ContextDatabaseFactory.release_snapshot(context.snapshot)
 
         return ret
 
@@ -626,28 +1233,36 @@ class IconServiceEngine(ContextContainer):
         to: 'Address' = params.get('to')
 
         context = IconScoreContext(IconScoreContextType.QUERY)
-        context.step_counter = self._step_counter_factory.create(IconScoreContextType.QUERY)
-        self._set_revision_to_context(context)
+        context.snapshot = ContextDatabaseFactory.acquire_snapshot()
 
-        self._push_context(context)
+        try:
+            context.step_counter = self._step_counter_factory.create(IconScoreContextType.QUERY)
+            self._set_revision_to_context(context)
 
-        step_price: int = context.step_counter.step_price
-        minimum_step: int = self._step_counter_factory.get_step_cost(StepType.DEFAULT)
+            self._push_context(context)
 
-        if 'data' in params:
-            # minimum_step is the sum of
-            # default STEP cost and input STEP costs if data field exists
-            data = params['data']
-            input_size = get_input_data_size(context.revision, data)
-            minimum_step += input_size * self._step_counter_factory.get_step_cost(StepType.INPUT)
+            step_price: int = context.step_counter.step_price
+            minimum_step: int = self._step_counter_factory.get_step_cost(StepType.DEFAULT)
 
-        self._icon_pre_validator.execute(context, params, step_price, minimum_step)
+            if 'data' in params:
+                # minimum_step is the sum of
+                # default STEP cost and input STEP costs if data field exists
+                data = params['data']
+                input_size = get_input_data_size(context.revision, data)
+                minimum_step += input_size * self._step_counter_factory.get_step_cost(StepType.INPUT)
 
-        IconScoreContextUtil.validate_score_blacklist(context, to)
-        if IconScoreContextUtil.is_service_flag_on(context, IconServiceFlag.DEPLOYER_WHITE_LIST):
-            self._validate_deployer_whitelist(context, params)
+            self._icon_pre_validator.execute(context, params, step_price, minimum_step)
 
-        self._pop_context()
+            IconScoreContextUtil.validate_score_blacklist(context, to)
+            if IconScoreContextUtil.is_service_flag_on(context, IconServiceFlag.DEPLOYER_WHITE_LIST):
+                self._validate_deployer_whitelist(context, params)
+
+            self._pop_context()
+        finally:
+            ContextDatabaseFactory.release_snapshot(context.snapshot)
+
+        if self._pre_executor is not None:
+            self._pre_execute(request)
 
     def _call(self,
               context: 'IconScoreContext',
@@ -749,29 +1364,41 @@ class IconServiceEngine(ContextContainer):
             context.traces.append(trace)
             context.event_logs.clear()
         finally:
-            # Revert func_type to IconScoreFuncType.WRITABLE
-            # to avoid DatabaseException in self._charge_transaction_fee()
-            context.func_type = IconScoreFuncType.WRITABLE
-
-            # Charge a fee to from account
-            final_step_used, final_step_price = \
-                self._charge_transaction_fee(
-                    context,
-                    params,
-                    tx_result.status,
-                    context.step_counter.step_used)
-
-            # Finalize tx_result
-            context.cumulative_step_used += final_step_used
-            tx_result.step_used = final_step_used
-            tx_result.step_price = final_step_price
-            tx_result.cumulative_step_used = context.cumulative_step_used
-            tx_result.event_logs = context.event_logs
-            tx_result.logs_bloom = self._generate_logs_bloom(context.event_logs)
-            tx_result.traces = context.traces
+            self._finalize_tx_result(context, params, tx_result)
 
         return tx_result
 
+    def _finalize_tx_result(self,
+                            context: 'IconScoreContext',
+                            params: dict,
+                            tx_result: 'TransactionResult') -> None:
+        """Charges a fee to from account and fills the rest of tx_result
+
+        :param context:
+        :param params: JSON-RPC params
+        :param tx_result: transaction result whose status has been decided
+        """
+        # Revert func_type to IconScoreFuncType.WRITABLE
+        # to avoid DatabaseException in self._charge_transaction_fee()
+        context.func_type = IconScoreFuncType.WRITABLE
+
+        # Charge a fee to from account
+        final_step_used, final_step_price = \
+            self._charge_transaction_fee(
+                context,
+                params,
+                tx_result.status,
+                context.step_counter.step_used)
+
+        # Finalize tx_result
+        context.cumulative_step_used += final_step_used
+        tx_result.step_used = final_step_used
+        tx_result.step_price = final_step_price
+        tx_result.cumulative_step_used = context.cumulative_step_used
+        tx_result.event_logs = context.event_logs
+        tx_result.logs_bloom = self._generate_logs_bloom(context.event_logs)
+        tx_result.traces = context.traces
+
     def _handle_estimate_step(self,
                               context: 'IconScoreContext',
                               params: dict) -> int:
@@ -801,19 +1428,7 @@ class IconServiceEngine(ContextContainer):
 
         # Checks the balance only on the invoke context(skip estimate context)
         if context.type == IconScoreContextType.INVOKE:
-
-            if context.revision >= REVISION_3:
-                # Check if from account can charge a tx fee
-                self._icon_pre_validator.execute_to_check_out_of_balance(
-                    context,
-                    params,
-                    step_price=context.step_counter.step_price)
-            else:
-                # Check if from account can charge a tx fee
-                self._icon_pre_validator.execute_to_check_out_of_balance(
-                    None,
-                    params,
-                    step_price=context.step_counter.step_price)
+            self._check_out_of_balance(context, params)
 
         # Every send_transaction are calculated DEFAULT STEP at first
         context.step_counter.apply_step(StepType.DEFAULT, 1)
@@ -829,6 +1444,26 @@ class IconServiceEngine(ContextContainer):
 
         return score_address
 
+    def _check_out_of_balance(self,
+                              context: 'IconScoreContext',
+                              params: dict) -> None:
+        """Checks if from account can charge a tx fee
+
+        :param context: invoke context
+        :param params: JSON-RPC params
+        """
+        if context.revision >= REVISION_3:
+            self._icon_pre_validator.execute_to_check_out_of_balance(
+                context,
+                params,
+                step_price=context.step_counter.step_price)
+        else:
+            # With the states at the end of the parent block
+            self._icon_pre_validator.execute_to_check_out_of_balance(
+                self._make_parent_block_context(context),
+                params,
+                step_price=context.step_counter.step_price)
+
     def _transfer_coin(self,
                        context: 'IconScoreContext',
                        params: dict) -> None:
@@ -1029,8 +1664,47 @@ class IconServiceEngine(ContextContainer):
         if not bool(params) or params.get('filter'):
             last_block_status = self._make_last_block_status()
             response['lastBlock'] = last_block_status
+
+            commit_metrics: Optional[dict] = ContextDatabaseFactory.get_commit_metrics()
+            if commit_metrics is not None:
+                response['commitPipeline'] = commit_metrics
+
+            response['stateSnapshot'] = ContextDatabaseFactory.get_snapshot_metrics()
+
+            bloom_filter_metrics: Optional[dict] = ContextDatabaseFactory.get_bloom_filter_metrics()
+            if bloom_filter_metrics is not None:
+                response['bloomFilter'] = bloom_filter_metrics
+
+            if self._pre_executor is not None:
+                response['preExecution'] = self._pre_executor.metrics
         return response
 
+    def _handle_ise_get_proof(self, context: 'IconScoreContext', params: dict) -> dict:
+        """Returns the proof of a state in the state trie of the last committed block
+
+        :param context:
+        :param params: 'address' of an account or state 'key'
+        :return: root hash, key, value and the encoded trie nodes from the root
+        """
+        root: Optional[bytes] = self._state_trie.get_committed_root()
+        if root is None:
+            raise InvalidRequestException('State trie is not enabled')
+
+        if 'address' in params:
+            key: bytes = params['address'].to_bytes()
+        elif 'key' in params:
+            key: bytes = params['key']
+        else:
+            raise InvalidParamsException('address or key is required')
+
+        proof: list = self._state_trie.get_proof(root, key)
+        return {
+            'root': root,
+            'key': key,
+            'value': StateTrie.verify_proof(root, key, proof),
+            'proof': proof
+        }
+
     def _make_last_block_status(self) -> Optional[dict]:
         block = self._precommit_data_manager.last_block
         if block is None:
@@ -1062,23 +1736,47 @@ class IconServiceEngine(ContextContainer):
     def commit(self, block: 'Block') -> None:
         """Write updated states in a context.block_batch to StateDB
         when the candidate block has been confirmed
+
+        Uncommitted parent blocks of the block are committed first in order.
         """
         # Check for block validation before commit
         self._precommit_data_manager.validate_precommit_block(block)
 
+        for precommit_data in self._precommit_data_manager.get_chain(block.hash):
+            self._commit_precommit_data(precommit_data)
+
+    def _commit_precommit_data(self, precommit_data: 'PrecommitData') -> None:
         context = IconScoreContext(IconScoreContextType.DIRECT)
 
-        precommit_data: 'PrecommitData' = \
-            self._precommit_data_manager.get(block.hash)
+        # The blocks synced so far are written with the block
+        self._synced_block = None
+        self._synced_block_count = 0
+        self._synced_bytes = 0
+
         block_batch = precommit_data.block_batch
         new_icon_score_mapper = precommit_data.score_mapper
         if new_icon_score_mapper:
             context.icon_score_mapper.update(new_icon_score_mapper)
 
-        self._icx_context_db.write_batch(
-            context=context, states=block_batch)
-
-        self._icx_storage.put_block_info(context, block_batch.block)
+        states = OrderedDict(block_batch)
+        trie_states: Optional[dict] = precommit_data.trie_states
+        if trie_states:
+            # The nodes replaced before the retention period are removed with the block
+            trie_states = dict(trie_states)
+            trie_states.update(self._state_trie.prune(trie_states, block_batch.block.height))
+            states.update(trie_states)
+        # The last block info is written atomically with the states of the block
+        states[IcxStorage.LAST_BLOCK_KEY] = bytes(block_batch.block)
+
+        # With the commit pipeline, the states are written in the background
+        # and reads see them through the overlay until they are written
+        ContextDatabaseFactory.write_batch(context, states)
+        if self._pre_executor is not None:
+            self._pre_executor.on_committed(ContextDatabaseFactory.get_commit_seq(), set(block_batch))
+        if trie_states:
+            self._state_trie.commit(trie_states)
+
+        self._icx_storage.set_last_block(block_batch.block)
         self._precommit_data_manager.commit(block_batch.block)
 
         if precommit_data.precommit_flag & PrecommitFlag.STEP_ALL_CHANGED != PrecommitFlag.NONE:
@@ -1087,6 +1785,8 @@ class IconServiceEngine(ContextContainer):
     def rollback(self, block: 'Block') -> None:
         """Throw away a precommit state
         in context.block_batch and IconScoreEngine
+
+        The precommit states of the blocks built on the block are thrown away as well.
         """
         # Check for block validation before rollback
         self._precommit_data_manager.validate_precommit_block(block)
@@ -194,6 +194,20 @@ class DictDB(object):
         else:
             return DictDB(key, self._db, self.__value_type, self.__depth - 1)
 
+    def get_many(self, keys: list) -> list:
+        """
+        Returns the values of given keys at once
+
+        :param keys: keys
+        :return: values in the same order as keys
+        """
+        if self.__depth != 1:
+            raise ContainerDBException(f'DictDB depth mismatch')
+
+        encoded_keys: list = [get_encoded_key(key) for key in keys]
+        values: list = self._db.get_many(encoded_keys)
+        return [ContainerUtil.decode_object(value, self.__value_type) for value in values]
+
     def __delitem__(self, key):
         self.__remove(key)
 
@@ -34,6 +34,10 @@ if TYPE_CHECKING:
     from ..deploy.icon_score_deploy_engine import IconScoreDeployEngine
     from .icon_score_base import IconScoreBase
     from ..icx.icx_engine import IcxEngine
+    from ..database.snapshot import StateSnapshot
+    from ..database.read_set import ReadSet
+    from ..icx.icx_account_prefetcher import PrefetchedAccounts
+    from ..icx.icx_account_cache import AccountCache
 
 _thread_local_data = threading.local()
 
@@ -116,6 +120,14 @@ class IconScoreContext(object):
         self.revision: int = 0
         self.block_batch: 'BlockBatch' = None
         self.tx_batch: 'TransactionBatch' = None
+        # Committed states which a query reads. None means the latest states
+        self.snapshot: Optional['StateSnapshot'] = None
+        # Records the keys read by a transaction executed before its block arrives
+        self.read_set: Optional['ReadSet'] = None
+        # Accounts at the start of the block which are loaded in the background
+        self.prefetched_accounts: Optional['PrefetchedAccounts'] = None
+        # Accounts materialised in the block
+        self.account_cache: Optional['AccountCache'] = None
         self.new_icon_score_mapper: 'IconScoreMapper' = None
         self.cumulative_step_used: int = 0
         self.step_counter: 'IconScoreStepCounter' = None
@@ -13,7 +13,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, List, Optional, Any
 
 from ..base.exception import ExceptionCode
 from .icon_score_event_log import EventLog
@@ -125,3 +125,81 @@ class TransactionResult(object):
                 new_dict[new_key] = value
 
         return new_dict
+
+    def to_response(self) -> dict:
+        """Returns properties in the format of the response to the chain engine
+
+        It is the same as TypeConverter.convert_type_reverse(self.to_dict(to_camel_case))
+        made in one pass without the intermediate dict.
+        :return: a dict whose values are hex strings
+        """
+        response = {}
+        for name, key, serialize in _RESPONSE_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                response[key] = serialize(value)
+
+        failure = self.failure
+        if failure is not None and self.status == self.FAILURE:
+            response['failure'] = {'code': hex(failure.code), 'message': failure.message}
+
+        return response
+
+
+def _serialize_hash(value: bytes) -> str:
+    # 'txHash' and 'blockHash' have no '0x' prefix
+    return bytes.hex(value)
+
+
+def _serialize_bloom(value: BloomFilter) -> str:
+    # 256 bytes of the bloom filter in hex
+    return f'0x{int(value):0512x}'
+
+
+def _serialize_value(value: Any) -> Any:
+    if isinstance(value, int):
+        return hex(value)
+    elif isinstance(value, Address):
+        return str(value)
+    elif isinstance(value, bytes):
+        return f'0x{bytes.hex(value)}'
+    return value
+
+
+def _serialize_values(values: list) -> list:
+    return [_serialize_value(value) for value in values]
+
+
+def _serialize_event_logs(event_logs: list) -> list:
+    serialized_event_logs = []
+    for event_log in event_logs:
+        if not isinstance(event_log, EventLog):
+            continue
+
+        serialized_event_log = {}
+        if event_log.score_address is not None:
+            serialized_event_log['scoreAddress'] = str(event_log.score_address)
+        if event_log.indexed is not None:
+            serialized_event_log['indexed'] = _serialize_values(event_log.indexed)
+        if event_log.data is not None:
+            serialized_event_log['data'] = _serialize_values(event_log.data)
+        serialized_event_logs.append(serialized_event_log)
+
+    return serialized_event_logs
+
+
+# (attribute name, camel case key, serializer) of TransactionResult in the order of to_dict()
+_RESPONSE_FIELDS = (
+    ('tx_hash', 'txHash', _serialize_hash),
+    ('block_height', 'blockHeight', hex),
+    ('block_hash', 'blockHash', _serialize_hash),
+    ('tx_index', 'txIndex', hex),
+    ('to', 'to', str),
+    ('score_address', 'scoreAddress', str),
+    ('step_used', 'stepUsed', hex),
+    ('step_price', 'stepPrice', hex),
+    ('cumulative_step_used', 'cumulativeStepUsed', hex),
+    ('event_logs', 'eventLogs', _serialize_event_logs),
+    ('logs_bloom', 'logsBloom', _serialize_bloom),
+    ('status', 'status', hex)
+)
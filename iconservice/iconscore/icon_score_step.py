@@ -25,6 +25,9 @@ from ..base.exception import IconServiceBaseException, ExceptionCode, InvalidReq
 if TYPE_CHECKING:
     from iconservice.iconscore.icon_score_context import IconScoreContextType
 
+# Input data of a transaction without data field, serialized in JSON
+NULL_INPUT_DATA = b'null'
+
 
 def get_input_data_size(revision: int, input_data: Any) -> int:
     """
@@ -34,6 +37,10 @@ def get_input_data_size(revision: int, input_data: Any) -> int:
     :param input_data: input data of transaction
     :return: size of input data
     """
+    if input_data is None:
+        # A transaction without data field
+        return 0 if revision < REVISION_3 else len(NULL_INPUT_DATA)
+
     if revision < REVISION_3:
         return get_data_size_recursively(input_data)
 
@@ -347,6 +354,16 @@ class IconScoreStepCounter(object):
         self._step_used: int = 0
         self._external_call_count: int = 0
 
+    def has_same_properties(self, other: 'IconScoreStepCounter') -> bool:
+        """Returns True if the other step counter has the same step properties
+
+        :param other: step counter
+        :return:
+        """
+        return self._step_price == other._step_price \
+            and self._max_step_limit == other._max_step_limit \
+            and self._step_costs == other._step_costs
+
     def set_step_price(self, step_price: int):
         """Sets the step price
 
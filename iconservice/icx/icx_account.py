@@ -220,6 +220,13 @@ class Account(object):
         """
         return not self.__eq__(other)
 
+    def clone(self) -> 'Account':
+        """Returns a shallow copy faster than copy.copy()
+        """
+        account = Account.__new__(Account)
+        account.__dict__.update(self.__dict__)
+        return account
+
     @staticmethod
     def from_bytes(buf: bytes):
         """Create Account object from bytes data
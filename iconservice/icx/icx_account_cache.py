@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from .icx_account import Account
+
+
+class AccountCache(object):
+    """Accounts materialised in a block
+
+    An account is kept with the serialized state which it is decoded from or encoded to.
+    It is returned only while the state in the batches is still the same,
+    so the states reverted by revert_call() or dropped on a failed transaction
+    never return a stale account and the batches remain the only source of truth.
+
+    The account kept is the instance which its caller holds, so it is not copied on put.
+    A hit returns a clone which is checked to serialize to the same state,
+    so a change which its holder has not written yet is never returned.
+
+    It is safe to share it among the contexts of a block:
+    an entry is always a right decoding of its state whichever context has put it.
+    """
+
+    def __init__(self) -> None:
+        # key: (serialized state, account, the serialization of the account when it is put)
+        self._entries: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes, value: Optional[bytes]) -> Optional['Account']:
+        """Returns a clone of the account if it is materialised from the same state
+
+        :param key: account key
+        :param value: the current state of the account
+        :return: None if the account should be decoded from the state
+        """
+        entry: Optional[tuple] = self._entries.get(key)
+        if entry is None or entry[0] != value:
+            return None
+
+        # The account is cloned before checked not to miss a change made in the meantime
+        account: 'Account' = entry[1].clone()
+        if account.to_bytes() != entry[2]:
+            return None
+
+        return account
+
+    def put(self, key: bytes, value: Optional[bytes], account: 'Account', encoded: Optional[bytes] = None) -> None:
+        """Keeps the account with its state
+
+        :param key: account key
+        :param value: the state which the account is decoded from or encoded to
+        :param account: account
+        :param encoded: account.to_bytes() if the account is decoded. None means that it is value
+        """
+        self._entries[key] = (value, account, value if encoded is None else encoded)
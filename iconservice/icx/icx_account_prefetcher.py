@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import TYPE_CHECKING, Optional
+
+from iconcommons.logger import Logger
+
+from .icx_account import Account
+from ..base.address import Address, is_icon_address_valid
+from ..base.type_converter import TypeConverter
+from ..database.batch import TransactionBatch
+from ..icon_constant import ICON_SERVICE_LOG_TAG
+from ..iconscore.icon_score_context import IconScoreContext, IconScoreContextType
+
+if TYPE_CHECKING:
+    from .icx_storage import IcxStorage
+
+
+class PrefetchedAccounts(object):
+    """Accounts at the start of a block which are loaded in the background
+
+    An account is valid only until a transaction in the block writes it,
+    so IcxStorage consults it only for the keys which are not in the batches of the block.
+    Each account is handed out once without being copied,
+    so a change which a transaction has not written never reaches another one.
+    """
+
+    def __init__(self) -> None:
+        self._accounts: dict = {}
+        self._cancelled: bool = False
+        self._future: Optional['Future'] = None
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def get(self, key: bytes) -> Optional['Account']:
+        """Hands over the account prefetched
+
+        :param key: account key
+        :return: None if the account is not loaded yet or has been handed out
+        """
+        return self._accounts.pop(key, None)
+
+    def load(self, storage: 'IcxStorage', context: 'IconScoreContext', addresses: list, chunk_size: int) -> None:
+        """Reads the accounts in chunks, each of which is read from one snapshot of StateDB
+
+        The chunks are in transaction order to load the accounts of the earlier transactions first.
+
+        :param storage: icx storage
+        :param context: context which reads the states at the start of the block
+        :param addresses: account addresses
+        :param chunk_size: the number of accounts read at once
+        """
+        for i in range(0, len(addresses), chunk_size):
+            if self._cancelled:
+                return
+
+            chunk: list = sorted(addresses[i:i + chunk_size], key=Address.to_bytes)
+            keys: list = [address.to_bytes() for address in chunk]
+            values: list = storage.db.get_many(context, keys)
+
+            for address, key, value in zip(chunk, keys, values):
+                account = Account.from_bytes(value) if value else Account()
+                account.address = address
+                self._accounts[key] = account
+
+    def cancel(self) -> None:
+        """Stops loading and waits for the chunk being read
+
+        It is called at the end of the block
+        not to read the states while the next block is invoked or committed.
+        """
+        self._cancelled = True
+        if self._future is not None:
+            wait([self._future])
+            self._future = None
+
+
+class AccountPrefetcher(object):
+    """Loads the accounts which the transactions in a block will access on a background thread
+
+    Reading and decoding the accounts leave the path of the transactions executed in serial.
+    The states are read without the GIL, so they are loaded while the transactions are executed.
+    """
+
+    CHUNK_SIZE = 32
+
+    def __init__(self, storage: 'IcxStorage') -> None:
+        """Constructor
+
+        :param storage: icx storage
+        """
+        self._storage = storage
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix='AccountPrefetcher')
+
+    @staticmethod
+    def collect_addresses(tx_requests: list, fee_treasury_address: Optional['Address']) -> list:
+        """Returns the addresses of the accounts which the transactions in a block will access
+
+        :param tx_requests: transactions in a block
+        :param fee_treasury_address: the account which every transaction pays fee to
+        :return: addresses without duplicates in transaction order
+        """
+        # The addresses of the transactions not executed yet are strings not converted
+        raw_addresses = {}
+        if fee_treasury_address is not None:
+            raw_addresses[fee_treasury_address] = None
+
+        for tx_request in tx_requests:
+            for name in ('from', 'to'):
+                address = TypeConverter.peek(tx_request, 'params', name, convert=False)
+                if address is not None:
+                    raw_addresses[address] = None
+
+        # Each distinct string is converted once and the invalid ones are skipped
+        addresses = {}
+        for address in raw_addresses:
+            if isinstance(address, str) and is_icon_address_valid(address):
+                address = Address.from_string(address)
+            if isinstance(address, Address):
+                addresses[address] = None
+
+        return list(addresses)
+
+    def start(self, context: 'IconScoreContext', addresses: list) -> 'PrefetchedAccounts':
+        """Starts loading the accounts at the start of a block
+
+        :param context: invoke context before any transaction is executed
+        :param addresses: account addresses
+        :return: accounts to be loaded
+        """
+        # The batch of the block itself is changed while the accounts are loaded
+        prefetch_context = IconScoreContext(IconScoreContextType.INVOKE)
+        prefetch_context.block = context.block
+        prefetch_context.block_batch = context.block_batch.parent
+        prefetch_context.tx_batch = TransactionBatch()
+
+        prefetched_accounts = PrefetchedAccounts()
+        prefetched_accounts._future = self._executor.submit(
+            self._run, prefetched_accounts, prefetch_context, addresses)
+        return prefetched_accounts
+
+    def _run(self,
+             prefetched_accounts: 'PrefetchedAccounts',
+             context: 'IconScoreContext',
+             addresses: list) -> None:
+        try:
+            prefetched_accounts.load(self._storage, context, addresses, self.CHUNK_SIZE)
+        except BaseException as e:
+            # Transactions read the accounts which are not loaded from StateDB
+            Logger.warning(f'Account prefetch failed: {e}', ICON_SERVICE_LOG_TAG)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -22,7 +22,7 @@ from .icx_account import Account, AccountType
 from .icx_storage import IcxStorage
 from ..base.address import Address
 from ..base.exception import InvalidParamsException
-from ..icon_constant import ICX_LOG_TAG
+from ..icon_constant import ICX_LOG_TAG, REVISION_5
 
 if TYPE_CHECKING:
     from ..iconscore.icon_score_context import IconScoreContext
@@ -67,6 +67,10 @@ class IcxEngine(object):
     def storage(self) -> 'IcxStorage':
         return self._storage
 
+    @property
+    def fee_treasury_address(self) -> 'Address':
+        return self._fee_treasury_address
+
     def close(self) -> None:
         """Close resources
         """
@@ -206,12 +210,36 @@ class IcxEngine(object):
         """Charge a fee for a tx
         It MUST NOT raise any exceptions
 
+        Since REVISION_5, the fee is only withdrawn from the sender here
+        and IconServiceEngine credits the fees of a block to the fee treasury at once
+        with credit_fee_treasury() at the end of the block.
+        So the balance of the fee treasury read in the middle of a block
+        does not include any fee charged in the block.
+
         :param context:
         :param from_:
         :param fee:
         :return:
         """
-        self._transfer(context, from_, self._fee_treasury_address, fee)
+        if context.revision < REVISION_5:
+            self._transfer(context, from_, self._fee_treasury_address, fee)
+        elif fee > 0:
+            account = self._storage.get_account(context, from_)
+            account.withdraw(fee)
+            self._storage.put_account(context, account.address, account)
+
+    def credit_fee_treasury(self,
+                            context: 'IconScoreContext',
+                            fee: int) -> None:
+        """Credits the fees charged in a block to the fee treasury
+
+        :param context:
+        :param fee: the sum of the fees charged since REVISION_5 in the block
+        """
+        if fee > 0:
+            account = self._storage.get_account(context, self._fee_treasury_address)
+            account.deposit(fee)
+            self._storage.put_account(context, account.address, account)
 
     def transfer(self,
                  context: 'IconScoreContext',
@@ -238,8 +266,7 @@ class IcxEngine(object):
         """
         if from_ != to and amount > 0:
             # get account info from state db.
-            from_account = self._storage.get_account(context, from_)
-            to_account = self._storage.get_account(context, to)
+            from_account, to_account = self._storage.get_accounts(context, [from_, to])
 
             from_account.withdraw(amount)
             to_account.deposit(amount)
@@ -22,12 +22,13 @@ from ..base.block import Block
 from ..icon_constant import DEFAULT_BYTE_SIZE, DATA_BYTE_ORDER
 
 if TYPE_CHECKING:
+    from .icx_account_cache import AccountCache
     from ..database.db import ContextDatabase
     from ..iconscore.icon_score_context import IconScoreContext
 
 
 class IcxStorage(object):
-    _LAST_BLOCK_KEY = b'last_block'
+    LAST_BLOCK_KEY = b'last_block'
 
     """Icx coin state manager embedding a state db wrapper
     """
@@ -53,14 +54,33 @@ class IcxStorage(object):
         return self._last_block
 
     def load_last_block_info(self, context: Optional['IconScoreContext']) -> None:
-        block_bytes = self._db.get(context, self._LAST_BLOCK_KEY)
+        block_bytes = self._db.get(context, self.LAST_BLOCK_KEY)
         if block_bytes is None:
             return
 
         self._last_block = Block.from_bytes(block_bytes)
 
+    def get_last_block(self, context: 'IconScoreContext') -> Optional['Block']:
+        """Returns the last block whose states are seen on a given context
+
+        :param context:
+        :return: None if no block has been committed
+        """
+        block_bytes = self._db.get(context, self.LAST_BLOCK_KEY)
+        if block_bytes is None:
+            return None
+
+        return Block.from_bytes(block_bytes)
+
     def put_block_info(self, context: 'IconScoreContext', block: 'Block') -> None:
-        self._db.put(context, self._LAST_BLOCK_KEY, bytes(block))
+        self._db.put(context, self.LAST_BLOCK_KEY, bytes(block))
+        self._last_block = block
+
+    def set_last_block(self, block: 'Block') -> None:
+        """Sets the last block whose info has been written along with its states
+
+        :param block:
+        """
         self._last_block = block
 
     def get_text(self, context: 'IconScoreContext', name: str) -> Optional[str]:
@@ -104,7 +124,55 @@ class IcxStorage(object):
             create a new account.
         """
         key = address.to_bytes()
+        account: Optional['Account'] = self._get_prefetched_account(context, key)
+        if account is not None:
+            return account
+
         value = self._db.get(context, key)
+        return self._materialize_account(context, key, address, value)
+
+    def get_accounts(self,
+                     context: 'IconScoreContext',
+                     addresses: list) -> list:
+        """Returns the accounts indicated by addresses at once.
+
+        :param context:
+        :param addresses: account addresses
+        :return: (list) accounts in the same order as addresses
+            If an account is not present, create a new account.
+        """
+        keys = [address.to_bytes() for address in addresses]
+        accounts = [self._get_prefetched_account(context, key) for key in keys]
+        missing_indexes = [i for i, account in enumerate(accounts) if account is None]
+        if not missing_indexes:
+            return accounts
+
+        values = self._db.get_many(context, [keys[i] for i in missing_indexes])
+
+        for i, value in zip(missing_indexes, values):
+            accounts[i] = self._materialize_account(context, keys[i], addresses[i], value)
+
+        return accounts
+
+    @staticmethod
+    def _materialize_account(context: Optional['IconScoreContext'],
+                             key: bytes,
+                             address: 'Address',
+                             value: Optional[bytes]) -> 'Account':
+        """Returns the account decoded from its state
+        or the one materialised from the same state in the block
+
+        :param context:
+        :param key: account key
+        :param address: account address
+        :param value: the state of the account
+        :return: (Account)
+        """
+        account_cache: Optional['AccountCache'] = None if context is None else context.account_cache
+        if account_cache is not None:
+            account: Optional['Account'] = account_cache.get(key, value)
+            if account is not None:
+                return account
 
         if value:
             account = Account.from_bytes(value)
@@ -112,6 +180,27 @@ class IcxStorage(object):
             account = Account()
 
         account.address = address
+        if account_cache is not None:
+            account_cache.put(key, value, account, account.to_bytes())
+        return account
+
+    @staticmethod
+    def _get_prefetched_account(context: Optional['IconScoreContext'], key: bytes) -> Optional['Account']:
+        """Returns the account loaded at the start of the block
+        if no transaction in the block has written it
+
+        :param context:
+        :param key: account key
+        :return: None if the account should be read from db
+        """
+        if context is None or context.prefetched_accounts is None:
+            return None
+        if key in context.tx_batch or key in context.block_batch:
+            return None
+
+        account: Optional['Account'] = context.prefetched_accounts.get(key)
+        if account is not None and context.read_set is not None:
+            context.read_set.add(key)
         return account
 
     def put_account(self,
@@ -128,6 +217,9 @@ class IcxStorage(object):
         value = account.to_bytes()
         self._db.put(context, key, value)
 
+        if context is not None and context.account_cache is not None:
+            context.account_cache.put(key, value, account)
+
     def delete_account(self,
                        context: 'IconScoreContext',
                        address: 'Address') -> None:
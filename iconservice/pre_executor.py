@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import Lock
+from typing import TYPE_CHECKING, Optional
+
+from iconcommons.logger import Logger
+
+from .database.factory import ContextDatabaseFactory
+from .icon_constant import ICON_SERVICE_LOG_TAG
+from .iconscore.icon_score_context import ContextContainer, IconScoreContext
+from .iconscore.icon_score_result import TransactionResult
+
+if TYPE_CHECKING:
+    from .base.transaction import Transaction
+    from .base.block import Block
+    from .database.batch import TransactionBatch
+    from .database.read_set import ReadSet
+
+
+class PreExecution(object):
+    """The result of a transaction executed on the committed states before its block arrives
+    """
+
+    def __init__(self,
+                 tx_result: 'TransactionResult',
+                 tx_batch: 'TransactionBatch',
+                 read_set: 'ReadSet',
+                 context: 'IconScoreContext') -> None:
+        self.tx_result = tx_result
+        self.tx_batch = tx_batch
+        self.read_set = read_set
+        # Commit sequence number of the states which the transaction has read
+        self.commit_seq: int = context.snapshot.seq
+        self.revision: int = context.revision
+        self.icon_service_flag: int = context.icon_service_flag
+        self.step_counter = context.step_counter
+
+    def is_valid(self, written_keys: set) -> bool:
+        """Returns True if none of the states it has read is written after them
+
+        :param written_keys: keys written by the later commits and the earlier transactions in the block
+        :return:
+        """
+        return not self.read_set.conflicts_with(written_keys)
+
+    def is_applicable(self, context: 'IconScoreContext') -> bool:
+        """Returns True if the transaction would be executed with the same properties in the block
+
+        :param context: invoke context of the block
+        :return:
+        """
+        return self.revision == context.revision \
+            and self.icon_service_flag == context.icon_service_flag \
+            and self.step_counter.has_same_properties(context.step_counter)
+
+    def make_tx_result(self, tx: 'Transaction', block: 'Block') -> 'TransactionResult':
+        """Returns the transaction result bound to the block
+
+        :param tx: transaction in the block
+        :param block: block which the transaction belongs to
+        :return: transaction result
+        """
+        result: 'TransactionResult' = self.tx_result
+        tx_result = TransactionResult(tx,
+                                      block,
+                                      to=result.to,
+                                      score_address=result.score_address,
+                                      step_used=result.step_used,
+                                      step_price=result.step_price,
+                                      event_logs=result.event_logs,
+                                      logs_bloom=result.logs_bloom,
+                                      status=result.status)
+        tx_result.failure = result.failure
+        tx_result.traces = result.traces
+        return tx_result
+
+
+class PreExecutor(ContextContainer):
+    """Executes the validated transactions on the latest committed states
+    while they wait for their block in the transaction pool
+
+    A result is kept with the keys the transaction has read, keyed by tx hash.
+    IconServiceEngine reuses it in a block
+    only if none of the keys is written after the states it has read,
+    by the committed blocks, the uncommitted parent blocks or the earlier transactions in the block.
+    """
+
+    def __init__(self, cache_size: int, max_commit_lag: int) -> None:
+        """Constructor
+
+        :param cache_size: the max number of the results kept
+        :param max_commit_lag: the number of the latest commits whose written keys are kept.
+            A result on the states older than them is discarded.
+        """
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix='PreExecutor')
+        self._lock = Lock()
+        self._cache_size: int = max(1, cache_size)
+        self._max_commit_lag: int = max(1, max_commit_lag)
+
+        # tx hash: future of Optional[PreExecution]
+        self._futures = OrderedDict()
+        # commit sequence number: keys written by the commit
+        self._written_keys = OrderedDict()
+
+        self._pre_executed = 0
+        self._reused = 0
+        self._discarded = 0
+
+    @property
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                'preExecuted': self._pre_executed,
+                'reused': self._reused,
+                'discarded': self._discarded,
+                'cached': len(self._futures)
+            }
+
+    def submit(self, invoke_func: callable, context: 'IconScoreContext', request: dict) -> None:
+        """Executes a transaction on the background thread
+
+        :param invoke_func: invoke_func(context, request, index) -> TransactionResult
+        :param context: context with a snapshot of the committed states.
+            The snapshot is released after the execution.
+        :param request: transaction request
+        """
+        tx_hash: bytes = request['params']['txHash']
+
+        with self._lock:
+            if tx_hash in self._futures:
+                ContextDatabaseFactory.release_snapshot(context.snapshot)
+                return
+
+            self._pre_executed += 1
+            self._futures[tx_hash] = self._executor.submit(self._run, invoke_func, context, request)
+            while len(self._futures) > self._cache_size:
+                self._futures.popitem(last=False)
+
+    def _run(self,
+             invoke_func: callable,
+             context: 'IconScoreContext',
+             request: dict) -> Optional['PreExecution']:
+        self._clear_context()
+
+        try:
+            tx_result: 'TransactionResult' = invoke_func(context, request, 0)
+            return PreExecution(tx_result, context.tx_batch, context.read_set, context)
+        except BaseException as e:
+            Logger.warning(f'Pre-execution failed: {e}', ICON_SERVICE_LOG_TAG)
+            return None
+        finally:
+            ContextDatabaseFactory.release_snapshot(context.snapshot)
+            self._clear_context()
+
+    def take(self, tx_hash: bytes) -> Optional['PreExecution']:
+        """Removes the result of a transaction from the cache
+
+        A transaction whose pre-execution is not finished yet is not waited for.
+
+        :param tx_hash: tx hash
+        :return: None if there is no finished pre-execution
+        """
+        with self._lock:
+            future: Optional['Future'] = self._futures.pop(tx_hash, None)
+
+        if future is None or not future.done() or future.cancelled():
+            return None
+
+        return future.result()
+
+    def get_written_keys(self, commit_seq: int) -> Optional[set]:
+        """Returns the keys written by the commits after commit_seq
+
+        :param commit_seq: commit sequence number of the states which a transaction has read
+        :return: None if some of the commits are not kept
+        """
+        with self._lock:
+            if commit_seq + 1 not in self._written_keys and commit_seq + 1 <= self._last_commit_seq():
+                return None
+
+            written_keys = set()
+            for seq, keys in self._written_keys.items():
+                if seq > commit_seq:
+                    written_keys.update(keys)
+            return written_keys
+
+    def _last_commit_seq(self) -> int:
+        return next(reversed(self._written_keys)) if self._written_keys else 0
+
+    def on_committed(self, commit_seq: int, written_keys: set) -> None:
+        """Records the keys written by a commit
+
+        :param commit_seq: commit sequence number after the commit
+        :param written_keys: keys written by the commit
+        """
+        with self._lock:
+            self._written_keys[commit_seq] = written_keys
+            while len(self._written_keys) > self._max_commit_lag:
+                self._written_keys.popitem(last=False)
+
+    def on_reused(self) -> None:
+        with self._lock:
+            self._reused += 1
+
+    def on_discarded(self) -> None:
+        with self._lock:
+            self._discarded += 1
+
+    def close(self) -> None:
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+
+        self._executor.shutdown(wait=True)
@@ -13,15 +13,20 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from copy import copy
 from enum import IntFlag
 from threading import Lock
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from .base.block import Block
 from .base.exception import ServerErrorException
 from .database.batch import BlockBatch
 from .iconscore.icon_score_mapper import IconScoreMapper
 
+if TYPE_CHECKING:
+    from .database.batch import TransactionBatch
+    from .iconscore.icon_score_result import TransactionResult
+
 
 class PrecommitFlag(IntFlag):
     # Empty
@@ -36,18 +41,62 @@ class PrecommitFlag(IntFlag):
     STEP_ALL_CHANGED = 0xf0
 
 
+class TransactionCheckpoint(object):
+    """The states written by a transaction in a block and its result
+
+    A checkpoint is never changed after it is made,
+    so the competing blocks which begin with the same transactions share it.
+    """
+
+    def __init__(self,
+                 tx_batch: 'TransactionBatch',
+                 tx_result: 'TransactionResult',
+                 block_independent: bool) -> None:
+        """Constructor
+
+        :param tx_batch: the states written by the transaction
+        :param tx_result: result of the transaction
+        :param block_independent: True if the result does not depend on the height and the timestamp of the block
+        """
+        self.tx_hash: bytes = tx_result.tx_hash
+        self.states: tuple = tuple(tx_batch.items())
+        self.tx_result = tx_result
+        self.block_independent = block_independent
+
+    def make_tx_result(self, block: 'Block') -> 'TransactionResult':
+        """Returns the transaction result bound to another block
+
+        :param block: block which begins with the same transactions
+        :return: transaction result
+        """
+        tx_result: 'TransactionResult' = copy(self.tx_result)
+        tx_result.block_hash = block.hash
+        return tx_result
+
+
 class PrecommitData(object):
     def __init__(self,
                  block_batch: 'BlockBatch',
                  block_result: list,
                  score_mapper: Optional['IconScoreMapper']=None,
-                 precommit_flag: PrecommitFlag = PrecommitFlag.NONE):
+                 precommit_flag: PrecommitFlag = PrecommitFlag.NONE,
+                 trie_root: Optional[bytes] = None,
+                 trie_states: Optional[dict] = None,
+                 tx_hashes: Optional[list] = None,
+                 checkpoints: Optional[list] = None):
         """
 
         :param block_batch: changed states for a block
         :param block_result: tx_results made from transactions in a block
         :param score_mapper: newly deployed scores in a block
         :param precommit_flag: precommit flag
+        :param trie_root: the root hash of the state trie after the block
+            None if the state trie is not enabled
+        :param trie_states: trie nodes to be written with the block batch
+        :param tx_hashes: hashes of the transactions in a block filled by IconServiceEngine.build_block()
+            None if the block is invoked
+        :param checkpoints: TransactionCheckpoint list of the leading transactions in a block
+            None if the checkpoints are not made
 
         """
         self.block_batch = block_batch
@@ -55,12 +104,23 @@ class PrecommitData(object):
         self.score_mapper = score_mapper
         self.precommit_flag = precommit_flag
         self.block = block_batch.block
-        self.state_root_hash: bytes = self.block_batch.digest()
+        # The first block whose states are in the block batch.
+        # It differs from the block once the precommit data of its child blocks are merged into it
+        self.first_block = block_batch.block
+        self.trie_states = trie_states
+        self.tx_hashes = tx_hashes
+        self.checkpoints = checkpoints
+        if trie_root is None:
+            self.state_root_hash: bytes = self.block_batch.digest()
+        else:
+            self.state_root_hash: bytes = trie_root
 
 
 class PrecommitDataManager(object):
     """Manages multiple precommit data made from next candidate block
 
+    Precommit data form a tree rooted at the last committed block.
+    A block can be invoked on top of a precommitted block which has not been committed yet.
     """
 
     def __init__(self):
@@ -91,16 +151,155 @@ class PrecommitDataManager(object):
         precommit_data = self._precommit_data_mapper.get(block_hash)
         return precommit_data
 
+    def change_built_block_hash(self, block: 'Block', tx_hashes: list) -> Optional['PrecommitData']:
+        """Finds the built block which differs from a given block only in the block hash
+        and changes its block hash to the one of the block
+
+        :param block: block to invoke
+        :param tx_hashes: hashes of the transactions in the block
+        :return: None if there is no such a built block
+        """
+        for precommit_data in self._precommit_data_mapper.values():
+            built_block: 'Block' = precommit_data.block
+            if precommit_data.tx_hashes == tx_hashes \
+                    and built_block.height == block.height \
+                    and built_block.prev_hash == block.prev_hash \
+                    and built_block.timestamp == block.timestamp:
+                break
+        else:
+            return None
+
+        # A block built on the provisional block hash is not found by the new one
+        if any(data.first_block.prev_hash == built_block.hash for data in self._precommit_data_mapper.values()):
+            return None
+
+        del self._precommit_data_mapper[built_block.hash]
+        precommit_data.block_batch.block = Block.from_block(block)
+        precommit_data.block = precommit_data.block_batch.block
+        precommit_data.first_block = precommit_data.block
+        for tx_result in precommit_data.block_result:
+            tx_result.block_hash = block.hash
+        self._precommit_data_mapper[block.hash] = precommit_data
+        return precommit_data
+
+    def find_checkpoints(self, block: 'Block', tx_hashes: list) -> list:
+        """Finds the longest checkpoints of a competing block
+        which begins with the same transactions as a given block
+
+        A result which depends on the block is reused
+        only in a block with the same height and timestamp.
+
+        :param block: block to invoke
+        :param tx_hashes: hashes of the transactions in the block
+        :return: TransactionCheckpoint list. Empty if there is no such a block
+        """
+        longest = []
+        for precommit_data in self._precommit_data_mapper.values():
+            sibling: 'Block' = precommit_data.block
+            if precommit_data.checkpoints is None \
+                    or sibling.prev_hash != block.prev_hash \
+                    or sibling.height != block.height:
+                continue
+
+            same_timestamp: bool = sibling.timestamp == block.timestamp
+            count = 0
+            for checkpoint, tx_hash in zip(precommit_data.checkpoints, tx_hashes):
+                if checkpoint.tx_hash != tx_hash or not (same_timestamp or checkpoint.block_independent):
+                    break
+                count += 1
+
+            if count > len(longest):
+                longest = precommit_data.checkpoints[:count]
+
+        return longest
+
+    def merge_into_parent(self, block_hash: bytes) -> Optional['PrecommitData']:
+        """Merges the precommit data of a block into the one of its uncommitted parent block
+
+        The merged data is found by the hash of the block
+        and the states of both blocks are committed at once.
+        Blocks are not merged if any of them has another child.
+
+        :param block_hash:
+        :return: merged precommit data. None if the block is not merged
+        """
+        child: Optional['PrecommitData'] = self._precommit_data_mapper.get(block_hash)
+        if child is None:
+            return None
+
+        parent: Optional['PrecommitData'] = self._precommit_data_mapper.get(child.first_block.prev_hash)
+        if parent is None:
+            return None
+
+        for precommit_data in self._precommit_data_mapper.values():
+            if precommit_data.first_block.prev_hash == block_hash or \
+                    (precommit_data is not child and precommit_data.first_block.prev_hash == parent.block.hash):
+                return None
+
+        del self._precommit_data_mapper[parent.block.hash]
+        parent.block_batch.update(child.block_batch)
+        parent.block_batch.block = child.block_batch.block
+        parent.block = parent.block_batch.block
+        parent.block_result = child.block_result
+        # The score mapper of a block contains the SCOREs deployed in its parent blocks
+        parent.score_mapper = child.score_mapper
+        parent.precommit_flag |= child.precommit_flag
+        if child.trie_states:
+            if parent.trie_states is None:
+                parent.trie_states = {}
+            parent.trie_states.update(child.trie_states)
+        parent.state_root_hash = child.state_root_hash
+        parent.tx_hashes = None
+        parent.checkpoints = None
+        self._precommit_data_mapper[block_hash] = parent
+        return parent
+
+    def get_chain(self, block_hash: bytes) -> list:
+        """Returns the precommit data from the oldest uncommitted ancestor to a given block
+
+        :param block_hash:
+        :return: precommit data list. Empty if there is no precommit data for the block
+        """
+        chain = []
+        precommit_data = self._precommit_data_mapper.get(block_hash)
+        while precommit_data is not None:
+            chain.append(precommit_data)
+            precommit_data = self._precommit_data_mapper.get(precommit_data.first_block.prev_hash)
+
+        chain.reverse()
+        return chain
+
     def commit(self, block: 'Block'):
+        """Removes the committed block and the blocks which are not its descendants
+
+        The children of the committed block are detached from it
+        because its states are read from the state db from now on.
+
+        :param block: committed block
+        """
         with self._lock:
             self._last_block = block
 
+        descendants: dict = self._get_descendants(block.hash)
+        for precommit_data in descendants.values():
+            if precommit_data.first_block.prev_hash == block.hash:
+                precommit_data.block_batch.parent = None
+
         # Clear remaining precommit data which have the same block height
-        self._precommit_data_mapper.clear()
+        # or which are built on them
+        self._precommit_data_mapper = descendants
 
     def rollback(self, block: 'Block'):
-        if block.hash in self._precommit_data_mapper:
-            del self._precommit_data_mapper[block.hash]
+        """Removes the precommit data of a block and all of its descendants
+
+        :param block:
+        """
+        if block.hash not in self._precommit_data_mapper:
+            return
+
+        for block_hash in self._get_descendants(block.hash):
+            del self._precommit_data_mapper[block_hash]
+        del self._precommit_data_mapper[block.hash]
 
     def empty(self) -> bool:
         return len(self._precommit_data_mapper) == 0
@@ -112,17 +311,24 @@ class PrecommitDataManager(object):
         """
         self._precommit_data_mapper.clear()
 
-    def validate_block_to_invoke(self, block: 'Block'):
+    def validate_block_to_invoke(self, block: 'Block') -> Optional['PrecommitData']:
         """Check if the block to invoke is valid before invoking it
 
+        A block is invoked on top of the last committed block or a precommitted block.
+
         :param block: block to invoke
+        :return: the precommit data of the parent block
+            None if the parent block has been committed
         """
-        if self._last_block is None:
-            return
-
-        if block.prev_hash == self._last_block.hash and \
+        parent: Optional['PrecommitData'] = self._precommit_data_mapper.get(block.prev_hash)
+        if parent is not None:
+            if block.height == parent.block.height + 1:
+                return parent
+        elif self._last_block is None:
+            return None
+        elif block.prev_hash == self._last_block.hash and \
                 block.height == self._last_block.height + 1:
-            return
+            return None
 
         raise ServerErrorException(
             f'Failed to invoke a block: '
@@ -137,17 +343,37 @@ class PrecommitDataManager(object):
         """
         assert isinstance(precommit_block, Block)
 
-        precommit_data = self._precommit_data_mapper.get(precommit_block.hash)
-        if precommit_data is None:
+        chain: list = self.get_chain(precommit_block.hash)
+        if len(chain) == 0:
             raise ServerErrorException(
                 f'No precommit data: precommit_block({precommit_block})')
 
         if self._last_block is None:
             return
 
-        precommit_block = precommit_data.block
+        # The oldest uncommitted ancestor must follow the last committed block
+        first_block = chain[0].first_block
 
-        if self._last_block.hash != precommit_block.prev_hash or \
-                self._last_block.height + 1 != precommit_block.height:
+        if self._last_block.hash != first_block.prev_hash or \
+                self._last_block.height + 1 != first_block.height:
             raise ServerErrorException(
                 f'Invalid precommit block: last_block({self._last_block}) precommit_block({precommit_block})')
+
+    def _get_descendants(self, block_hash: bytes) -> dict:
+        """Returns the precommit data built on a given block
+
+        :param block_hash:
+        :return: block hash: precommit data
+        """
+        children = {}
+        for precommit_data in self._precommit_data_mapper.values():
+            children.setdefault(precommit_data.first_block.prev_hash, []).append(precommit_data)
+
+        descendants = {}
+        parents = [block_hash]
+        while parents:
+            for precommit_data in children.get(parents.pop(), ()):
+                descendants[precommit_data.block.hash] = precommit_data
+                parents.append(precommit_data.block.hash)
+
+        return descendants
@@ -15,6 +15,7 @@
 # limitations under the License.
 
 import unittest
+from unittest.mock import patch
 
 from iconservice.base.address import Address, AddressPrefix, \
     ICON_EOA_ADDRESS_PREFIX, ICON_CONTRACT_ADDRESS_PREFIX, \
@@ -151,6 +152,31 @@ class TestAddress(unittest.TestCase):
         self.assertEqual(e.exception.code, ExceptionCode.INVALID_PARAMS)
         self.assertEqual(e.exception.message, "Invalid address")
 
+    def test_intern_address(self):
+        address = create_address(AddressPrefix.CONTRACT)
+
+        # The addresses created from the same string or bytes are the same instance
+        self.assertIs(Address.from_string(str(address)), Address.from_string(str(address)))
+        self.assertIs(Address.from_bytes(address.to_bytes()), Address.from_bytes(address.to_bytes()))
+        self.assertEqual(address, Address.from_string(str(address)))
+        self.assertEqual(address, Address.from_bytes(address.to_bytes()))
+
+        with patch('iconservice.base.address.MAX_INTERNED_ADDRESSES', 2):
+            interned_address = Address.from_string(str(address))
+            for _ in range(2):
+                Address.from_string(str(create_address()))
+            self.assertIsNot(interned_address, Address.from_string(str(address)))
+
+    def test_cached_encodings(self):
+        address = create_address(AddressPrefix.CONTRACT)
+        self.assertFalse(hasattr(address, '__dict__'))
+        self.assertFalse(hasattr(MalformedAddress.from_string("hx123456"), '__dict__'))
+
+        for _ in range(2):
+            self.assertEqual(f'cx{address.body.hex()}', str(address))
+            self.assertEqual(b'\x01' + address.body, address.to_bytes())
+            self.assertEqual(hash(address.to_bytes()), hash(address))
+
 
 if __name__ == '__main__':
     unittest.main()
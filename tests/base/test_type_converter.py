@@ -14,11 +14,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import unittest
+from copy import deepcopy
 
 from iconservice.base.exception import ExceptionCode, InvalidParamsException
 from iconservice.base.type_converter import TypeConverter
 from iconservice.base.type_converter_templates import ParamType, ConstantKeys
+from iconservice.icon_constant import REVISION_3
+from iconservice.iconscore.icon_score_step import get_input_data_size
 from tests import create_block_hash, create_address
 
 from typing import TYPE_CHECKING, Optional, Union
@@ -716,6 +720,183 @@ class TestTypeConverter(unittest.TestCase):
         self.assertEqual(nonce, params_params[ConstantKeys.NONCE])
         self.assertEqual(signature, params_params[ConstantKeys.SIGNATURE])
 
+    def test_convert_not_modifying_params(self):
+        from_addr = create_address()
+        to_addr = create_address(1)
+        tx_hash = create_block_hash()
+
+        request = {
+            ConstantKeys.BLOCK: {
+                ConstantKeys.BLOCK_HEIGHT: hex(1),
+                ConstantKeys.BLOCK_HASH: bytes.hex(create_block_hash()),
+                ConstantKeys.TIMESTAMP: hex(12345),
+                ConstantKeys.PREV_BLOCK_HASH: bytes.hex(create_block_hash())
+            },
+            ConstantKeys.TRANSACTIONS: [
+                {
+                    ConstantKeys.METHOD: "icx_sendTransaction",
+                    ConstantKeys.PARAMS: {
+                        ConstantKeys.FROM: str(from_addr),
+                        ConstantKeys.TO: str(to_addr),
+                        ConstantKeys.VALUE: hex(self.icx_factor),
+                        ConstantKeys.OLD_TX_HASH: bytes.hex(tx_hash),
+                        ConstantKeys.DATA_TYPE: "call",
+                        ConstantKeys.DATA: {
+                            ConstantKeys.METHOD: "transfer",
+                            ConstantKeys.PARAMS: {"value": hex(1)}
+                        }
+                    }
+                }
+            ]
+        }
+        expected = deepcopy(request)
+
+        ret_params = TypeConverter.convert(request, ParamType.INVOKE)
+        self.assertEqual(expected, request)
+
+        params = ret_params[ConstantKeys.TRANSACTIONS][0][ConstantKeys.PARAMS]
+        self.assertEqual(from_addr, params[ConstantKeys.FROM])
+        self.assertEqual(to_addr, params[ConstantKeys.TO])
+        self.assertEqual(self.icx_factor, params[ConstantKeys.VALUE])
+        self.assertEqual(tx_hash, params[ConstantKeys.TX_HASH])
+        self.assertNotIn(ConstantKeys.OLD_TX_HASH, params)
+        self.assertEqual({"value": hex(1)}, params[ConstantKeys.DATA][ConstantKeys.PARAMS])
+
+        # The converter compiled already gives the same result
+        self.assertEqual(ret_params, TypeConverter.convert(request, ParamType.INVOKE))
+
+    def _make_invoke_request(self, from_addr: 'Address', count: int) -> dict:
+        transactions = []
+        for i in range(count):
+            params = {
+                ConstantKeys.FROM: str(from_addr),
+                ConstantKeys.TO: str(create_address(1)),
+                ConstantKeys.VALUE: hex(i * self.icx_factor),
+                ConstantKeys.STEP_LIMIT: hex(self.icx_fee),
+                ConstantKeys.TIMESTAMP: hex(12345 + i),
+                ConstantKeys.NONCE: hex(i),
+                ConstantKeys.SIGNATURE: self.signature,
+                ConstantKeys.OLD_TX_HASH: bytes.hex(create_block_hash())
+            }
+            if i % 2:
+                params[ConstantKeys.DATA_TYPE] = "call"
+                params[ConstantKeys.DATA] = {
+                    ConstantKeys.METHOD: "transfer",
+                    ConstantKeys.PARAMS: {"value": hex(i)}
+                }
+            transactions.append({ConstantKeys.METHOD: "icx_sendTransaction", ConstantKeys.PARAMS: params})
+
+        return {
+            ConstantKeys.BLOCK: {
+                ConstantKeys.BLOCK_HEIGHT: hex(1),
+                ConstantKeys.BLOCK_HASH: bytes.hex(create_block_hash()),
+                ConstantKeys.TIMESTAMP: hex(12345),
+                ConstantKeys.PREV_BLOCK_HASH: bytes.hex(create_block_hash())
+            },
+            ConstantKeys.TRANSACTIONS: transactions
+        }
+
+    def test_lazy_convert(self):
+        request = self._make_invoke_request(create_address(), 4)
+        expected = TypeConverter.convert(request, ParamType.INVOKE)
+
+        ret_params = TypeConverter.convert(request, ParamType.INVOKE, lazy=True)
+        self.assertEqual(expected, ret_params)
+
+        # The values converted are the same as the ones of a plain dict
+        ret_params = TypeConverter.convert(request, ParamType.INVOKE, lazy=True)
+        TypeConverter.resolve(ret_params)
+        self.assertEqual(expected, dict(ret_params))
+        self.assertEqual(expected[ConstantKeys.TRANSACTIONS][1][ConstantKeys.PARAMS],
+                         {**ret_params[ConstantKeys.TRANSACTIONS][1][ConstantKeys.PARAMS]})
+
+    def test_lazy_convert_on_access(self):
+        from_addr = create_address()
+        request = self._make_invoke_request(from_addr, 2)
+
+        ret_params = TypeConverter.convert(request, ParamType.INVOKE, lazy=True)
+        transactions = ret_params[ConstantKeys.TRANSACTIONS]
+
+        # The transactions are kept as they are until they are accessed
+        transaction = transactions[1]
+        self.assertEqual(0, dict.__len__(transaction))
+        params = transaction[ConstantKeys.PARAMS]
+        self.assertEqual(2, dict.__len__(transaction))
+        self.assertEqual(from_addr, params[ConstantKeys.FROM])
+        self.assertEqual(self.icx_factor, params.get(ConstantKeys.VALUE))
+        self.assertEqual(12346, params.pop(ConstantKeys.TIMESTAMP))
+        self.assertIsNone(params.get(ConstantKeys.OLD_TX_HASH))
+        self.assertIn(ConstantKeys.TX_HASH, params)
+
+        # The data is converted by dataType along with the transaction
+        data = params[ConstantKeys.DATA]
+        self.assertEqual({"value": hex(1)}, dict.__getitem__(data, ConstantKeys.PARAMS))
+
+        # The other transactions are not converted yet
+        self.assertEqual(0, dict.__len__(transactions[0]))
+
+        params[ConstantKeys.NONCE] = 7
+        TypeConverter.resolve(ret_params)
+        self.assertEqual(7, params[ConstantKeys.NONCE])
+        self.assertNotIn(ConstantKeys.TIMESTAMP, params)
+        self.assertEqual(0, dict.__getitem__(transactions[0], ConstantKeys.PARAMS)[ConstantKeys.VALUE])
+
+    def test_lazy_convert_json(self):
+        request = self._make_invoke_request(create_address(), 2)
+        raw_data: dict = request[ConstantKeys.TRANSACTIONS][1][ConstantKeys.PARAMS][ConstantKeys.DATA]
+
+        ret_params = TypeConverter.convert(request, ParamType.INVOKE, lazy=True)
+        data = ret_params[ConstantKeys.TRANSACTIONS][1][ConstantKeys.PARAMS][ConstantKeys.DATA]
+
+        # The values in a transaction are plain dicts which json.dumps() reads as they are
+        self.assertEqual(json.dumps(raw_data), json.dumps(data))
+        self.assertEqual(get_input_data_size(REVISION_3, raw_data), get_input_data_size(REVISION_3, data))
+
+    def test_peek(self):
+        from_addr = create_address()
+        request = self._make_invoke_request(from_addr, 2)
+        expected = TypeConverter.convert(request, ParamType.INVOKE)
+
+        ret_params = TypeConverter.convert(request, ParamType.INVOKE, lazy=True)
+        transactions = ret_params[ConstantKeys.TRANSACTIONS]
+        for i, transaction in enumerate(transactions):
+            expected_params = expected[ConstantKeys.TRANSACTIONS][i][ConstantKeys.PARAMS]
+
+            # The old key of txHash is converted as well
+            self.assertEqual(expected_params[ConstantKeys.TX_HASH],
+                             TypeConverter.peek(transaction, ConstantKeys.PARAMS, ConstantKeys.TX_HASH))
+            self.assertEqual(from_addr, TypeConverter.peek(transaction, ConstantKeys.PARAMS, ConstantKeys.FROM))
+            self.assertIsNone(TypeConverter.peek(transaction, ConstantKeys.PARAMS, ConstantKeys.OLD_TX_HASH))
+            self.assertIsNone(TypeConverter.peek(transaction, ConstantKeys.PARAMS, "unknown"))
+
+            # The transaction is left unconverted
+            self.assertEqual(0, dict.__len__(transaction))
+
+        # The data is converted by dataType
+        self.assertEqual({"value": hex(1)}, TypeConverter.peek(
+            transactions[1], ConstantKeys.PARAMS, ConstantKeys.DATA, ConstantKeys.PARAMS))
+        self.assertEqual(expected[ConstantKeys.TRANSACTIONS][1], transactions[1])
+
+        # The converted params are read as they are
+        transactions[0][ConstantKeys.PARAMS][ConstantKeys.NONCE] = 7
+        self.assertEqual(7, TypeConverter.peek(transactions[0], ConstantKeys.PARAMS, ConstantKeys.NONCE))
+        self.assertEqual(from_addr, TypeConverter.peek(expected[ConstantKeys.TRANSACTIONS][0],
+                                                       ConstantKeys.PARAMS, ConstantKeys.FROM))
+
+    def test_lazy_convert_fail(self):
+        request = self._make_invoke_request(create_address(), 2)
+        request[ConstantKeys.TRANSACTIONS][1][ConstantKeys.PARAMS][ConstantKeys.VALUE] = 1
+
+        ret_params = TypeConverter.convert(request, ParamType.INVOKE, lazy=True)
+        transactions = ret_params[ConstantKeys.TRANSACTIONS]
+        TypeConverter.resolve(transactions[0])
+
+        # The invalid value fails when it is accessed
+        with self.assertRaises(InvalidParamsException):
+            TypeConverter.resolve(transactions[1])
+        with self.assertRaises(InvalidParamsException):
+            TypeConverter.convert(request, ParamType.INVOKE)
+
     def test_wrong_block_convert(self):
         request = {
             ConstantKeys.BLOCK_HEIGHT: [],
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares the transfers in a block through IcxStorage without the account cache,
+with the cache which copies the accounts on every get and put and with AccountCache
+
+Usage: python -m tests.benchmark.bench_account_cache [transaction count ...]
+"""
+
+import random
+import sys
+import time
+from copy import copy
+
+from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.db import ContextDatabase
+from iconservice.iconscore.icon_score_context import IconScoreContext, IconScoreContextType
+from iconservice.icx.icx_account import Account
+from iconservice.icx.icx_account_cache import AccountCache
+from iconservice.icx.icx_storage import IcxStorage
+from tests import create_address, rmtree
+
+DB_PATH = 'bench_account_cache_db'
+# the number of the distinct accounts in a block
+ADDRESS_COUNT = 100
+
+
+class CopyingAccountCache(AccountCache):
+    """AccountCache which copies the accounts on every get and put
+    """
+
+    def get(self, key: bytes, value: bytes):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != value:
+            return None
+
+        return copy(entry[1])
+
+    def put(self, key: bytes, value: bytes, account: 'Account', encoded: bytes = None) -> None:
+        self._entries[key] = (value, copy(account))
+
+
+def run(storage: 'IcxStorage', addresses: list, transfers: list, account_cache) -> float:
+    """Returns the time(ms) of the transfers in a block
+    """
+    context = IconScoreContext(IconScoreContextType.INVOKE)
+    context.block_batch = BlockBatch()
+    context.tx_batch = TransactionBatch()
+    context.account_cache = account_cache
+
+    start = time.perf_counter()
+    for i, j in transfers:
+        from_account = storage.get_account(context, addresses[i])
+        to_account = storage.get_account(context, addresses[j])
+        from_account.withdraw(1)
+        to_account.deposit(1)
+        storage.put_account(context, from_account.address, from_account)
+        storage.put_account(context, to_account.address, to_account)
+
+        context.block_batch.update(context.tx_batch)
+        context.tx_batch.clear()
+
+    return (time.perf_counter() - start) * 1000
+
+
+def main(counts: list):
+    rmtree(DB_PATH)
+    storage = IcxStorage(ContextDatabase.from_path(DB_PATH))
+
+    addresses = [create_address() for _ in range(ADDRESS_COUNT)]
+    direct_context = IconScoreContext(IconScoreContextType.DIRECT)
+    for address in addresses:
+        storage.put_account(direct_context, address, Account(address=address, icx=10 ** 20))
+
+    print(f'{"transactions":>12} {"no cache(ms)":>13} {"copying(ms)":>12} {"cache(ms)":>10} {"speedup":>8}')
+
+    for count in counts:
+        transfers = [random.sample(range(ADDRESS_COUNT), 2) for _ in range(count)]
+        no_cache = min(run(storage, addresses, transfers, None) for _ in range(3))
+        copying = min(run(storage, addresses, transfers, CopyingAccountCache()) for _ in range(3))
+        cache = min(run(storage, addresses, transfers, AccountCache()) for _ in range(3))
+
+        print(f'{count:>12} {no_cache:>13.2f} {copying:>12.2f} {cache:>10.2f} {no_cache / cache:>7.2f}x')
+
+    storage.close(None)
+    rmtree(DB_PATH)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000])
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares the interned Address with cached encodings with the one which computes them on every call
+on the addresses repeated in a block
+
+Usage: python -m tests.benchmark.bench_address [transaction count ...]
+"""
+
+import sys
+import timeit
+
+from iconservice.base.address import Address, AddressPrefix, ICON_EOA_ADDRESS_BYTES_SIZE, \
+    is_icon_address_valid, split_icon_address
+from iconservice.icon_constant import DATA_BYTE_ORDER
+from iconservice.iconscore.icon_score_mapper_object import IconScoreMapperObject
+from iconservice.icx.icx_account import Account
+from iconservice.icx.icx_account_cache import AccountCache
+from tests import create_address
+
+# the number of the distinct addresses in a block
+ADDRESS_COUNT = 100
+
+
+class LegacyAddress(Address):
+    """Address before it was interned and cached its encodings
+    """
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Address) and self.prefix == other.prefix and self.body == other.body
+
+    def __hash__(self) -> int:
+        return hash(self.prefix.to_bytes(1, DATA_BYTE_ORDER) + self.body)
+
+    def __str__(self) -> str:
+        return f'{str(self.prefix)}{self.body.hex()}'
+
+    def to_bytes(self) -> bytes:
+        if self.prefix != AddressPrefix.EOA:
+            return self.prefix.value.to_bytes(1, DATA_BYTE_ORDER) + self.body
+        return self.body
+
+    @staticmethod
+    def from_string(address: str) -> 'LegacyAddress':
+        assert is_icon_address_valid(address)
+        prefix, body = split_icon_address(address)
+        return LegacyAddress(AddressPrefix.from_string(prefix), bytes.fromhex(body))
+
+    @staticmethod
+    def from_bytes(buf: bytes) -> 'LegacyAddress':
+        prefix = AddressPrefix.EOA
+        if len(buf) != ICON_EOA_ADDRESS_BYTES_SIZE:
+            prefix = AddressPrefix(int.from_bytes(buf[0:1], DATA_BYTE_ORDER))
+            buf = buf[1:]
+        return LegacyAddress(prefix, buf)
+
+
+def bench_from_string(address_class: type, strings: list) -> None:
+    for string in strings:
+        address_class.from_string(string)
+
+
+def bench_score_mapper(mapper: 'IconScoreMapperObject', addresses: list) -> None:
+    for address in addresses:
+        _ = mapper[address]
+
+
+def bench_account_access(account_cache: 'AccountCache', addresses: list) -> None:
+    for address in addresses:
+        account_cache.get(address.to_bytes(), None)
+
+
+def run(address_class: type, count: int) -> tuple:
+    """Returns the time(ms) of from_string, IconScoreMapperObject lookups and account access
+
+    The addresses are created from the strings of a block as the type conversion does.
+    """
+    number = 5
+    strings = [str(create_address(AddressPrefix.CONTRACT, i.to_bytes(2, DATA_BYTE_ORDER)))
+               for i in range(ADDRESS_COUNT)]
+    strings = [strings[i % ADDRESS_COUNT] for i in range(count)]
+    addresses = [address_class.from_string(string) for string in strings]
+
+    mapper = IconScoreMapperObject()
+    account_cache = AccountCache()
+    for address in addresses[:ADDRESS_COUNT]:
+        # IconScoreInfo is not needed to look up the key
+        dict.__setitem__(mapper, address, None)
+        account_cache.put(address.to_bytes(), None, Account())
+
+    results = (
+        timeit.timeit(lambda: bench_from_string(address_class, strings), number=number),
+        timeit.timeit(lambda: bench_score_mapper(mapper, addresses), number=number),
+        timeit.timeit(lambda: bench_account_access(account_cache, addresses), number=number)
+    )
+    return tuple(result / number * 1000 for result in results)
+
+
+def main(counts: list):
+    print(f'{"transactions":>12} {"bench":>15} {"legacy(ms)":>11} {"interned(ms)":>13} {"speedup":>8}')
+
+    for count in counts:
+        legacy_results = run(LegacyAddress, count)
+        results = run(Address, count)
+
+        for name, legacy, result in zip(('from_string', 'score mapper', 'account access'), legacy_results, results):
+            print(f'{count:>12} {name:>15} {legacy:>11.2f} {result:>13.2f} {legacy / result:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000])
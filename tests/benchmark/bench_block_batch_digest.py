@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares BlockBatch.digest() with the digest of one joined bytes object
+
+Usage: python -m tests.benchmark.bench_block_batch_digest [key count ...]
+"""
+
+import hashlib
+import os
+import sys
+import timeit
+import tracemalloc
+
+from iconservice.database.batch import BlockBatch
+
+
+def make_block_batch(count: int) -> 'BlockBatch':
+    block_batch = BlockBatch()
+    for i in range(count):
+        # account key and 36-byte account value
+        block_batch[os.urandom(20)] = None if i % 10 == 0 else os.urandom(36)
+
+    return block_batch
+
+
+def joined_digest(block_batch: 'BlockBatch') -> bytes:
+    data = []
+    for key, value in block_batch.items():
+        data.append(key)
+        if value is not None:
+            data.append(value)
+
+    return hashlib.sha3_256(b'|'.join(data)).digest()
+
+
+def peak_memory(func, *args) -> int:
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(counts: list):
+    print(f'{"keys":>10} {"joined(ms)":>12} {"streaming(ms)":>14} {"joined peak(KB)":>16} {"streaming peak(KB)":>19}')
+
+    for count in counts:
+        block_batch = make_block_batch(count)
+        assert joined_digest(block_batch) == block_batch.digest()
+
+        number = 10
+        joined = timeit.timeit(lambda: joined_digest(block_batch), number=number) / number
+        streaming = timeit.timeit(block_batch.digest, number=number) / number
+
+        joined_peak = peak_memory(joined_digest, block_batch)
+        streaming_peak = peak_memory(block_batch.digest)
+
+        print(f'{count:>10} {joined * 1000:>12.2f} {streaming * 1000:>14.2f} '
+              f'{joined_peak // 1024:>16} {streaming_peak // 1024:>19}')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000, 500_000])
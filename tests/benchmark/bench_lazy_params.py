@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares the invoke requests converted at once with the ones converted lazily
+by the time to the first transaction, the time to convert all and the peak memory
+
+The time includes the passes over the transactions which invoke makes before executing them:
+the transaction hashes to find the block and the checkpoints and the addresses to prefetch.
+
+Usage: python -m tests.benchmark.bench_lazy_params [transaction count ...]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from iconservice.base.type_converter import TypeConverter
+from iconservice.base.type_converter_templates import ParamType
+from iconservice.icx.icx_account_prefetcher import AccountPrefetcher
+from tests.benchmark.bench_type_converter import make_invoke_request
+
+
+def measure(request: dict, lazy: bool) -> tuple:
+    """Converts a request and reads its transactions one by one as invoke does
+
+    :return: (time to the first transaction(ms), time to the last transaction(ms), peak memory(KB))
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    params = TypeConverter.convert(request, ParamType.INVOKE, lazy=lazy)
+    tx_requests: list = params['transactions']
+    # change_built_block_hash() and find_checkpoints()
+    for _ in range(2):
+        [TypeConverter.peek(tx_request, 'params', 'txHash') for tx_request in tx_requests]
+    AccountPrefetcher.collect_addresses(tx_requests, None)
+
+    first = None
+    for tx_request in tx_requests:
+        TypeConverter.resolve(tx_request)
+        if first is None:
+            first = time.perf_counter() - start
+
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return first * 1000, total * 1000, peak / 1024
+
+
+def main(counts: list):
+    print(f'{"transactions":>12} {"mode":>6} {"first tx(ms)":>13} {"all txs(ms)":>12} {"peak(KB)":>10}')
+
+    for count in counts:
+        request = make_invoke_request(count)
+        assert TypeConverter.convert(request, ParamType.INVOKE) == \
+            TypeConverter.convert(request, ParamType.INVOKE, lazy=True)
+
+        for lazy in (False, True):
+            first, total, peak = measure(request, lazy)
+            mode = 'lazy' if lazy else 'eager'
+            print(f'{count:>12} {mode:>6} {first:>13.3f} {total:>12.2f} {peak:>10.0f}')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000])
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares the storage backends on a state db with a given number of keys
+
+Each block updates accounts and takes a snapshot for the queries as a commit does,
+then the queries read accounts and scan a prefix.
+
+Usage: python -m tests.benchmark.bench_storage_backend [key count ...]
+"""
+
+import os
+import random
+import sys
+import time
+
+from iconservice.database.backend import StorageBackendType, create_backend
+from tests import rmtree
+
+DB_PATH = 'bench_storage_backend_db'
+BLOCKS = 20
+WRITES_PER_BLOCK = 1_000
+READS_PER_BLOCK = 1_000
+SCANS_PER_BLOCK = 10
+
+
+def run(backend_type: str, count: int) -> tuple:
+    """Returns the time(ms) of writing a block, reading an account and scanning a prefix
+    """
+    rmtree(DB_PATH)
+    db = create_backend(backend_type, DB_PATH)
+
+    keys = [os.urandom(20) for _ in range(count)]
+    with db.write_batch() as wb:
+        for key in keys:
+            wb.put(key, os.urandom(36))
+
+    write_time = read_time = scan_time = 0.0
+    snapshot = db.snapshot()
+    for _ in range(BLOCKS):
+        start = time.perf_counter()
+        with db.write_batch() as wb:
+            for key in random.sample(keys, WRITES_PER_BLOCK):
+                wb.put(key, os.urandom(36))
+        snapshot.close()
+        snapshot = db.snapshot()
+        write_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for key in random.sample(keys, READS_PER_BLOCK):
+            snapshot.get(key)
+        read_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(SCANS_PER_BLOCK):
+            prefix = os.urandom(2)
+            for _ in snapshot.iterator(start=prefix, stop=prefix + b'\xff'):
+                pass
+        scan_time += time.perf_counter() - start
+
+    snapshot.close()
+    db.close()
+    rmtree(DB_PATH)
+
+    return (write_time / BLOCKS * 1000,
+            read_time / (BLOCKS * READS_PER_BLOCK) * 10 ** 6,
+            scan_time / (BLOCKS * SCANS_PER_BLOCK) * 1000)
+
+
+def main(counts: list):
+    print(f'{"keys":>10} {"backend":>8} {"block write(ms)":>16} {"read(us)":>9} {"prefix scan(ms)":>16}')
+
+    for count in counts:
+        for backend_type in (StorageBackendType.LEVELDB, StorageBackendType.MEMORY, StorageBackendType.MMAP):
+            write, read, scan = run(backend_type, count)
+            print(f'{count:>10} {backend_type:>8} {write:>16.2f} {read:>9.2f} {scan:>16.3f}')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
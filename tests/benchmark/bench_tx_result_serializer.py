@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares TransactionResult.to_response() with to_dict() and TypeConverter.convert_type_reverse()
+on the transaction results of a block
+
+Usage: python -m tests.benchmark.bench_tx_result_serializer [transaction count ...]
+"""
+
+import sys
+import timeit
+
+from iconservice.base.address import AddressPrefix
+from iconservice.base.block import Block
+from iconservice.base.transaction import Transaction
+from iconservice.base.type_converter import TypeConverter
+from iconservice.iconscore.icon_score_event_log import EventLog
+from iconservice.iconscore.icon_score_result import TransactionResult
+from iconservice.utils import to_camel_case
+from iconservice.utils.bloom import BloomFilter
+from tests import create_address, create_block_hash, create_tx_hash
+
+
+def make_tx_results(count: int) -> list:
+    block = Block(100, create_block_hash(), 1_540_000_000_000_000, create_block_hash())
+    score_address = create_address(AddressPrefix.CONTRACT)
+
+    tx_results = []
+    for i in range(count):
+        tx_result = TransactionResult(Transaction(create_tx_hash(), i), block, to=score_address,
+                                      step_used=100_000 + i, step_price=10 ** 10,
+                                      cumulative_step_used=(100_000 + i) * (i + 1),
+                                      status=TransactionResult.SUCCESS)
+        tx_result.event_logs = [
+            EventLog(score_address,
+                     ['Transfer(Address,Address,int,bytes)', create_address(), create_address(), i],
+                     [b'data'])
+        ]
+        tx_result.logs_bloom = BloomFilter()
+        tx_result.logs_bloom.add(b'Transfer(Address,Address,int,bytes)')
+        tx_results.append(tx_result)
+
+    return tx_results
+
+
+def to_dict_and_reverse(tx_results: list) -> dict:
+    return TypeConverter.convert_type_reverse(
+        {bytes.hex(tx_result.tx_hash): tx_result.to_dict(to_camel_case) for tx_result in tx_results})
+
+
+def to_response(tx_results: list) -> dict:
+    return {bytes.hex(tx_result.tx_hash): tx_result.to_response() for tx_result in tx_results}
+
+
+def main(counts: list):
+    print(f'{"transactions":>12} {"to_dict(ms)":>12} {"to_response(ms)":>16} {"speedup":>8}')
+
+    for count in counts:
+        tx_results = make_tx_results(count)
+        assert to_dict_and_reverse(tx_results) == to_response(tx_results)
+
+        number = 5
+        before = timeit.timeit(lambda: to_dict_and_reverse(tx_results), number=number) / number
+        after = timeit.timeit(lambda: to_response(tx_results), number=number) / number
+
+        print(f'{count:>12} {before * 1000:>12.2f} {after * 1000:>16.2f} {before / after:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000])
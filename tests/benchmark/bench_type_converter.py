@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares the compiled TypeConverter templates with the recursive conversion of a deep-copied request
+on invoke requests
+
+Usage: python -m tests.benchmark.bench_type_converter [transaction count ...]
+"""
+
+import sys
+import timeit
+from copy import deepcopy
+
+from iconservice.base.type_converter import TypeConverter
+from iconservice.base.type_converter_templates import ParamType, ValueType, type_convert_templates, \
+    KEY_CONVERTER, CONVERT_USING_SWITCH_KEY, SWITCH_KEY
+from tests import create_address, create_block_hash, create_tx_hash
+
+
+def recursive_convert(params: dict, param_type: ParamType) -> dict:
+    """The conversion before the templates were compiled
+    """
+    return _convert(deepcopy(params), type_convert_templates[param_type])
+
+
+def _skip(params, template) -> bool:
+    if isinstance(params, str):
+        return params != "" and not template
+    return not params or not template
+
+
+def _convert(params, template):
+    if _skip(params, template):
+        return params
+
+    if isinstance(template, dict) and KEY_CONVERTER in template:
+        params = {template[KEY_CONVERTER].get(key, key): value for key, value in params.items()}
+
+    if isinstance(params, dict) and isinstance(template, dict):
+        new_params = {}
+        for key, value in params.items():
+            value_template = template.get(key)
+            if isinstance(value_template, dict) and CONVERT_USING_SWITCH_KEY in value_template:
+                switch_template: dict = value_template[CONVERT_USING_SWITCH_KEY]
+                target_template = switch_template.get(deepcopy(new_params).get(switch_template[SWITCH_KEY]))
+                new_params[key] = value if target_template is None else _convert(value, target_template)
+            else:
+                new_params[key] = _convert(value, value_template)
+        return new_params
+    elif isinstance(params, list) and isinstance(template, list):
+        return [_convert(item, template[0]) for item in params]
+    elif isinstance(template, ValueType):
+        return TypeConverter._convert_value(params, template)
+    return params
+
+
+def make_invoke_request(count: int) -> dict:
+    transactions = []
+    for i in range(count):
+        params = {
+            "version": "0x3",
+            "from": str(create_address()),
+            "to": str(create_address(i % 2)),
+            "value": hex(i * 10 ** 18),
+            "stepLimit": "0x12345",
+            "timestamp": hex(1_540_000_000_000_000 + i),
+            "nonce": hex(i),
+            "signature": "VAia7YZ2Ji6igKWzjR2YsGa2m53nKPrfK7uXYW78QLE+ATehAVZPC40szvAiA6NEU5gCYB4c4qaQzqDh2ugcHgA=",
+            "txHash": bytes.hex(create_tx_hash())
+        }
+        if i % 2:
+            # SCORE call
+            params["dataType"] = "call"
+            params["data"] = {"method": "transfer", "params": {"_to": str(create_address()), "_value": "0x1"}}
+        transactions.append({"method": "icx_sendTransaction", "params": params})
+
+    block = {
+        "blockHeight": "0x64",
+        "blockHash": bytes.hex(create_block_hash()),
+        "timestamp": hex(1_540_000_000_000_000),
+        "prevBlockHash": bytes.hex(create_block_hash())
+    }
+    return {"block": block, "transactions": transactions}
+
+
+def main(counts: list):
+    print(f'{"transactions":>12} {"recursive(ms)":>14} {"compiled(ms)":>13} {"speedup":>8}')
+
+    for count in counts:
+        request = make_invoke_request(count)
+        assert recursive_convert(request, ParamType.INVOKE) == TypeConverter.convert(request, ParamType.INVOKE)
+
+        number = 5
+        recursive = timeit.timeit(lambda: recursive_convert(request, ParamType.INVOKE), number=number) / number
+        compiled = timeit.timeit(lambda: TypeConverter.convert(request, ParamType.INVOKE), number=number) / number
+
+        print(f'{count:>12} {recursive * 1000:>14.2f} {compiled * 1000:>13.2f} {recursive / compiled:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000])
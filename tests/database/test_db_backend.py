@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import unittest
+from unittest.mock import patch
+
+from iconservice.base.exception import DatabaseException
+from iconservice.database.backend import MemoryBackend, MmapBackend, SortedKeys, StorageBackendType, \
+    create_backend
+from iconservice.database.db import KeyValueDatabase
+from tests import rmtree
+
+
+class BackendTestMixin(object):
+    def test_get_put_delete(self):
+        db = self.db
+        self.assertIsNone(db.get(b'key0'))
+
+        db.put(b'key0', b'value0')
+        self.assertEqual(b'value0', db.get(b'key0'))
+
+        db.put(b'key0', b'value1')
+        self.assertEqual(b'value1', db.get(b'key0'))
+
+        db.delete(b'key0')
+        self.assertIsNone(db.get(b'key0'))
+
+    def test_write_batch(self):
+        db = self.db
+        db.put(b'key0', b'value0')
+
+        with db.write_batch() as wb:
+            wb.put(b'key1', b'value1')
+            wb.put(b'key2', b'value2')
+            wb.delete(b'key0')
+            # Not written until the batch is closed
+            self.assertIsNone(db.get(b'key1'))
+
+        self.assertIsNone(db.get(b'key0'))
+        self.assertEqual(b'value1', db.get(b'key1'))
+        self.assertEqual(b'value2', db.get(b'key2'))
+
+    def test_iterator(self):
+        db = self.db
+        with db.write_batch() as wb:
+            for i in (3, 1, 0, 2):
+                wb.put(f'key{i}'.encode(), f'value{i}'.encode())
+
+        items = list(db.iterator())
+        self.assertEqual([(b'key0', b'value0'), (b'key1', b'value1'),
+                          (b'key2', b'value2'), (b'key3', b'value3')], items)
+
+        items = list(db.iterator(start=b'key1', stop=b'key3'))
+        self.assertEqual([(b'key1', b'value1'), (b'key2', b'value2')], items)
+
+    def test_snapshot(self):
+        db = self.db
+        db.put(b'key0', b'value0')
+
+        with db.snapshot() as snapshot:
+            db.put(b'key0', b'value1')
+            db.put(b'key1', b'value1')
+
+            self.assertEqual(b'value0', snapshot.get(b'key0'))
+            self.assertIsNone(snapshot.get(b'key1'))
+
+        self.assertEqual(b'value1', db.get(b'key0'))
+
+    def test_snapshot_iterator(self):
+        db = self.db
+        with db.write_batch() as wb:
+            for i in range(4):
+                wb.put(f'key{i}'.encode(), f'value{i}'.encode())
+
+        with db.snapshot() as snapshot:
+            with db.write_batch() as wb:
+                wb.delete(b'key1')
+                wb.put(b'key2', b'new_value2')
+                wb.put(b'key11', b'value11')
+
+            self.assertEqual([(b'key0', b'value0'), (b'key1', b'value1'),
+                              (b'key2', b'value2'), (b'key3', b'value3')], list(snapshot.iterator()))
+            self.assertEqual([(b'key1', b'value1')], list(snapshot.iterator(start=b'key1', stop=b'key2')))
+
+        self.assertEqual([(b'key0', b'value0'), (b'key11', b'value11'),
+                          (b'key2', b'new_value2'), (b'key3', b'value3')], list(db.iterator()))
+
+    def test_prefixed_db(self):
+        db = self.db
+        sub_db = db.prefixed_db(b'sub|')
+
+        sub_db.put(b'key0', b'value0')
+        db.put(b'key0', b'root_value0')
+        db.put(b'sub}', b'out_of_prefix')
+
+        self.assertEqual(b'value0', sub_db.get(b'key0'))
+        self.assertEqual(b'value0', db.get(b'sub|key0'))
+        self.assertEqual([(b'key0', b'value0')], list(sub_db.iterator()))
+
+        with sub_db.snapshot() as snapshot:
+            sub_db.delete(b'key0')
+            self.assertEqual(b'value0', snapshot.get(b'key0'))
+
+        self.assertIsNone(sub_db.get(b'key0'))
+
+    def test_key_value_database(self):
+        db = KeyValueDatabase(self.db)
+        db.write_batch({b'key0': b'value0', b'key1': b'value1'})
+
+        self.assertEqual([b'value0', None, b'value1'], db.get_many([b'key0', b'key2', b'key1']))
+        self.assertEqual([(b'key1', b'value1')], list(db.iterator(prefix=b'key1')))
+
+        sub_db = db.get_sub_db(b'sub')
+        sub_db.put(b'key0', b'value2')
+        self.assertEqual(b'value2', db.get(b'subkey0'))
+
+
+class TestMemoryBackend(BackendTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.db = MemoryBackend()
+
+    def tearDown(self):
+        self.db.close()
+
+
+class TestMmapBackend(BackendTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.path = 'mmap_db'
+        rmtree(self.path)
+        self.db = MmapBackend(self.path)
+
+    def tearDown(self):
+        self.db.close()
+        rmtree(self.path)
+
+    def test_reopen(self):
+        db = self.db
+        db.put(b'key0', b'value0')
+        with db.write_batch() as wb:
+            wb.put(b'key1', b'value1')
+            wb.delete(b'key0')
+        db.close()
+
+        self.db = MmapBackend(self.path, create_if_missing=False)
+        self.assertIsNone(self.db.get(b'key0'))
+        self.assertEqual(b'value1', self.db.get(b'key1'))
+
+    def test_torn_batch(self):
+        db = self.db
+        db.put(b'key0', b'value0')
+        db.close()
+
+        # A batch without commit record is discarded
+        log_path = os.path.join(self.path, MmapBackend.FILE_NAME)
+        with open(log_path, 'ab') as f:
+            f.write(MmapBackend._HEADER.pack(MmapBackend._OP_PUT, 4, 6))
+            f.write(b'key1val')
+
+        self.db = MmapBackend(self.path)
+        self.assertEqual(b'value0', self.db.get(b'key0'))
+        self.assertIsNone(self.db.get(b'key1'))
+
+        self.db.put(b'key2', b'value2')
+        self.db.close()
+
+        self.db = MmapBackend(self.path)
+        self.assertEqual(b'value2', self.db.get(b'key2'))
+
+    def test_reopen_without_close(self):
+        db = self.db
+        db.put(b'key0', b'value0')
+
+        # The padding at the end of the file is not taken as records
+        self.db = MmapBackend(self.path)
+        self.assertEqual(b'value0', self.db.get(b'key0'))
+        db.close()
+
+    @patch.object(MmapBackend, 'GROWTH_SIZE', 64)
+    @patch.object(MmapBackend, 'COMPACTION_MIN_SIZE', 256)
+    def test_compaction(self):
+        self.db.close()
+        self.db = db = MmapBackend(self.path)
+        log_path = os.path.join(self.path, MmapBackend.FILE_NAME)
+
+        db.put(b'key0', b'value0')
+        snapshot = db.snapshot()
+
+        for i in range(100):
+            db.put(b'key1', f'value{i}'.encode())
+        db.delete(b'key0')
+
+        # The log keeps the live records only
+        self.assertLess(os.path.getsize(log_path), 256 + MmapBackend.GROWTH_SIZE * 2)
+        self.assertEqual([(b'key1', b'value99')], list(db.iterator()))
+
+        # The snapshot taken before the compaction reads the old log
+        self.assertEqual(b'value0', snapshot.get(b'key0'))
+        self.assertIsNone(snapshot.get(b'key1'))
+        snapshot.close()
+
+        db.close()
+        self.db = MmapBackend(self.path)
+        self.assertIsNone(self.db.get(b'key0'))
+        self.assertEqual(b'value99', self.db.get(b'key1'))
+
+    def test_create_if_missing(self):
+        with self.assertRaises(DatabaseException):
+            MmapBackend(os.path.join(self.path, 'absent'), create_if_missing=False)
+
+
+class TestSortedKeys(unittest.TestCase):
+    @patch.object(SortedKeys, 'CHUNK_SIZE', 2)
+    def test_range(self):
+        keys = SortedKeys([b'key3', b'key1'])
+        expected = {b'key1', b'key3'}
+
+        for i in range(20):
+            key = f'key{i % 7}'.encode()
+            if key in expected:
+                keys.remove(key)
+                expected.remove(key)
+            else:
+                keys.add(key)
+                expected.add(key)
+
+            self.assertEqual(sorted(expected), keys.range())
+            self.assertEqual(len(expected), len(keys))
+
+        self.assertEqual([key for key in sorted(expected) if b'key2' <= key < b'key5'],
+                         keys.range(b'key2', b'key5'))
+
+
+class TestCreateBackend(unittest.TestCase):
+    def test_create_backend(self):
+        self.assertIsInstance(create_backend(StorageBackendType.MEMORY, ''), MemoryBackend)
+
+        with self.assertRaises(DatabaseException):
+            create_backend('invalid', '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,7 +18,7 @@
 import unittest
 
 from iconservice.base.block import Block
-from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.batch import BlockBatch, TransactionBatch, DIGEST_CHUNK_SIZE
 from iconservice.utils import sha3_256
 from tests import create_hash_256
 
@@ -122,3 +122,19 @@ class TestBatch(unittest.TestCase):
         block_batch[key2] = b''
         hash2 = block_batch.digest()
         self.assertNotEqual(hash1, hash2)
+
+    def test_digest_large_batch(self):
+        for count in (DIGEST_CHUNK_SIZE // 2, DIGEST_CHUNK_SIZE, DIGEST_CHUNK_SIZE * 3 + 1):
+            block_batch = BlockBatch()
+            data = []
+
+            for i in range(count):
+                key = create_hash_256()
+                value = (None, b'', i.to_bytes(4, 'big'))[i % 3]
+                block_batch[key] = value
+
+                data.append(key)
+                if value is not None:
+                    data.append(value)
+
+            self.assertEqual(sha3_256(b'|'.join(data)), block_batch.digest())
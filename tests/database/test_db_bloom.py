@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import unittest
+from unittest.mock import Mock
+
+from iconservice.database.bloom import BloomFilter
+from iconservice.database.db import KeyValueDatabase, ContextDatabase
+from iconservice.database.factory import ContextDatabaseFactory
+from iconservice.icon_constant import ICON_DEX_DB_NAME
+from tests import rmtree
+
+
+class TestBloomFilter(unittest.TestCase):
+    def setUp(self):
+        self.path = 'bloom_filter'
+        rmtree(self.path)
+
+    def tearDown(self):
+        rmtree(self.path)
+
+    def test_might_contain(self):
+        bloom_filter = BloomFilter(1000)
+        keys = [i.to_bytes(4, 'big') for i in range(1000)]
+        bloom_filter.update(keys)
+        count = bloom_filter.count
+        # A key which looks present already is not counted
+        self.assertLessEqual(990, count)
+        bloom_filter.add(keys[0])
+        self.assertEqual(count, bloom_filter.count)
+        self.assertFalse(bloom_filter.is_full())
+
+        for key in keys:
+            self.assertTrue(bloom_filter.might_contain(key))
+
+        absent_keys = [i.to_bytes(4, 'big') for i in range(1000, 11000)]
+        false_positives = sum(1 for key in absent_keys if bloom_filter.might_contain(key))
+        self.assertLess(false_positives, len(absent_keys) * 0.03)
+
+        metrics = bloom_filter.metrics
+        self.assertEqual(11000, metrics['lookups'])
+        self.assertEqual(len(absent_keys) - false_positives, metrics['savedLookups'])
+
+    def test_save_and_load(self):
+        bloom_filter = BloomFilter(100)
+        bloom_filter.update([b'key0', b'key1'])
+        bloom_filter.save(self.path)
+
+        loaded = BloomFilter.load(self.path)
+        self.assertEqual(bloom_filter.to_bytes(), loaded.to_bytes())
+        self.assertEqual(2, loaded.count)
+        self.assertTrue(loaded.might_contain(b'key1'))
+
+        # Removed not to be used after a crash
+        self.assertFalse(os.path.exists(self.path))
+        self.assertIsNone(BloomFilter.load(self.path))
+        self.assertIsNone(BloomFilter.from_bytes(bloom_filter.to_bytes()[:-1]))
+
+
+class TestContextDatabaseBloomFilter(unittest.TestCase):
+    def setUp(self):
+        self.key_value_db = Mock(spec=KeyValueDatabase)
+        self.key_value_db.get.return_value = None
+        self.key_value_db.get_many.side_effect = lambda keys: [None] * len(keys)
+        self.bloom_filter = BloomFilter(100)
+        self.context_db = ContextDatabase(self.key_value_db, bloom_filter=self.bloom_filter)
+
+    def test_skip_absent_keys(self):
+        db = self.context_db
+        db.write_batch(None, {b'key0': b'value0', b'key1': None})
+        db.put(None, b'key2', b'value2')
+
+        self.assertIsNone(db.get(None, b'key1'))
+        self.assertEqual([None, None], db.get_many(None, [b'key1', b'key3']))
+        self.key_value_db.get.assert_not_called()
+        self.key_value_db.get_many.assert_not_called()
+
+        # key0 is read from the db which has lost it
+        self.assertIsNone(db.get(None, b'key0'))
+        self.assertEqual([None, None], db.get_many(None, [b'key2', b'key3']))
+        self.key_value_db.get.assert_called_once_with(b'key0')
+        self.key_value_db.get_many.assert_called_once_with([b'key2'])
+
+        metrics = self.bloom_filter.metrics
+        self.assertEqual(2, metrics['keys'])
+        self.assertEqual(4, metrics['savedLookups'])
+        self.assertEqual(2, metrics['falsePositives'])
+
+
+class TestContextDatabaseFactoryBloomFilter(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+        self.bloom_filter_path = os.path.join(self.state_db_root_path, f'{ICON_DEX_DB_NAME}.bloom')
+
+    def tearDown(self):
+        ContextDatabaseFactory.close()
+        rmtree(self.state_db_root_path)
+
+    def _open(self, bloom_filter_capacity: int) -> 'ContextDatabase':
+        ContextDatabaseFactory.open(self.state_db_root_path, ContextDatabaseFactory.Mode.SINGLE_DB,
+                                    bloom_filter_capacity=bloom_filter_capacity)
+        return ContextDatabaseFactory.get_shared_db()
+
+    def test_persist(self):
+        context_db = self._open(100)
+        ContextDatabaseFactory.write_batch(None, {b'key0': b'value0'})
+        self.assertIsNone(context_db.get(None, b'key1'))
+
+        metrics = ContextDatabaseFactory.get_bloom_filter_metrics()
+        self.assertEqual(1, metrics['keys'])
+        self.assertEqual(1, metrics['savedLookups'])
+        self.assertEqual(0.0, metrics['falsePositiveRate'])
+
+        ContextDatabaseFactory.close()
+        self.assertTrue(os.path.exists(self.bloom_filter_path))
+
+        context_db = self._open(100)
+        self.assertFalse(os.path.exists(self.bloom_filter_path))
+        self.assertEqual(1, context_db.bloom_filter.count)
+        self.assertEqual(b'value0', context_db.get(None, b'key0'))
+
+    def test_rebuild(self):
+        self._open(0)
+        self.assertIsNone(ContextDatabaseFactory.get_bloom_filter_metrics())
+        ContextDatabaseFactory.write_batch(None, {i.to_bytes(4, 'big'): b'value' for i in range(100)})
+        ContextDatabaseFactory.close()
+        self.assertFalse(os.path.exists(self.bloom_filter_path))
+
+        # The filter grows to hold every key in the db
+        # It is sized with the exact key count of the first scan
+        context_db = self._open(10)
+        bloom_filter = context_db.bloom_filter
+        self.assertEqual(100, bloom_filter.count)
+        self.assertEqual(200, bloom_filter.capacity)
+        self.assertFalse(bloom_filter.is_full())
+        for i in range(100):
+            self.assertEqual(b'value', context_db.get(None, i.to_bytes(4, 'big')))
+
+    def test_grow(self):
+        context_db = self._open(10)
+        keys = [i.to_bytes(4, 'big') for i in range(100)]
+        for i in range(0, len(keys), 5):
+            ContextDatabaseFactory.write_batch(None, {key: b'value' for key in keys[i:i + 5]})
+            thread = context_db._bloom_filter_thread
+            if thread is not None:
+                # The keys written in the meantime are added to the new filter
+                thread.join()
+
+        bloom_filter = context_db.bloom_filter
+        self.assertFalse(bloom_filter.is_full())
+        self.assertLess(10, bloom_filter.capacity)
+        for key in keys:
+            self.assertTrue(bloom_filter.might_contain(key))
+            self.assertEqual(b'value', context_db.get(None, key))
+
+
+class TestBloomFilterBuild(unittest.TestCase):
+    def test_build(self):
+        keys = [i.to_bytes(4, 'big') for i in range(1000)]
+        scans = []
+
+        def iterate_keys():
+            scans.append(None)
+            return iter(keys)
+
+        bloom_filter = BloomFilter.build(iterate_keys, 2000)
+        self.assertEqual(1, len(scans))
+        self.assertEqual((1000, 2000), (bloom_filter.count, bloom_filter.capacity))
+
+        scans.clear()
+        bloom_filter = BloomFilter.build(iterate_keys, 10)
+        self.assertEqual(2, len(scans))
+        self.assertEqual((1000, 2000), (bloom_filter.count, bloom_filter.capacity))
+        self.assertTrue(all(bloom_filter.might_contain(key) for key in keys))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import unittest
+
+from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.cache import LRUCache
+from iconservice.database.db import ContextDatabase
+from iconservice.iconscore.icon_score_context import IconScoreContextType, IconScoreContext
+from tests import rmtree
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_and_put(self):
+        cache = LRUCache(100)
+
+        self.assertIsNone(cache.get(b'key0'))
+        self.assertEqual(1, cache.misses)
+
+        cache.put(b'key0', b'value0')
+        self.assertEqual(b'value0', cache.get(b'key0'))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(len(b'key0') + len(b'value0'), cache.size)
+
+        cache.put(b'key0', b'v')
+        self.assertEqual(b'v', cache.get(b'key0'))
+        self.assertEqual(len(b'key0') + len(b'v'), cache.size)
+
+        cache.put(b'key0', None)
+        self.assertNotIn(b'key0', cache)
+        self.assertEqual(0, cache.size)
+
+    def test_eviction(self):
+        # Each entry is 10 bytes
+        cache = LRUCache(30)
+        cache.put(b'key00', b'value')
+        cache.put(b'key01', b'value')
+        cache.put(b'key02', b'value')
+        self.assertEqual(0, cache.evictions)
+
+        # key00 becomes the most recently used one
+        self.assertEqual(b'value', cache.get(b'key00'))
+
+        cache.put(b'key03', b'value')
+        self.assertEqual(1, cache.evictions)
+        self.assertEqual(30, cache.size)
+        self.assertNotIn(b'key01', cache)
+        self.assertIn(b'key00', cache)
+        self.assertIn(b'key03', cache)
+
+        # An entry larger than the cache is not cached
+        cache.put(b'key04', b'0' * 100)
+        self.assertNotIn(b'key04', cache)
+        self.assertEqual(30, cache.size)
+
+    def test_fill(self):
+        cache = LRUCache(100)
+
+        version = cache.version
+        cache.fill(b'key0', b'value0', version)
+        self.assertEqual(b'value0', cache.get(b'key0'))
+
+        # The value which has been read before the state is updated is not cached
+        version = cache.version
+        cache.update({b'key1': b'value1', b'key0': None})
+        cache.fill(b'key0', b'old_value0', version)
+        self.assertNotIn(b'key0', cache)
+        self.assertEqual(b'value1', cache.get(b'key1'))
+
+
+class TestContextDatabaseCache(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+        db_path = os.path.join(self.state_db_root_path, 'db')
+        self.context_db = ContextDatabase.from_path(db_path, True, cache_size=1024)
+
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.block_batch = BlockBatch()
+        context.tx_batch = TransactionBatch()
+        self.context = context
+
+    def tearDown(self):
+        self.context_db.close(self.context)
+        rmtree(self.state_db_root_path)
+
+    def test_read_through(self):
+        db = self.context_db
+        cache = db.cache
+        db.key_value_db.put(b'key0', b'value0')
+
+        self.assertEqual(b'value0', db.get(None, b'key0'))
+        self.assertEqual(1, cache.misses)
+        self.assertIn(b'key0', cache)
+
+        query_context = IconScoreContext(IconScoreContextType.QUERY)
+        self.assertEqual(b'value0', db.get(query_context, b'key0'))
+        self.assertEqual(b'value0', db.get(self.context, b'key0'))
+        self.assertEqual(2, cache.hits)
+
+        # Absent keys are not cached
+        self.assertIsNone(db.get(None, b'key1'))
+        self.assertNotIn(b'key1', cache)
+
+    def test_write_batch(self):
+        db = self.context_db
+        cache = db.cache
+        db.put(None, b'key0', b'value0')
+        db.put(None, b'key1', b'value1')
+        self.assertEqual(b'value0', cache.get(b'key0'))
+
+        db.write_batch(self.context, {b'key0': None, b'key1': b'value2', b'key2': b'value3'})
+        self.assertNotIn(b'key0', cache)
+        self.assertIsNone(db.get(None, b'key0'))
+        self.assertEqual(b'value2', cache.get(b'key1'))
+        self.assertEqual(b'value3', db.get(None, b'key2'))
+
+        db.delete(None, b'key1')
+        self.assertNotIn(b'key1', cache)
+        self.assertIsNone(db.get(None, b'key1'))
+
+    def test_no_cache(self):
+        db_path = os.path.join(self.state_db_root_path, 'no_cache_db')
+        db = ContextDatabase.from_path(db_path, True)
+        self.assertIsNone(db.cache)
+
+        db.put(None, b'key0', b'value0')
+        self.assertEqual(b'value0', db.get(None, b'key0'))
+        db.close(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,6 +17,7 @@
 
 import os
 import unittest
+from unittest.mock import Mock
 
 from iconservice.base.address import Address, AddressPrefix
 from iconservice.base.exception import DatabaseException
@@ -65,6 +66,34 @@ class TestKeyValueDatabase(unittest.TestCase):
         self.assertEqual(b'value1', db.get(b'key1'))
         self.assertEqual(b'value0', db.get(b'key0'))
 
+    def test_get_many(self):
+        db = self.db
+        db.put(b'key0', b'value0')
+        db.put(b'key2', b'value2')
+
+        values = db.get_many([b'key0', b'key1', b'key2'])
+        self.assertEqual([b'value0', None, b'value2'], values)
+        self.assertEqual([b'value2'], db.get_many([b'key2']))
+        self.assertEqual([], db.get_many([]))
+
+    def test_iterator(self):
+        db = self.db
+        db.write_batch({
+            b'a': b'0',
+            b'b|0': b'1',
+            b'b|1': b'2',
+            b'b|2': b'3',
+            b'c': b'4'
+        })
+
+        self.assertEqual(5, len(list(db.iterator())))
+        self.assertEqual([(b'b|0', b'1'), (b'b|1', b'2'), (b'b|2', b'3')],
+                         list(db.iterator(prefix=b'b|')))
+        self.assertEqual([(b'b|1', b'2')],
+                         list(db.iterator(prefix=b'b|', start=b'b|1', stop=b'b|2')))
+        self.assertEqual([(b'b|2', b'3'), (b'c', b'4')],
+                         list(db.iterator(start=b'b|2')))
+
 
 class TestContextDatabaseOnWriteMode(unittest.TestCase):
     def setUp(self):
@@ -121,6 +150,80 @@ class TestContextDatabaseOnWriteMode(unittest.TestCase):
         self.assertEqual(batch[b'key0'], b'value1')
         self.assertEqual(batch[b'key1'], b'value1')
 
+    def test_get_many(self):
+        context = self.context
+        db = self.context_db
+        db.key_value_db.put(b'key0', b'value0')
+        db.key_value_db.put(b'key1', b'value1')
+        db.key_value_db.put(b'key2', b'value2')
+
+        context.block_batch[b'key1'] = b'block_value1'
+        context.block_batch[b'key2'] = b'block_value2'
+        context.tx_batch[b'key2'] = None
+        context.tx_batch[b'key3'] = b'tx_value3'
+
+        keys = [b'key0', b'key1', b'key2', b'key3', b'key4']
+        expected = [db.get(context, key) for key in keys]
+        self.assertEqual([b'value0', b'block_value1', None, b'tx_value3', None], expected)
+        self.assertEqual(expected, db.get_many(context, keys))
+
+        query_context = IconScoreContext(IconScoreContextType.QUERY)
+        values = db.get_many(query_context, keys)
+        self.assertEqual([b'value0', b'value1', b'value2', None, None], values)
+
+    def test_iterator(self):
+        context = self.context
+        db = self.context_db
+        db.write_batch(context, {
+            b'a': b'0',
+            b'b|0': b'1',
+            b'b|1': b'2',
+            b'b|3': b'3',
+            b'c': b'4'
+        })
+
+        context.block_batch[b'b|1'] = b'block_value1'
+        context.block_batch[b'b|2'] = b'block_value2'
+        context.block_batch[b'b|3'] = None
+        context.tx_batch[b'b|0'] = None
+        context.tx_batch.enter_call()
+        context.tx_batch[b'b|4'] = b'tx_value4'
+        context.tx_batch[b'c|0'] = b'tx_value5'
+
+        expected = [(b'b|1', b'block_value1'), (b'b|2', b'block_value2'), (b'b|4', b'tx_value4')]
+        self.assertEqual(expected, list(db.iterator(context, b'b|')))
+        self.assertEqual(expected[1:2], list(db.iterator(context, b'b|', start=b'b|2', stop=b'b|4')))
+
+        query_context = IconScoreContext(IconScoreContextType.QUERY)
+        expected = [(b'b|0', b'1'), (b'b|1', b'2'), (b'b|3', b'3')]
+        self.assertEqual(expected, list(db.iterator(query_context, b'b|')))
+
+        context.tx_batch.revert_call()
+        context.tx_batch.leave_call()
+        self.assertEqual([(b'a', b'0'), (b'c', b'4')],
+                         [item for item in db.iterator(context, b'') if len(item[0]) == 1])
+
+    def test_parent_block_batch(self):
+        context = self.context
+        db = self.context_db
+        db.key_value_db.put(b'key0', b'value0')
+        db.key_value_db.put(b'key1', b'value1')
+
+        parent_batch = BlockBatch()
+        parent_batch[b'key0'] = b'parent_value0'
+        parent_batch[b'key1'] = None
+        parent_batch[b'key2'] = b'parent_value2'
+        context.block_batch = BlockBatch(parent=parent_batch)
+        context.block_batch[b'key2'] = b'block_value2'
+        self.assertEqual([parent_batch, context.block_batch], context.block_batch.get_chain())
+
+        keys = [b'key0', b'key1', b'key2']
+        expected = [b'parent_value0', None, b'block_value2']
+        self.assertEqual(expected, [db.get(context, key) for key in keys])
+        self.assertEqual(expected, db.get_many(context, keys))
+        self.assertEqual([(b'key0', b'parent_value0'), (b'key2', b'block_value2')],
+                         list(db.iterator(context, b'key')))
+
     def test_put_on_readonly_exception(self):
         context = self.context
         context.func_type = IconScoreFuncType.READONLY
@@ -234,3 +337,36 @@ class TestIconScoreDatabase(unittest.TestCase):
 
         db.put(key, value.to_bytes(32, DATA_BYTE_ORDER))
         self.assertEqual(value.to_bytes(32, DATA_BYTE_ORDER), db.get(key))
+
+    def test_get_many(self):
+        db = self.db
+        db.put(b'key0', b'value0')
+        db.put(b'key2', b'value2')
+
+        observer = Mock()
+        db.set_observer(observer)
+
+        values = db.get_many([b'key0', b'key1', b'key2'])
+        self.assertEqual([b'value0', None, b'value2'], values)
+        self.assertEqual(3, observer.on_get.call_count)
+
+    def test_iterator(self):
+        db = self.db
+        db.put(b'item|0', b'value0')
+        db.put(b'item|1', b'value1')
+        db.put(b'item|2', b'value2')
+        db.put(b'other', b'value3')
+
+        other_db = IconScoreDatabase(
+            Address.from_data(AddressPrefix.CONTRACT, b'1'), self.db._context_db, prefix=b'')
+        other_db.put(b'item|3', b'value4')
+
+        observer = Mock()
+        db.set_observer(observer)
+
+        items = list(db.iterator(b'item|'))
+        self.assertEqual([(b'item|0', b'value0'), (b'item|1', b'value1'), (b'item|2', b'value2')], items)
+        self.assertEqual(3, observer.on_get.call_count)
+
+        items = list(db.iterator(start=b'item|1', stop=b'other'))
+        self.assertEqual([(b'item|1', b'value1'), (b'item|2', b'value2')], items)
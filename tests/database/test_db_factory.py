@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import unittest
+
+from iconservice.base.address import Address, AddressPrefix
+from iconservice.database.factory import ContextDatabaseFactory
+from iconservice.database.journal import CommitJournal
+from iconservice.icon_constant import ICON_DEX_DB_NAME
+from tests import rmtree
+
+
+class TestCommitJournal(unittest.TestCase):
+    def setUp(self):
+        self.path = 'commit_journal'
+        rmtree(self.path)
+        self.journal = CommitJournal(self.path)
+
+    def tearDown(self):
+        rmtree(self.path)
+
+    def test_write_and_read(self):
+        self.assertIsNone(self.journal.read())
+
+        shards = {
+            'db0': {b'key0': b'value0', b'key1': None},
+            'db1': {b'key2': b''}
+        }
+        self.journal.write(shards)
+        self.assertTrue(self.journal.exists())
+        self.assertEqual(shards, self.journal.read())
+
+        self.journal.remove()
+        self.assertFalse(self.journal.exists())
+
+
+class TestContextDatabaseFactoryMultipleDB(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+        ContextDatabaseFactory.open(self.state_db_root_path, ContextDatabaseFactory.Mode.MULTIPLE_DB)
+
+        self.score_address = Address.from_data(AddressPrefix.CONTRACT, b'score')
+        self.score_key = self.score_address.to_bytes() + b'|key0'
+        self.icx_key = Address.from_data(AddressPrefix.EOA, b'eoa').to_bytes()
+
+    def tearDown(self):
+        ContextDatabaseFactory.close()
+        rmtree(self.state_db_root_path)
+
+    def test_get_db_name_by_key(self):
+        self.assertEqual(self.score_address.body.hex(),
+                         ContextDatabaseFactory.get_db_name_by_key(self.score_key))
+        self.assertEqual(ICON_DEX_DB_NAME, ContextDatabaseFactory.get_db_name_by_key(self.icx_key))
+        self.assertEqual(ICON_DEX_DB_NAME,
+                         ContextDatabaseFactory.get_db_name_by_key(self.score_address.to_bytes()))
+        self.assertEqual(ICON_DEX_DB_NAME, ContextDatabaseFactory.get_db_name_by_key(b'last_block'))
+
+    def test_create_by_address(self):
+        score_db = ContextDatabaseFactory.create_by_address(self.score_address)
+        self.assertIs(score_db, ContextDatabaseFactory.create_by_address(self.score_address))
+        self.assertIsNot(score_db, ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME))
+
+    def test_write_batch(self):
+        ContextDatabaseFactory.write_batch(None, {self.score_key: b'value0', self.icx_key: b'value1'})
+
+        score_db = ContextDatabaseFactory.create_by_address(self.score_address)
+        icx_db = ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME)
+
+        self.assertEqual(b'value0', score_db.get(None, self.score_key))
+        self.assertIsNone(icx_db.get(None, self.score_key))
+        self.assertEqual(b'value1', icx_db.get(None, self.icx_key))
+        self.assertIsNone(score_db.get(None, self.icx_key))
+
+        journal_path = os.path.join(self.state_db_root_path, ContextDatabaseFactory.COMMIT_JOURNAL_FILE_NAME)
+        self.assertFalse(os.path.exists(journal_path))
+
+    def test_recover(self):
+        ContextDatabaseFactory.write_batch(None, {self.score_key: b'value0'})
+        ContextDatabaseFactory.close()
+
+        # Simulates a crash after writing the journal
+        journal_path = os.path.join(self.state_db_root_path, ContextDatabaseFactory.COMMIT_JOURNAL_FILE_NAME)
+        CommitJournal(journal_path).write(
+            ContextDatabaseFactory.split_states({self.score_key: None, self.icx_key: b'value1'}))
+
+        ContextDatabaseFactory.open(self.state_db_root_path, ContextDatabaseFactory.Mode.MULTIPLE_DB)
+        self.assertFalse(os.path.exists(journal_path))
+
+        score_db = ContextDatabaseFactory.create_by_address(self.score_address)
+        icx_db = ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME)
+        self.assertIsNone(score_db.get(None, self.score_key))
+        self.assertEqual(b'value1', icx_db.get(None, self.icx_key))
+
+
+if __name__ == '__main__':
+    unittest.main()
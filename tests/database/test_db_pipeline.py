@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import unittest
+from threading import Event
+
+from iconservice.base.exception import DatabaseException
+from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.backend import StorageBackendType
+from iconservice.database.db import KeyValueDatabase, ContextDatabase
+from iconservice.database.factory import ContextDatabaseFactory
+from iconservice.database.cache import LRUCache
+from iconservice.database.pipeline import CommitOverlay, CommitPipeline
+from iconservice.iconscore.icon_score_context import IconScoreContextType, IconScoreContext
+from tests import rmtree
+
+
+class TestCommitOverlay(unittest.TestCase):
+    def test_get(self):
+        overlay = CommitOverlay()
+        self.assertEqual((False, None), overlay.get(b'key0'))
+
+        overlay.push(1, {b'key0': b'value0', b'key1': b'value1'})
+        overlay.push(2, {b'key0': b'value2', b'key1': None})
+        self.assertEqual(2, len(overlay))
+
+        # The latest value wins and a deleted key is found with None
+        self.assertEqual((True, b'value2'), overlay.get(b'key0'))
+        self.assertEqual((True, None), overlay.get(b'key1'))
+
+        overlay.pop(2)
+        self.assertEqual((True, b'value0'), overlay.get(b'key0'))
+        self.assertEqual((True, b'value1'), overlay.get(b'key1'))
+
+        overlay.pop(1)
+        self.assertEqual(0, len(overlay))
+        self.assertEqual((False, None), overlay.get(b'key0'))
+
+    def test_items(self):
+        overlay = CommitOverlay()
+        overlay.push(1, {b'a0': b'value0', b'a1': b'value1', b'b0': b'value2'})
+        overlay.push(2, {b'a1': b'', b'a2': b'value3'})
+
+        items = overlay.items(lambda key: key.startswith(b'a'))
+        self.assertEqual({b'a0': b'value0', b'a1': None, b'a2': b'value3'}, items)
+
+
+class TestCommitPipeline(unittest.TestCase):
+    def setUp(self):
+        self.written = []
+        self.release = Event()
+        self.release.set()
+
+        def write(states: dict):
+            self.release.wait()
+            self.written.append(states)
+
+        self.pipeline = CommitPipeline(write, 2)
+
+    def tearDown(self):
+        self.release.set()
+        self.pipeline.close()
+
+    def test_submit_and_flush(self):
+        pipeline = self.pipeline
+        self.release.clear()
+
+        pipeline.submit({b'key0': b'value0'})
+        pipeline.submit({b'key0': b'value1'})
+
+        # Visible before written
+        self.assertEqual((True, b'value1'), pipeline.overlay.get(b'key0'))
+        self.assertEqual(2, pipeline.pending_count)
+
+        self.release.set()
+        pipeline.flush()
+
+        self.assertEqual([{b'key0': b'value0'}, {b'key0': b'value1'}], self.written)
+        self.assertEqual(0, len(pipeline.overlay))
+
+        metrics = pipeline.metrics
+        self.assertEqual(0, metrics['pending'])
+        self.assertEqual(2, metrics['written'])
+        self.assertGreaterEqual(metrics['maxLag'], metrics['lastLag'])
+        self.assertGreater(metrics['averageLag'], 0.0)
+
+    def test_write_failure(self):
+        def write(states: dict):
+            raise OSError('disk full')
+
+        pipeline = CommitPipeline(write, 2)
+        pipeline.submit({b'key0': b'value0'})
+
+        with self.assertRaises(DatabaseException):
+            pipeline.flush()
+        with self.assertRaises(DatabaseException):
+            pipeline.submit({b'key1': b'value1'})
+
+        # The states which have not been written are still readable
+        self.assertEqual((True, b'value0'), pipeline.overlay.get(b'key0'))
+
+        with self.assertRaises(DatabaseException):
+            pipeline.close()
+
+
+class TestContextDatabaseOverlay(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+        self.release = Event()
+        self.release.set()
+        key_value_db = KeyValueDatabase.from_path(os.path.join(self.state_db_root_path, 'db'))
+
+        def write(states: dict):
+            self.release.wait()
+            self.context_db.write_batch(None, states)
+
+        self.pipeline = CommitPipeline(write, 4)
+        self.context_db = ContextDatabase(key_value_db, cache=LRUCache(1024), pipeline=self.pipeline)
+
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.block_batch = BlockBatch()
+        context.tx_batch = TransactionBatch()
+        self.context = context
+
+    def tearDown(self):
+        self.release.set()
+        self.pipeline.close()
+        self.context_db.close(None)
+        rmtree(self.state_db_root_path)
+
+    def test_read_through_overlay(self):
+        db = self.context_db
+        db.key_value_db.write_batch({b'key0': b'value0', b'key1': b'value1', b'key3': b'value3'})
+
+        self.release.clear()
+        self.pipeline.submit({b'key0': b'new_value0', b'key1': None, b'key2': b'value2'})
+
+        for context in (None, IconScoreContext(IconScoreContextType.QUERY), self.context):
+            self.assertEqual(b'new_value0', db.get(context, b'key0'))
+            self.assertIsNone(db.get(context, b'key1'))
+            self.assertEqual([b'new_value0', None, b'value2', b'value3'],
+                             db.get_many(context, [b'key0', b'key1', b'key2', b'key3']))
+            self.assertEqual([(b'key0', b'new_value0'), (b'key2', b'value2'), (b'key3', b'value3')],
+                             list(db.iterator(context, b'key')))
+
+        # Pending states in batches take precedence over the overlay
+        self.context.tx_batch[b'key2'] = b'tx_value2'
+        self.assertEqual(b'tx_value2', db.get(self.context, b'key2'))
+
+        self.assertIsNone(db.key_value_db.get(b'key2'))
+        self.release.set()
+        self.pipeline.flush()
+
+        self.assertEqual(b'value2', db.key_value_db.get(b'key2'))
+        self.assertIsNone(db.key_value_db.get(b'key1'))
+        self.assertEqual(b'new_value0', db.get(None, b'key0'))
+
+    def test_direct_write_waits_for_pipeline(self):
+        db = self.context_db
+        self.pipeline.submit({b'key0': b'value0'})
+
+        db.put(None, b'key0', b'value1')
+        self.assertEqual(0, len(self.pipeline.overlay))
+        self.assertEqual(b'value1', db.get(None, b'key0'))
+        self.assertEqual(b'value1', db.key_value_db.get(b'key0'))
+
+
+class TestContextDatabaseFactoryPipeline(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+    def tearDown(self):
+        ContextDatabaseFactory.close()
+        rmtree(self.state_db_root_path)
+
+    def test_write_batch(self):
+        for mode in ContextDatabaseFactory.Mode:
+            ContextDatabaseFactory.open(self.state_db_root_path, mode,
+                                        backend_type=StorageBackendType.MEMORY,
+                                        commit_queue_size=2)
+            states = {b'key0': b'value0', b'\x01' + b'\x02' * 20 + b'|key1': b'value1'}
+
+            ContextDatabaseFactory.write_batch(None, states)
+            for key, value in states.items():
+                context_db = ContextDatabaseFactory.create_by_name(ContextDatabaseFactory.get_db_name_by_key(key))
+                self.assertEqual(value, context_db.get(None, key))
+
+            ContextDatabaseFactory.flush()
+            for key, value in states.items():
+                context_db = ContextDatabaseFactory.create_by_name(ContextDatabaseFactory.get_db_name_by_key(key))
+                self.assertEqual(value, context_db.key_value_db.get(key))
+
+            self.assertEqual(1, ContextDatabaseFactory.get_commit_metrics()['written'])
+            ContextDatabaseFactory.close()
+
+        ContextDatabaseFactory.open(self.state_db_root_path, ContextDatabaseFactory.Mode.SINGLE_DB)
+        self.assertIsNone(ContextDatabaseFactory.get_commit_metrics())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import unittest
+from unittest.mock import Mock, MagicMock
+
+from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.db import KeyValueDatabase, ContextDatabase
+from iconservice.database.read_set import ReadSet
+from iconservice.iconscore.icon_score_context import IconScoreContextType, IconScoreContext
+
+
+class TestReadSet(unittest.TestCase):
+    def test_conflicts_with(self):
+        read_set = ReadSet()
+        read_set.update([b'key0', b'key1'])
+        read_set.add_range(b'prefix', b'prefix1', b'prefix3')
+
+        self.assertFalse(read_set.conflicts_with(set()))
+        self.assertFalse(read_set.conflicts_with({b'key2', b'prefix0', b'prefix3'}))
+        self.assertTrue(read_set.conflicts_with({b'key2', b'key1'}))
+        self.assertTrue(read_set.conflicts_with({b'prefix2'}))
+
+    def test_record_reads(self):
+        key_value_db = Mock(spec=KeyValueDatabase)
+        key_value_db.get.return_value = None
+        key_value_db.get_many.side_effect = lambda keys: [None] * len(keys)
+        key_value_db.iterator.return_value = MagicMock()
+        key_value_db.iterator.return_value.__iter__.return_value = iter([])
+        context_db = ContextDatabase(key_value_db)
+
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.block_batch = BlockBatch()
+        context.tx_batch = TransactionBatch()
+        context.read_set = ReadSet()
+
+        context_db.get(context, b'key0')
+        context_db.get_many(context, [b'key1', b'key2'])
+        list(context_db.iterator(context, b'prefix'))
+        # Writes are not recorded
+        context_db.put(context, b'key3', b'value3')
+
+        self.assertEqual(4, len(context.read_set))
+        self.assertTrue(context.read_set.conflicts_with({b'key2'}))
+        self.assertTrue(context.read_set.conflicts_with({b'prefix0'}))
+        self.assertFalse(context.read_set.conflicts_with({b'key3'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
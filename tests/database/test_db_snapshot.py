@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import unittest
+from unittest.mock import Mock
+
+from iconservice.database.factory import ContextDatabaseFactory
+from iconservice.database.snapshot import SnapshotManager
+from iconservice.icon_constant import ICON_DEX_DB_NAME
+from iconservice.iconscore.icon_score_context import IconScoreContextType, IconScoreContext
+from tests import rmtree
+
+
+class TestSnapshotManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = SnapshotManager()
+        self.snapshots = []
+
+        def create(manager: 'SnapshotManager', seq: int):
+            snapshot = Mock()
+            snapshot._refcount = 0
+            snapshot.refcount = 0
+            snapshot.seq = seq
+            self.snapshots.append(snapshot)
+            return snapshot
+
+        self.create = create
+
+    def test_acquire_and_release(self):
+        manager = self.manager
+        self.assertIsNone(manager.acquire())
+
+        snapshot0 = manager.acquire(self.create)
+        snapshot1 = manager.acquire()
+        self.assertIs(snapshot0, snapshot1)
+        self.assertEqual(2, snapshot0._refcount)
+
+        # The current snapshot is kept open without references
+        manager.release(snapshot0)
+        manager.release(snapshot1)
+        snapshot0.close.assert_not_called()
+
+        # A commit retires the snapshot which is not referenced
+        manager.on_commit()
+        snapshot0.close.assert_called_once()
+        self.assertIsNone(manager.acquire())
+
+        metrics = manager.metrics
+        self.assertEqual(1, metrics['commitSeq'])
+        self.assertEqual(0, metrics['aliveSnapshots'])
+        self.assertEqual(1, metrics['createdSnapshots'])
+        self.assertEqual(2, metrics['acquired'])
+        self.assertEqual(2, metrics['maxRefcount'])
+
+    def test_release_after_commit(self):
+        manager = self.manager
+        snapshot0 = manager.acquire(self.create)
+
+        manager.on_commit()
+        snapshot1 = manager.acquire(self.create)
+        self.assertIsNot(snapshot0, snapshot1)
+        self.assertEqual(1, snapshot1.seq)
+        self.assertEqual(2, manager.metrics['aliveSnapshots'])
+
+        # The retired snapshot is closed by the last release
+        snapshot0.close.assert_not_called()
+        manager.release(snapshot0)
+        snapshot0.close.assert_called_once()
+
+        manager.close()
+        snapshot1.close.assert_called_once()
+        self.assertEqual(0, manager.metrics['aliveSnapshots'])
+
+
+class TestStateSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+    def tearDown(self):
+        ContextDatabaseFactory.close()
+        rmtree(self.state_db_root_path)
+
+    @staticmethod
+    def _create_query_context() -> 'IconScoreContext':
+        context = IconScoreContext(IconScoreContextType.QUERY)
+        context.snapshot = ContextDatabaseFactory.acquire_snapshot()
+        return context
+
+    def _assert_isolated(self, mode: 'ContextDatabaseFactory.Mode', commit_queue_size: int):
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+        ContextDatabaseFactory.open(self.state_db_root_path, mode,
+                                    cache_size=1024, commit_queue_size=commit_queue_size)
+        score_key = b'\x01' + b'\x02' * 20 + b'|key'
+
+        ContextDatabaseFactory.write_batch(None, {b'key0': b'value0', b'key1': b'value1'})
+        context_db = ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME)
+        # Fills the cache with the committed states
+        self.assertEqual(b'value0', context_db.get(None, b'key0'))
+
+        context = self._create_query_context()
+
+        # A block is committed in the middle of the query
+        ContextDatabaseFactory.write_batch(
+            None, {b'key0': b'new_value0', b'key1': None, b'key2': b'value2', score_key: b'value'})
+        score_db = ContextDatabaseFactory.create_by_name(ContextDatabaseFactory.get_db_name_by_key(score_key))
+
+        self.assertEqual(b'value0', context_db.get(context, b'key0'))
+        self.assertEqual([b'value0', b'value1', None], context_db.get_many(context, [b'key0', b'key1', b'key2']))
+        self.assertEqual([(b'key0', b'value0'), (b'key1', b'value1')], list(context_db.iterator(context, b'key')))
+        self.assertIsNone(score_db.get(context, score_key))
+
+        # A query after the commit sees the new states
+        new_context = self._create_query_context()
+        self.assertIsNot(context.snapshot, new_context.snapshot)
+        self.assertEqual(b'new_value0', context_db.get(new_context, b'key0'))
+        self.assertEqual([(b'key0', b'new_value0'), (b'key2', b'value2')],
+                         list(context_db.iterator(new_context, b'key')))
+        self.assertEqual(b'value', score_db.get(new_context, score_key))
+
+        ContextDatabaseFactory.release_snapshot(context.snapshot)
+        ContextDatabaseFactory.release_snapshot(new_context.snapshot)
+
+        metrics = ContextDatabaseFactory.get_snapshot_metrics()
+        self.assertEqual(2, metrics['commitSeq'])
+        self.assertEqual(1, metrics['aliveSnapshots'])
+        self.assertEqual(0, metrics['refcount'])
+
+        ContextDatabaseFactory.close()
+
+    def test_isolation(self):
+        for mode in ContextDatabaseFactory.Mode:
+            self._assert_isolated(mode, 0)
+
+    def test_isolation_with_pipeline(self):
+        for mode in ContextDatabaseFactory.Mode:
+            self._assert_isolated(mode, 2)
+
+    def test_shared_snapshot(self):
+        ContextDatabaseFactory.open(self.state_db_root_path, ContextDatabaseFactory.Mode.SINGLE_DB)
+        ContextDatabaseFactory.write_batch(None, {b'key0': b'value0'})
+
+        contexts = [self._create_query_context() for _ in range(3)]
+        self.assertIs(contexts[0].snapshot, contexts[2].snapshot)
+        self.assertEqual(3, contexts[0].snapshot.refcount)
+        self.assertEqual(3, ContextDatabaseFactory.get_snapshot_metrics()['maxRefcount'])
+
+        for context in contexts:
+            ContextDatabaseFactory.release_snapshot(context.snapshot)
+        self.assertEqual(1, ContextDatabaseFactory.get_snapshot_metrics()['createdSnapshots'])
+
+    def test_stale_snapshot_skips_cache(self):
+        ContextDatabaseFactory.open(self.state_db_root_path, ContextDatabaseFactory.Mode.SINGLE_DB, cache_size=1024)
+        ContextDatabaseFactory.write_batch(None, {b'key0': b'value0'})
+        context_db = ContextDatabaseFactory.get_shared_db()
+
+        context = self._create_query_context()
+        ContextDatabaseFactory.write_batch(None, {b'key0': b'value1', b'key1': b'value1'})
+        self.assertEqual(b'value1', context_db.cache.get(b'key0'))
+
+        # Neither reads the newer states in the cache nor fills it with older ones
+        self.assertEqual(b'value0', context_db.get(context, b'key0'))
+        self.assertIsNone(context_db.get(context, b'key1'))
+        self.assertEqual(b'value1', context_db.cache.get(b'key0'))
+
+        ContextDatabaseFactory.release_snapshot(context.snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import random
+import unittest
+
+from iconservice.base.exception import InvalidParamsException
+from iconservice.database.db import ContextDatabase
+from iconservice.database.trie import StateTrie, EMPTY_TRIE_ROOT, TRIE_ROOT_KEY, TRIE_NODE_PREFIX, \
+    TRIE_STALE_PREFIX
+from tests import rmtree
+
+
+class TestStateTrie(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+        self.db = ContextDatabase.from_path(os.path.join(self.state_db_root_path, 'db'))
+        self.trie = StateTrie(self.db, 1024 * 1024)
+
+        random.seed(0)
+
+    def tearDown(self):
+        self.db.close(None)
+        rmtree(self.state_db_root_path)
+
+    def _commit(self, trie_states: dict):
+        self.db.write_batch(None, trie_states)
+        self.trie.commit(trie_states)
+
+    @staticmethod
+    def _make_states(count: int) -> dict:
+        return {os.urandom(random.randint(1, 40)): os.urandom(random.randint(1, 40)) for _ in range(count)}
+
+    def test_empty(self):
+        self.assertIsNone(self.trie.get_committed_root())
+
+        root, trie_states = self.trie.update(EMPTY_TRIE_ROOT, {})
+        self.assertEqual(EMPTY_TRIE_ROOT, root)
+        self.assertEqual({TRIE_ROOT_KEY: EMPTY_TRIE_ROOT}, trie_states)
+
+        self.assertIsNone(StateTrie.verify_proof(root, b'key', self.trie.get_proof(root, b'key')))
+
+    def test_root_independent_of_history(self):
+        states = self._make_states(300)
+
+        root0, trie_states = self.trie.update(EMPTY_TRIE_ROOT, states)
+        self._commit(trie_states)
+        self.assertEqual(root0, self.trie.get_committed_root())
+
+        # The same states in a different order make the same root
+        items = list(states.items())
+        random.shuffle(items)
+        root1, _ = self.trie.update(EMPTY_TRIE_ROOT, dict(items))
+        self.assertEqual(root0, root1)
+
+        # Incremental update is the same as building from scratch
+        changes = self._make_states(50)
+        for key in random.sample(list(states), 100):
+            changes[key] = None
+        root2, trie_states = self.trie.update(root0, changes)
+        self._commit(trie_states)
+
+        for key, value in changes.items():
+            if value:
+                states[key] = value
+            else:
+                del states[key]
+        root3, _ = self.trie.update(EMPTY_TRIE_ROOT, states)
+        self.assertEqual(root3, root2)
+
+        # Deleting every key makes the trie empty
+        root4, _ = self.trie.update(root2, {key: b'' for key in states})
+        self.assertEqual(EMPTY_TRIE_ROOT, root4)
+
+    def test_proof(self):
+        states = self._make_states(200)
+        root, trie_states = self.trie.update(EMPTY_TRIE_ROOT, states)
+        self._commit(trie_states)
+
+        for key, value in list(states.items())[:20]:
+            proof = self.trie.get_proof(root, key)
+            self.assertEqual(value, StateTrie.verify_proof(root, key, proof))
+
+        absent_key = b'absent'
+        proof = self.trie.get_proof(root, absent_key)
+        self.assertIsNone(StateTrie.verify_proof(root, absent_key, proof))
+
+        key, value = next(iter(states.items()))
+        proof = self.trie.get_proof(root, key)
+
+        with self.assertRaises(InvalidParamsException):
+            StateTrie.verify_proof(root, key, proof[:-1] + [proof[-1] + b'\x00'])
+
+        with self.assertRaises(InvalidParamsException):
+            StateTrie.verify_proof(root, key, proof[:-1])
+
+    def test_node_cache(self):
+        states = self._make_states(100)
+        root, trie_states = self.trie.update(EMPTY_TRIE_ROOT, states)
+        self._commit(trie_states)
+
+        cache = self.trie.cache
+        self.assertEqual(len(trie_states) - 1, len(cache))
+
+        hits = cache.hits
+        self.trie.get_proof(root, next(iter(states)))
+        self.assertGreater(cache.hits, hits)
+
+    def test_build(self):
+        work_path = os.path.join(self.state_db_root_path, 'build')
+
+        for count in (0, 1, 2, 300):
+            states = self._make_states(count)
+            expected_root, expected_states = self.trie.update(EMPTY_TRIE_ROOT, states)
+
+            written = {}
+            batch_sizes = []
+
+            def write(nodes: dict):
+                batch_sizes.append(len(nodes))
+                written.update(nodes)
+
+            # Excluded keys and deleted states are skipped
+            items = list(states.items()) + [(TRIE_ROOT_KEY, b'root'), (b'deleted', b'')]
+            root = self.trie.build(items, work_path, write, flush_size=7)
+
+            self.assertEqual(expected_root, root)
+            self.assertEqual(expected_states, written)
+            self.assertLessEqual(max(batch_sizes), 8)
+            self.assertFalse(os.path.exists(work_path))
+
+        root = self.trie.build(states.items(), work_path, lambda nodes: self.db.write_batch(None, nodes))
+        self.assertEqual(root, self.trie.get_committed_root())
+        for key, value in list(states.items())[:20]:
+            self.assertEqual(value, StateTrie.verify_proof(root, key, self.trie.get_proof(root, key)))
+
+    def test_prune(self):
+        retention = 2
+        trie = StateTrie(self.db, 0, retention)
+
+        def commit(height: int, root: bytes, changes: dict) -> bytes:
+            root, trie_states = trie.update(root, changes, height=height)
+            trie_states.update(trie.prune(trie_states, height))
+            self.db.write_batch(None, trie_states)
+            trie.commit(trie_states)
+            return root
+
+        def get_node_count() -> int:
+            return sum(1 for _ in self.db.key_value_db.iterator(prefix=TRIE_NODE_PREFIX))
+
+        def verify(root: bytes, states: dict) -> int:
+            """Verifies every state with the nodes in the db and returns the number of the nodes in use
+            """
+            nodes = set()
+            for key, value in states.items():
+                proof = trie.get_proof(root, key)
+                self.assertEqual(value, StateTrie.verify_proof(root, key, proof))
+                nodes.update(proof)
+            return len(nodes)
+
+        states = self._make_states(100)
+        root = commit(1, EMPTY_TRIE_ROOT, states)
+        old_key, old_value = next(iter(states.items()))
+
+        height = 1
+        for height in range(2, 10):
+            changes = {key: os.urandom(10) for key in random.sample(list(states), 10)}
+            for key in random.sample(list(states), 3):
+                changes[key] = None
+            if height == 4:
+                # The leaf replaced at height 2 is made again
+                changes[old_key] = old_value
+            elif height == 2:
+                changes[old_key] = b'new value'
+
+            root = commit(height, root, changes)
+            for key, value in changes.items():
+                if value:
+                    states[key] = value
+                else:
+                    states.pop(key, None)
+
+            self.assertGreater(get_node_count(), verify(root, states))
+
+        # No nodes are replaced during the retention period
+        for height in range(height + 1, height + 1 + retention):
+            root = commit(height, root, {})
+
+        self.assertEqual(verify(root, states), get_node_count())
+        self.assertEqual([], list(self.db.key_value_db.iterator(prefix=TRIE_STALE_PREFIX)))
+
+        # The journal is loaded again after a restart
+        trie = StateTrie(self.db, 0, retention)
+        changes = {old_key: b'changed again'}
+        root = commit(height + 1, root, changes)
+        states.update(changes)
+        self.assertEqual(1, len(list(self.db.key_value_db.iterator(prefix=TRIE_STALE_PREFIX))))
+
+        for height in range(height + 2, height + 2 + retention):
+            root = commit(height, root, {})
+        self.assertEqual(verify(root, states), get_node_count())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,10 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import random
 import unittest
+from collections import OrderedDict
 
 from iconservice.base.exception import ServerErrorException
-from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.batch import BlockBatch, TransactionBatch, digest
 
 
 class TestTransactionBatch(unittest.TestCase):
@@ -150,3 +152,83 @@ class TestTransactionBatch(unittest.TestCase):
         block_batch = BlockBatch()
         block_batch.update(tx_batch)
         self.assertEqual(b'value0', block_batch[b'key0'])
+
+    def test_revert_call(self):
+        tx_batch = TransactionBatch()
+        tx_batch[b'key0'] = b'value0'
+
+        tx_batch.enter_call()
+        tx_batch[b'key1'] = b'value1'
+        tx_batch[b'key0'] = b'value2'
+
+        tx_batch.enter_call()
+        tx_batch[b'key2'] = b'value3'
+        tx_batch[b'key0'] = None
+        tx_batch.leave_call()
+
+        tx_batch.revert_call()
+        self.assertEqual(1, len(tx_batch))
+        self.assertEqual(b'value0', tx_batch[b'key0'])
+        self.assertFalse(b'key1' in tx_batch)
+        self.assertFalse(b'key2' in tx_batch)
+
+        # Reverted keys are appended again at the end
+        tx_batch[b'key2'] = b'value4'
+        tx_batch.leave_call()
+        tx_batch[b'key1'] = b'value5'
+        self.assertEqual([b'key0', b'key2', b'key1'], list(tx_batch))
+
+    def test_same_as_nested_call_batches(self):
+        """Compares with the states stacked in nested call batches
+        """
+        class NestedCallBatches(object):
+            def __init__(self):
+                self.call_batches = [OrderedDict()]
+
+            def get(self, key):
+                for call_batch in reversed(self.call_batches):
+                    if key in call_batch:
+                        return call_batch[key]
+                return None
+
+            def __len__(self):
+                return sum(len(call_batch) for call_batch in self.call_batches)
+
+            def leave_call(self):
+                call_batch = self.call_batches.pop()
+                self.call_batches[-1].update(call_batch)
+
+        random.seed(0)
+        keys = [f'key{i}'.encode() for i in range(20)]
+
+        for _ in range(100):
+            tx_batch = TransactionBatch()
+            expected = NestedCallBatches()
+
+            for i in range(200):
+                op = random.random()
+                if op < 0.15 and tx_batch.call_count < 8:
+                    tx_batch.enter_call()
+                    expected.call_batches.append(OrderedDict())
+                elif op < 0.25 and tx_batch.call_count > 1:
+                    tx_batch.leave_call()
+                    expected.leave_call()
+                elif op < 0.3:
+                    tx_batch.revert_call()
+                    expected.call_batches[-1].clear()
+                else:
+                    key = random.choice(keys)
+                    value = random.choice([None, b'', f'value{i}'.encode()])
+                    tx_batch[key] = value
+                    expected.call_batches[-1][key] = value
+
+                self.assertEqual(len(expected), len(tx_batch))
+                for key in keys:
+                    self.assertEqual(expected.get(key), tx_batch[key])
+
+            while tx_batch.call_count > 1:
+                tx_batch.leave_call()
+                expected.leave_call()
+
+            self.assertEqual(list(expected.call_batches[0]), list(tx_batch))
+            self.assertEqual(digest(expected.call_batches[0]), tx_batch.digest())
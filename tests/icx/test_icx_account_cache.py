@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import shutil
+import unittest
+from unittest.mock import patch
+
+from iconservice.base.address import AddressPrefix
+from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.db import ContextDatabase
+from iconservice.iconscore.icon_score_context import IconScoreContextType, IconScoreContext
+from iconservice.icx.icx_account import Account
+from iconservice.icx.icx_account_cache import AccountCache
+from iconservice.icx.icx_storage import IcxStorage
+from tests import create_address
+
+
+class TestAccountCache(unittest.TestCase):
+    def setUp(self):
+        self.db_name = 'icx_cache.db'
+        self.storage = IcxStorage(ContextDatabase.from_path(self.db_name))
+
+        self.address = create_address(AddressPrefix.EOA)
+        account = Account(address=self.address, icx=100)
+        self.storage.put_account(IconScoreContext(IconScoreContextType.DIRECT), self.address, account)
+
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.block_batch = BlockBatch()
+        context.tx_batch = TransactionBatch()
+        context.account_cache = AccountCache()
+        self.context = context
+
+    def tearDown(self):
+        self.storage.close(None)
+        shutil.rmtree(self.db_name)
+
+    def test_get_put(self):
+        cache = AccountCache()
+        key = self.address.to_bytes()
+        account = Account(address=self.address, icx=1)
+        value = account.to_bytes()
+        cache.put(key, value, account)
+
+        # An independent clone is returned
+        cached_account = cache.get(key, value)
+        self.assertIsNot(account, cached_account)
+        self.assertEqual(account, cached_account)
+        cached_account.deposit(1)
+        self.assertEqual(1, account.icx)
+        self.assertIsNone(cache.get(key, None))
+
+        # A change which has not been written is not returned
+        account.deposit(1)
+        self.assertIsNone(cache.get(key, value))
+
+    def test_absent_account(self):
+        cache = AccountCache()
+        key = self.address.to_bytes()
+        account = Account(address=self.address)
+        cache.put(key, None, account, account.to_bytes())
+        self.assertEqual(0, cache.get(key, None).icx)
+
+        account.deposit(1)
+        self.assertIsNone(cache.get(key, None))
+
+    def test_materialize_once(self):
+        context = self.context
+
+        with patch.object(Account, 'from_bytes', wraps=Account.from_bytes) as from_bytes:
+            for _ in range(3):
+                account = self.storage.get_account(context, self.address)
+                account.deposit(10)
+                self.storage.put_account(context, self.address, account)
+                context.block_batch.update(context.tx_batch)
+                context.tx_batch.clear()
+
+            self.assertEqual(130, self.storage.get_account(context, self.address).icx)
+            self.assertEqual(130, self.storage.get_accounts(context, [self.address])[0].icx)
+            self.assertEqual(1, from_bytes.call_count)
+
+    def test_revert_call(self):
+        context = self.context
+
+        context.tx_batch.enter_call()
+        account = self.storage.get_account(context, self.address)
+        account.deposit(10)
+        self.storage.put_account(context, self.address, account)
+        self.assertEqual(110, self.storage.get_account(context, self.address).icx)
+        context.tx_batch.revert_call()
+        context.tx_batch.leave_call()
+        self.assertEqual(100, self.storage.get_account(context, self.address).icx)
+
+        # A failed transaction
+        account.deposit(10)
+        self.storage.put_account(context, self.address, account)
+        context.tx_batch.clear()
+        self.assertEqual(100, self.storage.get_account(context, self.address).icx)
+
+
+if __name__ == '__main__':
+    unittest.main()
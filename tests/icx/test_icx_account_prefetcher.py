@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import shutil
+import unittest
+from unittest.mock import patch
+
+from iconservice.base.address import AddressPrefix
+from iconservice.base.type_converter import TypeConverter
+from iconservice.base.type_converter_templates import ParamType
+from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.db import ContextDatabase
+from iconservice.database.read_set import ReadSet
+from iconservice.iconscore.icon_score_context import IconScoreContextType, IconScoreContext
+from iconservice.icx.icx_account import Account
+from iconservice.icx.icx_account_prefetcher import AccountPrefetcher
+from iconservice.icx.icx_storage import IcxStorage
+from tests import create_address
+
+
+class TestAccountPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.db_name = 'icx_prefetch.db'
+        self.storage = IcxStorage(ContextDatabase.from_path(self.db_name))
+        self.prefetcher = AccountPrefetcher(self.storage)
+
+        self.addresses = [create_address(AddressPrefix.EOA) for _ in range(3)]
+        direct_context = IconScoreContext(IconScoreContextType.DIRECT)
+        for i, address in enumerate(self.addresses[:2]):
+            account = Account(address=address)
+            account.deposit((i + 1) * 100)
+            self.storage.put_account(direct_context, address, account)
+
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.block_batch = BlockBatch()
+        context.tx_batch = TransactionBatch()
+        self.context = context
+
+    def tearDown(self):
+        self.prefetcher.close()
+        self.storage.close(None)
+        shutil.rmtree(self.db_name)
+
+    def _prefetch(self) -> None:
+        self.context.prefetched_accounts = self.prefetcher.start(self.context, self.addresses)
+        self.context.prefetched_accounts._future.result()
+
+    def test_collect_addresses(self):
+        treasury = create_address(AddressPrefix.EOA)
+        score_address = create_address(AddressPrefix.CONTRACT)
+        a, b = self.addresses[:2]
+        tx_requests = [
+            {'method': 'icx_sendTransaction', 'params': {'from': a, 'to': b}},
+            {'method': 'icx_sendTransaction', 'params': {'from': b, 'to': score_address}},
+            {'method': 'icx_sendTransaction', 'params': {'from': a, 'to': treasury}}
+        ]
+        self.assertEqual([treasury, a, b, score_address],
+                         AccountPrefetcher.collect_addresses(tx_requests, treasury))
+        self.assertEqual([a, b, score_address, treasury], AccountPrefetcher.collect_addresses(tx_requests, None))
+
+        # The addresses of the transactions not converted yet are converted once for each distinct one
+        raw_tx_requests = [
+            {'method': 'icx_sendTransaction', 'params': {'from': str(a), 'to': str(b)}},
+            {'method': 'icx_sendTransaction', 'params': {'from': str(b), 'to': 'hx1234'}},
+            {'method': 'icx_sendTransaction', 'params': {'from': str(a), 'to': str(treasury)}}
+        ]
+        lazy_tx_requests = TypeConverter.convert({'transactions': raw_tx_requests}, ParamType.INVOKE, lazy=True)
+        self.assertEqual([treasury, a, b],
+                         AccountPrefetcher.collect_addresses(lazy_tx_requests['transactions'], treasury))
+        self.assertTrue(all(dict.__len__(tx_request) == 0 for tx_request in lazy_tx_requests['transactions']))
+
+    def test_get_prefetched_accounts(self):
+        self._prefetch()
+        self.assertEqual(3, len(self.context.prefetched_accounts))
+        loaded_account = self.context.prefetched_accounts._accounts[self.addresses[0].to_bytes()]
+
+        with patch.object(self.storage.db, 'get') as get, patch.object(self.storage.db, 'get_many') as get_many:
+            account = self.storage.get_account(self.context, self.addresses[0])
+            accounts = self.storage.get_accounts(self.context, self.addresses[1:])
+            get.assert_not_called()
+            get_many.assert_not_called()
+
+        self.assertEqual(100, account.icx)
+        self.assertEqual(self.addresses[0], account.address)
+        self.assertEqual([200, 0], [account.icx for account in accounts])
+        self.assertEqual(self.addresses[1:], [account.address for account in accounts])
+
+        # An account is handed out once without being copied
+        self.assertIs(loaded_account, account)
+        self.assertEqual(0, len(self.context.prefetched_accounts))
+        account.deposit(1)
+        with patch.object(self.storage.db, 'get', wraps=self.storage.db.get) as get:
+            self.assertEqual(100, self.storage.get_account(self.context, self.addresses[0]).icx)
+            get.assert_called_once()
+
+    def test_written_accounts(self):
+        self._prefetch()
+        context = self.context
+
+        account = self.storage.get_account(context, self.addresses[0])
+        account.deposit(1)
+        self.storage.put_account(context, account.address, account)
+        self.assertEqual(101, self.storage.get_account(context, self.addresses[0]).icx)
+
+        context.block_batch.update(context.tx_batch)
+        context.tx_batch.clear()
+        self.assertEqual([101, 200], [account.icx for account in self.storage.get_accounts(context, self.addresses[:2])])
+
+    def test_record_reads(self):
+        self._prefetch()
+        self.context.read_set = ReadSet()
+
+        self.storage.get_account(self.context, self.addresses[0])
+        self.assertTrue(self.context.read_set.conflicts_with({self.addresses[0].to_bytes()}))
+
+    def test_cancel(self):
+        prefetched_accounts = self.prefetcher.start(self.context, self.addresses)
+        prefetched_accounts.cancel()
+
+        # Loading never resumes after cancelled
+        self.prefetcher.close()
+        loaded = len(prefetched_accounts)
+        self.assertEqual(loaded, len(prefetched_accounts))
+        self.assertIn(loaded, (0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
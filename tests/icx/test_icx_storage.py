@@ -60,6 +60,21 @@ class TestIcxStorage(unittest.TestCase):
         account2 = self.storage.get_account(context, account.address)
         self.assertEqual(account, account2)
 
+    def test_get_accounts(self):
+        context = self.context
+        account = Account()
+        account.address = create_address(AddressPrefix.EOA)
+        account.deposit(10 ** 19)
+        self.storage.put_account(context, account.address, account)
+
+        absent_address = create_address(AddressPrefix.EOA)
+        accounts = self.storage.get_accounts(context, [account.address, absent_address])
+        self.assertEqual(2, len(accounts))
+        self.assertEqual(account, accounts[0])
+        self.assertEqual(absent_address, accounts[1].address)
+        self.assertEqual(0, accounts[1].icx)
+        self.storage.delete_account(context, account.address)
+
     def test_delete_account(self):
         context = self.context
         account = Account()
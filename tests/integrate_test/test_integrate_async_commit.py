@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase with the commit pipeline
+"""
+
+import unittest
+
+from iconservice.base.block import Block
+from iconservice.database.factory import ContextDatabaseFactory
+from iconservice.icon_constant import ConfigKey
+from iconservice.icx.icx_storage import IcxStorage
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+
+class TestIntegrateAsyncCommit(TestIntegrateBase):
+
+    def _make_init_config(self) -> dict:
+        return {ConfigKey.ASYNC_COMMIT: True, ConfigKey.COMMIT_QUEUE_SIZE: 2}
+
+    def test_commit(self):
+        value = 1 * self._icx_factor
+
+        # Each block reads the states of the previous block which may not be written yet
+        for i in range(5):
+            tx = self._make_icx_send_tx(self._genesis, self._addr_array[0], value)
+            prev_block, tx_results = self._make_and_req_block([tx])
+            self._write_precommit_state(prev_block)
+            self.assertEqual(int(True), tx_results[0].status)
+            self.assertEqual(value * (i + 1), self._query({"address": self._addr_array[0]}, 'icx_getBalance'))
+
+        ContextDatabaseFactory.flush()
+
+        key_value_db = ContextDatabaseFactory.get_shared_db().key_value_db
+        last_block = Block.from_bytes(key_value_db.get(IcxStorage.LAST_BLOCK_KEY))
+        self.assertEqual(prev_block.hash, last_block.hash)
+
+        response = self._query({}, 'ise_getStatus')
+        self.assertEqual(0, response['commitPipeline']['pending'])
+        self.assertEqual(6, response['commitPipeline']['written'])
+        self.assertEqual(6, response['stateSnapshot']['commitSeq'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,9 +17,10 @@
 """IconServiceEngine testcase
 """
 
+from copy import deepcopy
 from unittest import TestCase
 
-from typing import TYPE_CHECKING, Union, Optional, Any
+from typing import TYPE_CHECKING, Union, Optional, Any, ContextManager
 
 from iconcommons import IconConfig
 from iconservice.base.block import Block
@@ -280,6 +281,32 @@ class TestIntegrateBase(TestCase):
     def _remove_precommit_state(self, block: 'Block') -> None:
         self.icon_service_engine.rollback(block)
 
+    def _invoke_and_compare(self, tx_list: list, baseline: ContextManager) -> list:
+        """Invokes a block, invokes it again in the baseline and checks that the results are the same
+
+        :param tx_list: transactions in a block
+        :param baseline: context in which the feature under test is turned off e.g. patch.object()
+        :return: transaction results in the baseline
+        """
+        engine = self.icon_service_engine
+        block = self._create_invalid_block()
+
+        # SCORE params in a request are converted in place on execution
+        tx_results, state_root_hash = engine.invoke(block, deepcopy(tx_list))
+        results = [(tx_result.to_dict(), [trace.to_dict() for trace in tx_result.traces]) for tx_result in tx_results]
+        self._remove_precommit_state(block)
+
+        with baseline:
+            tx_results, expected_state_root_hash = engine.invoke(block, tx_list)
+
+        self.assertEqual(expected_state_root_hash, state_root_hash)
+        self.assertEqual(
+            [(tx_result.to_dict(), [trace.to_dict() for trace in tx_result.traces]) for tx_result in tx_results],
+            results)
+
+        self._write_precommit_state(block)
+        return tx_results
+
     def _query(self, request: dict, method: str = 'icx_call') -> Any:
         response = self.icon_service_engine.query(method, request)
         return response
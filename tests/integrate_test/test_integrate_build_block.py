@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase about filling a block with the candidate transactions up to a step budget
+"""
+
+import unittest
+from unittest.mock import patch
+
+from iconservice.base.block import Block
+from iconservice.base.exception import InvalidParamsException
+from tests import create_block_hash
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+
+class TestIntegrateBuildBlock(TestIntegrateBase):
+
+    def _make_candidates(self, count: int) -> list:
+        return [self._make_icx_send_tx(self._genesis, self._addr_array[i], self._icx_factor) for i in range(count)]
+
+    def _get_step_used_by_transfer(self) -> int:
+        block = self._create_invalid_block()
+        _, tx_results, _ = self.icon_service_engine.build_block(block, self._make_candidates(1), 10 ** 12)
+        self._remove_precommit_state(block)
+        return tx_results[0].step_used
+
+    def test_build_block(self):
+        engine = self.icon_service_engine
+        step_used = self._get_step_used_by_transfer()
+
+        block = self._create_invalid_block()
+        candidates = self._make_candidates(5)
+        tx_requests, tx_results, state_root_hash = engine.build_block(block, candidates, step_used * 3 + 1)
+
+        self.assertEqual(candidates[:3], tx_requests)
+        self.assertEqual([0, 1, 2], [tx_result.tx_index for tx_result in tx_results])
+        self.assertEqual(step_used * 3, tx_results[-1].cumulative_step_used)
+
+        # Invoking the block built is free
+        with patch.object(engine, '_invoke_request') as invoke_request:
+            invoked_tx_results, invoked_state_root_hash = engine.invoke(block, tx_requests)
+            invoke_request.assert_not_called()
+        self.assertEqual(state_root_hash, invoked_state_root_hash)
+        self.assertEqual(tx_results, invoked_tx_results)
+
+        # The results are the same as the ones of the block invoked
+        self._remove_precommit_state(block)
+        expected_tx_results, expected_state_root_hash = engine.invoke(block, tx_requests)
+        self.assertEqual(expected_state_root_hash, state_root_hash)
+        self.assertEqual([tx_result.to_dict() for tx_result in expected_tx_results],
+                         [tx_result.to_dict() for tx_result in tx_results])
+        self._write_precommit_state(block)
+
+        self.assertEqual(0, self._query({"address": self._addr_array[3]}, 'icx_getBalance'))
+
+    def test_change_block_hash(self):
+        engine = self.icon_service_engine
+
+        block = self._create_invalid_block()
+        tx_requests, tx_results, state_root_hash = engine.build_block(block, self._make_candidates(2), 10 ** 12)
+
+        # The block hash is decided after the transactions are chosen
+        new_block = Block(block.height, create_block_hash(), block.timestamp, block.prev_hash)
+        with patch.object(engine, '_invoke_request') as invoke_request:
+            invoked_tx_results, invoked_state_root_hash = engine.invoke(new_block, tx_requests)
+            invoke_request.assert_not_called()
+        self.assertEqual(state_root_hash, invoked_state_root_hash)
+        self.assertEqual([new_block.hash] * 2, [tx_result.block_hash for tx_result in invoked_tx_results])
+        self.assertIsNone(engine._precommit_data_manager.get(block.hash))
+
+        self._write_precommit_state(new_block)
+        self.assertEqual(self._icx_factor, self._query({"address": self._addr_array[1]}, 'icx_getBalance'))
+
+    def test_invalid_block(self):
+        engine = self.icon_service_engine
+        block = self._create_invalid_block()
+        engine.build_block(block, self._make_candidates(1), 10 ** 12)
+
+        with self.assertRaises(InvalidParamsException):
+            engine.build_block(block, self._make_candidates(1), 10 ** 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase invoking blocks on top of uncommitted blocks
+"""
+
+import unittest
+
+from iconservice.base.address import ZERO_SCORE_ADDRESS
+from iconservice.base.block import Block
+from iconservice.base.exception import ExceptionCode
+from tests import create_block_hash
+from tests.integrate_test import create_timestamp
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+
+class TestIntegrateChainedPrecommit(TestIntegrateBase):
+
+    def _invoke_on(self, parent: 'Block', tx_list: list) -> tuple:
+        block = Block(parent.height + 1, create_block_hash(), create_timestamp(), parent.hash)
+        tx_results, state_root_hash = self.icon_service_engine.invoke(block, tx_list)
+        return block, tx_results
+
+    def _get_balance(self, address) -> int:
+        return self._query({"address": address}, 'icx_getBalance')
+
+    def test_commit_chain(self):
+        value = 10 * self._icx_factor
+
+        tx = self._make_icx_send_tx(self._genesis, self._addr_array[0], value)
+        block1, tx_results = self._make_and_req_block([tx])
+        self.assertEqual(int(True), tx_results[0].status)
+
+        # addr_array[0] spends icx received in the uncommitted parent block
+        tx = self._make_icx_send_tx(self._addr_array[0], self._addr_array[1], value // 2,
+                                    disable_pre_validate=True)
+        block2, tx_results = self._invoke_on(block1, [tx])
+        self.assertEqual(int(True), tx_results[0].status)
+
+        # A fork of block2
+        tx = self._make_icx_send_tx(self._addr_array[0], self._addr_array[2], value // 2,
+                                    disable_pre_validate=True)
+        fork_block2, tx_results = self._invoke_on(block1, [tx])
+        self.assertEqual(int(True), tx_results[0].status)
+
+        # Nothing is committed yet
+        self.assertEqual(0, self._get_balance(self._addr_array[0]))
+
+        # Committing block2 commits block1 first and drops the fork
+        self.icon_service_engine.commit(block2)
+        self.assertEqual(block2.hash, self.icon_service_engine._precommit_data_manager.last_block.hash)
+        self.assertIsNone(self.icon_service_engine._precommit_data_manager.get(fork_block2.hash))
+        self.assertTrue(self.icon_service_engine._precommit_data_manager.empty())
+
+        self.assertEqual(value // 2, self._get_balance(self._addr_array[1]))
+        self.assertEqual(0, self._get_balance(self._addr_array[2]))
+
+    def test_commit_parent_first(self):
+        tx = self._make_icx_send_tx(self._genesis, self._addr_array[0], self._icx_factor)
+        block1, _ = self._make_and_req_block([tx])
+        tx = self._make_icx_send_tx(self._genesis, self._addr_array[1], self._icx_factor)
+        block2, _ = self._invoke_on(block1, [tx])
+
+        self.icon_service_engine.commit(block1)
+        self.assertEqual(self._icx_factor, self._get_balance(self._addr_array[0]))
+        self.assertEqual(0, self._get_balance(self._addr_array[1]))
+
+        # block2 reads the states of block1 from the state db after block1 is committed
+        tx = self._make_icx_send_tx(self._genesis, self._addr_array[2], self._icx_factor)
+        block3, _ = self._invoke_on(block2, [tx])
+
+        self.icon_service_engine.commit(block3)
+        for i in range(3):
+            self.assertEqual(self._icx_factor, self._get_balance(self._addr_array[i]))
+
+    def test_rollback_subtree(self):
+        tx = self._make_icx_send_tx(self._genesis, self._addr_array[0], self._icx_factor)
+        block1, _ = self._make_and_req_block([tx])
+        block2, _ = self._invoke_on(block1, [])
+        block3, _ = self._invoke_on(block2, [])
+
+        self.icon_service_engine.rollback(block1)
+        self.assertTrue(self.icon_service_engine._precommit_data_manager.empty())
+
+        with self.assertRaises(BaseException) as e:
+            self._invoke_on(block3, [])
+        self.assertEqual(ExceptionCode.SERVER_ERROR, e.exception.code)
+        self.assertIn("Failed to invoke a block", e.exception.message)
+
+        with self.assertRaises(BaseException) as e:
+            self.icon_service_engine.commit(block3)
+        self.assertIn("No precommit data", e.exception.message)
+
+    def test_deploy_in_parent(self):
+        tx = self._make_deploy_tx("test_deploy_scores",
+                                  "install/test_score",
+                                  self._addr_array[0],
+                                  ZERO_SCORE_ADDRESS,
+                                  deploy_params={'value': hex(1)})
+        block1, tx_results = self._make_and_req_block([tx])
+        self.assertEqual(int(True), tx_results[0].status)
+        score_address = tx_results[0].score_address
+
+        # The SCORE deployed in the uncommitted parent block is callable
+        tx = self._make_score_call_tx(self._addr_array[0], score_address, "set_value", {"value": hex(2)},
+                                      pre_validation_enabled=False)
+        block2, tx_results = self._invoke_on(block1, [tx])
+        self.assertEqual(int(True), tx_results[0].status)
+
+        self.icon_service_engine.commit(block2)
+
+        query_request = {
+            "version": self._version,
+            "from": self._addr_array[0],
+            "to": score_address,
+            "dataType": "call",
+            "data": {
+                "method": "get_value",
+                "params": {}
+            }
+        }
+        self.assertEqual(2, self._query(query_request))
+
+
+if __name__ == '__main__':
+    unittest.main()
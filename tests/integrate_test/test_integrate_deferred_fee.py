@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase about the fees credited to the fee treasury at the end of a block since REVISION_5
+"""
+
+import unittest
+from typing import TYPE_CHECKING
+
+from iconservice.base.address import GOVERNANCE_SCORE_ADDRESS
+from iconservice.icon_constant import ConfigKey, REVISION_4, REVISION_5
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+if TYPE_CHECKING:
+    from iconservice.base.address import Address
+
+
+class TestIntegrateDeferredFee(TestIntegrateBase):
+
+    def _make_init_config(self) -> dict:
+        return {ConfigKey.SERVICE: {ConfigKey.SERVICE_FEE: True}}
+
+    def setUp(self):
+        super().setUp()
+
+        tx_list = [self._make_icx_send_tx(self._genesis, self._admin, 1000 * self._icx_factor),
+                   self._make_icx_send_tx(self._genesis, self._fee_treasury, self._icx_factor)]
+        self._make_and_commit_block(tx_list)
+
+        tx = self._make_deploy_tx("test_builtin", "0_0_4/governance", self._admin, GOVERNANCE_SCORE_ADDRESS)
+        self._make_and_commit_block([tx])
+
+    def _make_and_commit_block(self, tx_list: list) -> list:
+        block, tx_results = self._make_and_req_block(tx_list)
+        self._write_precommit_state(block)
+        return tx_results
+
+    def _set_revision(self, revision: int) -> None:
+        tx = self._make_score_call_tx(self._admin, GOVERNANCE_SCORE_ADDRESS, 'setRevision',
+                                      {"code": hex(revision), "name": f"1.1.{revision}"})
+        tx_results = self._make_and_commit_block([tx])
+        self.assertEqual(1, tx_results[0].status)
+
+    def _get_balance(self, address: 'Address') -> int:
+        return self._query({"address": address}, 'icx_getBalance')
+
+    def _spend_fees_of_block(self) -> int:
+        """Invokes a block where the fee treasury spends its balance including the fee of the first transaction
+
+        :return: the status of the transaction from the fee treasury
+        """
+        value = self._icx_factor
+        tx = self._make_icx_send_tx(self._genesis, self._addr_array[0], value, step_limit=10 ** 6)
+        tx_results = self._make_and_commit_block([tx])
+        step_used = tx_results[0].step_used
+
+        balance = self._get_balance(self._fee_treasury)
+        tx_list = [
+            self._make_icx_send_tx(self._genesis, self._addr_array[0], value, step_limit=10 ** 6),
+            # It is affordable only if the fee of the first transaction is credited already
+            self._make_icx_send_tx(self._fee_treasury, self._addr_array[1], balance,
+                                   disable_pre_validate=True, step_limit=step_used)
+        ]
+        tx_results = self._make_and_commit_block(tx_list)
+        self.assertEqual(step_used, tx_results[0].step_used)
+        return tx_results[1].status
+
+    def test_fees_credited_per_transaction(self):
+        self._set_revision(REVISION_4)
+        self.assertEqual(1, self._spend_fees_of_block())
+
+    def test_fees_credited_at_the_end_of_block(self):
+        self._set_revision(REVISION_5)
+        self.assertEqual(0, self._spend_fees_of_block())
+
+        treasury_balance = self._get_balance(self._fee_treasury)
+        genesis_balance = self._get_balance(self._genesis)
+        value = self._icx_factor
+        tx_list = [self._make_icx_send_tx(self._genesis, self._addr_array[i], value, step_limit=10 ** 6)
+                   for i in range(3)]
+        tx_results = self._make_and_commit_block(tx_list)
+
+        fee = sum(tx_result.step_used * tx_result.step_price for tx_result in tx_results)
+        self.assertTrue(fee > 0)
+        self.assertEqual(treasury_balance + fee, self._get_balance(self._fee_treasury))
+        self.assertEqual(genesis_balance - 3 * value - fee, self._get_balance(self._genesis))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase for the fast path of plain icx transfers
+"""
+
+import unittest
+from unittest.mock import patch
+
+from iconservice.icon_constant import ConfigKey
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+
+class TestIntegrateIcxTransfer(TestIntegrateBase):
+
+    def _make_init_config(self) -> dict:
+        return {ConfigKey.SERVICE: {ConfigKey.SERVICE_FEE: True}}
+
+    def _invoke_and_compare_fast_path(self, tx_list: list) -> list:
+        """Invokes a block with and without the fast path and checks that the results are the same
+
+        :param tx_list: transactions in a block
+        :return: transaction results
+        """
+        engine = self.icon_service_engine
+        with patch.object(engine, '_invoke_icx_transfer', wraps=engine._invoke_icx_transfer) as fast_path:
+            tx_results = self._invoke_and_compare(tx_list, patch.object(engine, '_is_icx_transfer', return_value=False))
+            self.assertEqual(len(tx_list), fast_path.call_count)
+
+        return tx_results
+
+    def test_fast_path(self):
+        value = 1 * self._icx_factor
+        tx_list = [
+            self._make_icx_send_tx(self._genesis, self._addr_array[0], value),
+            self._make_icx_send_tx(self._genesis, self._addr_array[1], value, support_v2=True),
+            # Out of balance
+            self._make_icx_send_tx(self._addr_array[2], self._addr_array[3], value, disable_pre_validate=True),
+            # Out of step
+            self._make_icx_send_tx(self._genesis, self._addr_array[3], value, disable_pre_validate=True, step_limit=0),
+            # To itself
+            self._make_icx_send_tx(self._genesis, self._genesis, value)
+        ]
+        tx_results = self._invoke_and_compare_fast_path(tx_list)
+        self.assertEqual([1, 1, 0, 0, 1], [tx_result.status for tx_result in tx_results])
+
+        tx_list = [self._make_icx_send_tx(self._addr_array[i], self._addr_array[i + 5], value // 2, step_limit=10 ** 6)
+                   for i in range(2)]
+        tx_results = self._invoke_and_compare_fast_path(tx_list)
+        self.assertEqual([1, 1], [tx_result.status for tx_result in tx_results])
+        self.assertEqual(value // 2, self._query({"address": self._addr_array[5]}, 'icx_getBalance'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase about the transactions in a block converted lazily
+"""
+
+import unittest
+from copy import deepcopy
+from unittest.mock import patch
+
+from iconservice.base.exception import InvalidParamsException
+from iconservice.base.type_converter import TypeConverter
+from iconservice.base.type_converter_templates import ParamType
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+
+class TestIntegrateLazyParams(TestIntegrateBase):
+
+    @staticmethod
+    def _make_lazy_tx_list(tx_list: list, invalid_index: int = None) -> list:
+        """Returns the transactions converted back to strings and then converted lazily
+
+        :param tx_list: transactions converted
+        :param invalid_index: the index of the transaction to have an invalid value
+        """
+        raw_tx_list: list = TypeConverter.convert_type_reverse(deepcopy(tx_list))
+        if invalid_index is not None:
+            raw_tx_list[invalid_index]['params']['value'] = 1
+
+        request = {'transactions': raw_tx_list}
+        return TypeConverter.convert(request, ParamType.INVOKE, lazy=True)['transactions']
+
+    def test_invoke(self):
+        value = self._icx_factor
+        tx_list = [self._make_icx_send_tx(self._genesis, self._addr_array[i], value) for i in range(3)]
+
+        engine = self.icon_service_engine
+        block = self._create_invalid_block()
+        tx_results, state_root_hash = engine.invoke(block, self._make_lazy_tx_list(tx_list))
+        self._remove_precommit_state(block)
+
+        # The same as the one of the transactions converted at once
+        expected_tx_results, expected_state_root_hash = engine.invoke(block, tx_list)
+        self.assertEqual(expected_state_root_hash, state_root_hash)
+        self.assertEqual([tx_result.to_dict() for tx_result in expected_tx_results],
+                         [tx_result.to_dict() for tx_result in tx_results])
+        self.assertEqual([1, 1, 1], [tx_result.status for tx_result in tx_results])
+
+        self._write_precommit_state(block)
+        for i in range(3):
+            self.assertEqual(value, self._query({"address": self._addr_array[i]}, 'icx_getBalance'))
+
+    def test_invalid_tx_fails_block_on_execution(self):
+        value = self._icx_factor
+        tx_list = [self._make_icx_send_tx(self._genesis, self._addr_array[i], value) for i in range(3)]
+        # The params of the second transaction are checked only when it is executed
+        lazy_tx_list = self._make_lazy_tx_list(tx_list, 1)
+
+        engine = self.icon_service_engine
+        block = self._create_invalid_block()
+        with patch.object(engine, '_invoke_request', wraps=engine._invoke_request) as invoke_request:
+            with self.assertRaises(InvalidParamsException):
+                engine.invoke(block, lazy_tx_list)
+
+        # The first transaction has been executed but no state of the block is kept
+        self.assertEqual(2, invoke_request.call_count)
+        self.assertIsNone(engine._precommit_data_manager.get(block.hash))
+        self.assertEqual(0, self._query({"address": self._addr_array[0]}, 'icx_getBalance'))
+
+        # The block with the valid transactions is invoked on the same states
+        tx_results, _ = engine.invoke(block, self._make_lazy_tx_list(tx_list))
+        self.assertEqual([1, 1, 1], [tx_result.status for tx_result in tx_results])
+        self._write_precommit_state(block)
+        self.assertEqual(value, self._query({"address": self._addr_array[0]}, 'icx_getBalance'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase about the transactions executed in the transaction pool before their block arrives
+"""
+
+import unittest
+from unittest.mock import patch
+
+from iconservice.icon_constant import ConfigKey
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+
+class TestIntegratePreExecution(TestIntegrateBase):
+
+    def _make_init_config(self) -> dict:
+        return {ConfigKey.PRE_EXECUTION: True}
+
+    def setUp(self):
+        super().setUp()
+        self.pre_executor = self.icon_service_engine._pre_executor
+
+        tx_list = [self._make_icx_send_tx(self._genesis, self._addr_array[i], 10 * self._icx_factor)
+                   for i in range(4)]
+        self._commit(tx_list)
+
+    def tearDown(self):
+        self.icon_service_engine._pre_executor = self.pre_executor
+        super().tearDown()
+
+    def _commit(self, tx_list: list) -> list:
+        self._wait_for_pre_executions()
+        block, tx_results = self._make_and_req_block(tx_list)
+        self._write_precommit_state(block)
+        return tx_results
+
+    def _wait_for_pre_executions(self) -> None:
+        self.pre_executor._executor.submit(lambda: None).result()
+
+    def _invoke_with_pre_executions(self, tx_list: list) -> dict:
+        """Invokes a block with the pre-executions and checks that the results are the same as the ones without them
+
+        :param tx_list: transactions in a block
+        :return: the changes of the pre-execution metrics
+        """
+        self._wait_for_pre_executions()
+        before = self.pre_executor.metrics
+        self._invoke_and_compare(tx_list, patch.object(self.icon_service_engine, '_pre_executor', None))
+        after = self.pre_executor.metrics
+
+        return {key: after[key] - before[key] for key in ('reused', 'discarded')}
+
+    def test_reuse(self):
+        value = self._icx_factor
+        tx_list = [
+            self._make_icx_send_tx(self._addr_array[0], self._addr_array[4], value),
+            self._make_icx_send_tx(self._addr_array[1], self._addr_array[5], value),
+            # The sender is written by the first transaction
+            self._make_icx_send_tx(self._addr_array[0], self._addr_array[6], value),
+        ]
+        metrics = self._invoke_with_pre_executions(tx_list)
+        self.assertEqual({'reused': 2, 'discarded': 1}, metrics)
+        self.assertEqual(8 * value, self._query({"address": self._addr_array[0]}, 'icx_getBalance'))
+
+    def test_written_by_committed_block(self):
+        value = self._icx_factor
+        tx = self._make_icx_send_tx(self._addr_array[2], self._addr_array[7], value)
+        self._commit([self._make_icx_send_tx(self._addr_array[3], self._addr_array[2], value)])
+
+        metrics = self._invoke_with_pre_executions([tx])
+        self.assertEqual({'reused': 0, 'discarded': 1}, metrics)
+        self.assertEqual(10 * value, self._query({"address": self._addr_array[2]}, 'icx_getBalance'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase with one state db per SCORE
+"""
+
+import os
+import unittest
+
+from iconservice.base.address import ZERO_SCORE_ADDRESS, GOVERNANCE_SCORE_ADDRESS
+from iconservice.icon_constant import ConfigKey
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+
+class TestIntegrateStateDbSharding(TestIntegrateBase):
+
+    def _make_init_config(self) -> dict:
+        return {ConfigKey.STATE_DB_SHARDING: True}
+
+    def _query_value(self, score_address):
+        query_request = {
+            "version": self._version,
+            "from": self._addr_array[0],
+            "to": score_address,
+            "dataType": "call",
+            "data": {
+                "method": "get_value",
+                "params": {}
+            }
+        }
+        return self._query(query_request)
+
+    def test_score_db(self):
+        value1 = 1 * self._icx_factor
+        tx1 = self._make_deploy_tx("test_deploy_scores",
+                                   "install/test_score",
+                                   self._addr_array[0],
+                                   ZERO_SCORE_ADDRESS,
+                                   deploy_params={'value': hex(value1)})
+        tx2 = self._make_icx_send_tx(self._genesis, self._addr_array[1], value1)
+
+        prev_block, tx_results = self._make_and_req_block([tx1, tx2])
+        self._write_precommit_state(prev_block)
+        self.assertEqual(int(True), tx_results[0].status)
+        self.assertEqual(int(True), tx_results[1].status)
+        score_address = tx_results[0].score_address
+
+        # Each SCORE has its own db
+        for address in (score_address, GOVERNANCE_SCORE_ADDRESS):
+            self.assertTrue(os.path.isdir(os.path.join(self._state_db_root_path, address.body.hex())))
+
+        value2 = 2 * self._icx_factor
+        tx = self._make_score_call_tx(self._addr_array[0], score_address, "set_value", {"value": hex(value2)})
+        prev_block, tx_results = self._make_and_req_block([tx])
+        self._write_precommit_state(prev_block)
+        self.assertEqual(int(True), tx_results[0].status)
+
+        self.assertEqual(value2, self._query_value(score_address))
+        self.assertEqual(value1, self._query({"address": self._addr_array[1]}, 'icx_getBalance'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase about the state trie enabled since REVISION_4
+"""
+
+import unittest
+
+from iconservice.base.address import GOVERNANCE_SCORE_ADDRESS
+from iconservice.base.block import Block
+from iconservice.database.trie import StateTrie, EMPTY_TRIE_ROOT
+from iconservice.icon_constant import REVISION_4, ConfigKey
+from iconservice.icx.icx_storage import IcxStorage
+from iconservice.icx.icx_account import Account
+from tests import create_block_hash
+from tests.integrate_test import create_timestamp
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+
+class TestIntegrateStateTrie(TestIntegrateBase):
+
+    def _make_and_commit_block(self, tx_list: list) -> tuple:
+        prev_block, tx_results = self._make_and_req_block(tx_list)
+        precommit_data = self.icon_service_engine._precommit_data_manager.get(prev_block.hash)
+        state_root_hash = precommit_data.state_root_hash
+        self._write_precommit_state(prev_block)
+
+        for tx_result in tx_results:
+            self.assertEqual(int(True), tx_result.status)
+        return state_root_hash, tx_results
+
+    def _enable_state_trie(self) -> bytes:
+        tx = self._make_deploy_tx("test_builtin",
+                                  "0_0_4/governance",
+                                  self._admin,
+                                  GOVERNANCE_SCORE_ADDRESS)
+        self._make_and_commit_block([tx])
+
+        tx = self._make_score_call_tx(self._admin,
+                                      GOVERNANCE_SCORE_ADDRESS,
+                                      'setRevision',
+                                      {"code": hex(REVISION_4), "name": "1.1.1"})
+        state_root_hash, _ = self._make_and_commit_block([tx])
+        return state_root_hash
+
+    def _get_proof(self, address) -> dict:
+        return self._query({'address': address}, 'ise_getProof')
+
+    def test_state_trie(self):
+        state_trie = self.icon_service_engine._state_trie
+        self.assertIsNone(state_trie.get_committed_root())
+
+        # The trie is built with the whole states on the block where REVISION_4 is set
+        root = self._enable_state_trie()
+        self.assertEqual(root, state_trie.get_committed_root())
+
+        response = self._get_proof(self._genesis)
+        self.assertEqual(root, response['root'])
+        account = Account.from_bytes(StateTrie.verify_proof(root, self._genesis.to_bytes(), response['proof']))
+        self.assertEqual(response['value'], account.to_bytes())
+        genesis_balance = account.icx
+
+        # The trie is updated incrementally
+        value = 10 * self._icx_factor
+        tx = self._make_icx_send_tx(self._genesis, self._addr_array[0], value)
+        root, _ = self._make_and_commit_block([tx])
+        self.assertEqual(root, state_trie.get_committed_root())
+
+        response = self._get_proof(self._addr_array[0])
+        account = Account.from_bytes(StateTrie.verify_proof(root, self._addr_array[0].to_bytes(), response['proof']))
+        self.assertEqual(value, account.icx)
+
+        response = self._get_proof(self._genesis)
+        account = Account.from_bytes(StateTrie.verify_proof(root, self._genesis.to_bytes(), response['proof']))
+        self.assertEqual(genesis_balance - value, account.icx)
+
+        # Absent account
+        response = self._get_proof(self._addr_array[1])
+        self.assertIsNone(response['value'])
+        self.assertIsNone(StateTrie.verify_proof(root, self._addr_array[1].to_bytes(), response['proof']))
+
+    def test_chained_blocks(self):
+        self._enable_state_trie()
+        state_trie = self.icon_service_engine._state_trie
+        value = 10 * self._icx_factor
+
+        tx = self._make_icx_send_tx(self._genesis, self._addr_array[0], value)
+        block1, _ = self._make_and_req_block([tx])
+
+        # The trie of block2 is built on the uncommitted trie of block1
+        tx = self._make_icx_send_tx(self._genesis, self._addr_array[1], value)
+        block2 = Block(block1.height + 1, create_block_hash(), create_timestamp(), block1.hash)
+        _, root = self.icon_service_engine.invoke(block2, [tx])
+
+        self.icon_service_engine.commit(block2)
+        self.assertEqual(root, state_trie.get_committed_root())
+
+        for address in self._addr_array[:2]:
+            response = self._get_proof(address)
+            account = Account.from_bytes(StateTrie.verify_proof(root, address.to_bytes(), response['proof']))
+            self.assertEqual(value, account.icx)
+
+
+class TestIntegrateStateTrieMigration(TestIntegrateStateTrie):
+    """The state trie is built on open and kept before REVISION_4
+    """
+
+    def _make_init_config(self) -> dict:
+        return {ConfigKey.STATE_TRIE_MIGRATION: True, ConfigKey.STATE_TRIE_RETENTION: 1}
+
+    def test_state_trie(self):
+        state_trie = self.icon_service_engine._state_trie
+        self.assertIsNotNone(state_trie.get_committed_root())
+
+        # The state root hash is not the trie root before REVISION_4
+        value = 10 * self._icx_factor
+        tx = self._make_icx_send_tx(self._genesis, self._addr_array[0], value)
+        state_root_hash, _ = self._make_and_commit_block([tx])
+        self.assertNotEqual(state_root_hash, state_trie.get_committed_root())
+
+        root = self._enable_state_trie()
+        self.assertEqual(root, state_trie.get_committed_root())
+
+        # The trie kept by the blocks is the same as the one built with the whole states
+        states = {key: value for key, value in self.icon_service_engine._icx_context_db.key_value_db.iterator()
+                  if key != IcxStorage.LAST_BLOCK_KEY}
+        expected_root, _ = StateTrie(self.icon_service_engine._icx_context_db, 0).update(EMPTY_TRIE_ROOT, states)
+        self.assertEqual(expected_root, root)
+
+        response = self._get_proof(self._addr_array[0])
+        account = Account.from_bytes(StateTrie.verify_proof(root, self._addr_array[0].to_bytes(), response['proof']))
+        self.assertEqual(value, account.icx)
+
+
+if __name__ == '__main__':
+    unittest.main()
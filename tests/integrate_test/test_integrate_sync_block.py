@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase about the confirmed blocks synced in memory and written to the state db at once
+"""
+
+import unittest
+from unittest.mock import patch
+
+from iconservice.base.block import Block
+from iconservice.database.factory import ContextDatabaseFactory
+from iconservice.icon_constant import ConfigKey
+from iconservice.icon_service_engine import IconServiceEngine
+from tests import create_block_hash
+from tests.integrate_test import create_timestamp
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+
+class TestIntegrateSyncBlock(TestIntegrateBase):
+
+    def _make_init_config(self) -> dict:
+        return {ConfigKey.SYNC_FLUSH_BLOCKS: 3}
+
+    def _sync_block(self, tx_list: list) -> tuple:
+        block = Block(self._block_height, create_block_hash(), create_timestamp(), self._prev_block_hash)
+        tx_results, state_root_hash = self.icon_service_engine.sync_block(block, tx_list)
+        self._block_height += 1
+        self._prev_block_hash = block.hash
+        return block, tx_results, state_root_hash
+
+    def _get_balance(self, index: int) -> int:
+        return self._query({"address": self._addr_array[index]}, 'icx_getBalance')
+
+    def test_sync_block(self):
+        engine = self.icon_service_engine
+        last_block = engine._icx_storage.last_block
+        value = self._icx_factor
+
+        with patch.object(ContextDatabaseFactory, 'write_batch', wraps=ContextDatabaseFactory.write_batch) as write:
+            blocks = []
+            for i in range(2):
+                tx = self._make_icx_send_tx(self._genesis, self._addr_array[i], value)
+                block, tx_results, _ = self._sync_block([tx])
+                self.assertEqual(1, tx_results[0].status)
+                blocks.append(block)
+
+            # Nothing is written until syncFlushBlocks blocks are synced
+            write.assert_not_called()
+            self.assertEqual(last_block.hash, engine._icx_storage.last_block.hash)
+            self.assertEqual(0, self._get_balance(0))
+            # The blocks are kept as one precommit data
+            chain: list = engine._precommit_data_manager.get_chain(blocks[-1].hash)
+            self.assertEqual([(blocks[0].hash, blocks[-1].hash)],
+                             [(data.first_block.hash, data.block.hash) for data in chain])
+
+            block, _, _ = self._sync_block([self._make_icx_send_tx(self._genesis, self._addr_array[2], value)])
+            self.assertEqual(1, write.call_count)
+
+        self.assertEqual(block.hash, engine._icx_storage.last_block.hash)
+        self.assertTrue(engine._precommit_data_manager.empty())
+        self.assertEqual([value] * 3, [self._get_balance(i) for i in range(3)])
+
+    def test_same_as_invoke(self):
+        value = self._icx_factor
+        tx_list = [self._make_icx_send_tx(self._genesis, self._addr_array[i], value) for i in range(2)]
+        block, tx_results, state_root_hash = self._sync_block(tx_list)
+
+        self._block_height -= 1
+        self._prev_block_hash = block.prev_hash
+        self._remove_precommit_state(block)
+        engine = self.icon_service_engine
+        expected_tx_results, expected_state_root_hash = engine.invoke(block, tx_list)
+        self.assertEqual(expected_state_root_hash, state_root_hash)
+        self.assertEqual([tx_result.to_dict() for tx_result in expected_tx_results],
+                         [tx_result.to_dict() for tx_result in tx_results])
+        self._block_height += 1
+        self._prev_block_hash = block.hash
+
+        # A block invoked on top of the blocks synced commits them as well
+        self._sync_block([self._make_icx_send_tx(self._genesis, self._addr_array[2], value)])
+        next_block, _ = self._make_and_req_block([self._make_icx_send_tx(self._genesis, self._addr_array[3], value)])
+        self._write_precommit_state(next_block)
+
+        self.assertEqual(next_block.hash, engine._icx_storage.last_block.hash)
+        self.assertEqual([value] * 4, [self._get_balance(i) for i in range(4)])
+
+    def test_flush_on_close(self):
+        value = self._icx_factor
+        block, _, _ = self._sync_block([self._make_icx_send_tx(self._genesis, self._addr_array[0], value)])
+
+        conf = self.icon_service_engine._conf
+        self.icon_service_engine.close()
+        self.icon_service_engine = IconServiceEngine()
+        self.icon_service_engine.open(conf)
+
+        self.assertEqual(block.hash, self.icon_service_engine._icx_storage.last_block.hash)
+        self.assertEqual(value, self._get_balance(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
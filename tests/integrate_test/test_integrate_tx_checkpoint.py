@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase about the competing blocks resumed from the same leading transactions
+"""
+
+import unittest
+from unittest.mock import patch
+
+from iconservice.base.block import Block
+from iconservice.icon_constant import ConfigKey
+from tests import create_block_hash
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+
+class TestIntegrateTxCheckpoint(TestIntegrateBase):
+
+    def _make_init_config(self) -> dict:
+        return {ConfigKey.TX_CHECKPOINT: True}
+
+    def _make_message_tx(self, addr_to, value: int) -> dict:
+        tx = self._make_icx_send_tx(self._genesis, addr_to, value, disable_pre_validate=True)
+        tx['params']['dataType'] = 'message'
+        tx['params']['data'] = '0x01'
+        return tx
+
+    def _invoke_and_count(self, block: 'Block', tx_list: list) -> tuple:
+        """Invokes a block and counts the transactions executed in it
+
+        :return: (TransactionResult[], state root hash, the number of the transactions executed)
+        """
+        engine = self.icon_service_engine
+        with patch.object(engine, '_invoke_request', wraps=engine._invoke_request) as invoke_request:
+            tx_results, state_root_hash = engine.invoke(block, tx_list)
+        return tx_results, state_root_hash, invoke_request.call_count
+
+    def _assert_same_as_executed(self, block: 'Block', tx_list: list, tx_results: list, state_root_hash: bytes):
+        engine = self.icon_service_engine
+        self._remove_precommit_state(block)
+        engine._tx_checkpoint_enabled = False
+        expected_tx_results, expected_state_root_hash = engine.invoke(block, tx_list)
+        engine._tx_checkpoint_enabled = True
+
+        self.assertEqual(expected_state_root_hash, state_root_hash)
+        self.assertEqual([tx_result.to_dict() for tx_result in expected_tx_results],
+                         [tx_result.to_dict() for tx_result in tx_results])
+
+    def test_resume_from_common_prefix(self):
+        value = self._icx_factor
+        tx_list = [self._make_icx_send_tx(self._genesis, self._addr_array[i], value) for i in range(4)]
+
+        block = self._create_invalid_block()
+        _, _, count = self._invoke_and_count(block, tx_list[:3])
+        self.assertEqual(3, count)
+
+        # A competing block from another leader
+        other_tx_list = tx_list[:2] + tx_list[3:]
+        other_block = self._create_invalid_block()
+        tx_results, state_root_hash, count = self._invoke_and_count(other_block, other_tx_list)
+        self.assertEqual(1, count)
+        self.assertEqual([other_block.hash] * 3, [tx_result.block_hash for tx_result in tx_results])
+        self.assertEqual([0, 1, 2], [tx_result.tx_index for tx_result in tx_results])
+
+        # The checkpoints of the block resumed are kept as well
+        self.assertEqual(0, self._invoke_and_count(self._create_invalid_block(), other_tx_list)[2])
+
+        self._assert_same_as_executed(other_block, other_tx_list, tx_results, state_root_hash)
+        self._write_precommit_state(other_block)
+
+        self.assertEqual(value, self._query({"address": self._addr_array[3]}, 'icx_getBalance'))
+        self.assertEqual(0, self._query({"address": self._addr_array[2]}, 'icx_getBalance'))
+
+    def test_block_dependent_transaction(self):
+        value = self._icx_factor
+        tx_list = [self._make_icx_send_tx(self._genesis, self._addr_array[0], value),
+                   self._make_message_tx(self._addr_array[1], value),
+                   self._make_icx_send_tx(self._genesis, self._addr_array[2], value)]
+
+        block = self._create_invalid_block()
+        self._invoke_and_count(block, tx_list)
+
+        # The result of a transaction with data is reused only in a block with the same timestamp
+        other_block = Block(block.height, create_block_hash(), block.timestamp + 1, block.prev_hash)
+        self.assertEqual(1, self._invoke_and_count(other_block, tx_list[:2])[2])
+
+        same_time_block = Block(block.height, create_block_hash(), block.timestamp, block.prev_hash)
+        tx_results, state_root_hash, count = self._invoke_and_count(same_time_block, tx_list)
+        self.assertEqual(0, count)
+
+        self._assert_same_as_executed(same_time_block, tx_list, tx_results, state_root_hash)
+        self._write_precommit_state(same_time_block)
+        self.assertEqual(value, self._query({"address": self._addr_array[1]}, 'icx_getBalance'))
+
+
+if __name__ == '__main__':
+    unittest.main()
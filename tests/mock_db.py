@@ -56,8 +56,16 @@ class MockPlyvelDB(object):
     def get_sub_db(self, key: bytes):
         return MockPlyvelDB(self.make_db())
 
-    def iterator(self) -> iter:
-        return iter(self._db)
+    def iterator(self, start: bytes=None, stop: bytes=None, *args, **kwargs) -> 'MockIterator':
+        items = []
+        for key in sorted(self._db):
+            if start is not None and key < start:
+                continue
+            if stop is not None and key >= stop:
+                continue
+            items.append((key, self._db[key]))
+
+        return MockIterator(items)
 
     def prefixed_db(self, bytes_prefix) -> 'MockPlyvelDB':
         return MockPlyvelDB(MockPlyvelDB.make_db())
@@ -65,6 +73,45 @@ class MockPlyvelDB(object):
     def write_batch(self, *args, **kwargs) -> 'MockWriteBatch':
         return MockWriteBatch(self)
 
+    def snapshot(self) -> 'MockSnapshot':
+        return MockSnapshot(self._db)
+
+
+class MockIterator(object):
+    """ Iterator(DB db, bool reverse, start, stop) """
+    def __init__(self, items: list):
+        self._it = iter(items)
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._it)
+
+
+class MockSnapshot(object):
+    """ Snapshot(DB db) """
+    def __init__(self, db: dict):
+        self._db = dict(db)
+
+    def get(self, bytes_key: bytes, default=None, *args, **kwargs) -> Optional[bytes]:
+        return self._db.get(bytes_key, default)
+
+    def iterator(self, start: bytes=None, stop: bytes=None, *args, **kwargs) -> 'MockIterator':
+        return MockPlyvelDB(self._db).iterator(start=start, stop=stop)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
 
 class MockWriteBatch(object):
     """ WriteBatch(DB db, bytes prefix, bool transaction, sync) """
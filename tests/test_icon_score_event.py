@@ -39,7 +39,7 @@ class TestEventlog(unittest.TestCase):
     def setUp(self):
         address = Address.from_data(AddressPrefix.CONTRACT, os.urandom(20))
         db = Mock(spec=IconScoreDatabase)
-        db.attach_mock(address, 'address')
+        db.address = address
         context = IconScoreContext()
         traces = Mock(spec=list)
         step_counter = Mock(spec=IconScoreStepCounter)
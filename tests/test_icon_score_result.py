@@ -24,7 +24,7 @@ from iconservice.base.block import Block
 from iconservice.base.exception import IconServiceBaseException
 from iconservice.base.transaction import Transaction
 from iconservice.base.type_converter import TypeConverter
-from iconservice.database.batch import TransactionBatch
+from iconservice.database.batch import BlockBatch, TransactionBatch
 from iconservice.database.db import IconScoreDatabase
 from iconservice.deploy.icon_score_deploy_engine import IconScoreDeployEngine
 from iconservice.iconscore.icon_pre_validator import IconPreValidator
@@ -70,6 +70,7 @@ class TestTransactionResult(unittest.TestCase):
         self._mock_context.step_counter = step_counter_factory.create(5000000)
         self._mock_context.current_address = Mock(spec=Address)
         self._mock_context.revision = 0
+        self._mock_context.block_batch = BlockBatch()
 
     def tearDown(self):
         ContextContainer._clear_context()
@@ -216,6 +217,13 @@ class TestTransactionResult(unittest.TestCase):
         self.assertTrue(converted_result['logsBloom'].startswith('0x'))
         self.assertTrue(converted_result['status'].startswith('0x'))
 
+        # to_response() gives the same result in one pass
+        del tx_result.block
+        tx_result.block_height = tx_result.cumulative_step_used = 123
+        tx_result.block_hash = hashlib.sha3_256(b'block').digest()
+        converted_result = TypeConverter.convert_type_reverse(tx_result.to_dict(to_camel_case))
+        self.assertEqual(converted_result, tx_result.to_response())
+
     def test_request(self):
         inner_task = generate_inner_task()
 
@@ -30,6 +30,7 @@ from iconservice.iconscore.icon_score_context import ContextContainer
 from iconservice.iconscore.icon_score_engine import IconScoreEngine
 from iconservice.iconscore.icon_score_step import \
     StepType, IconScoreStepCounter, IconScoreStepCounterFactory
+from iconservice.icx.icx_storage import IcxStorage
 from tests import create_tx_hash, create_address
 from tests.mock_generator import generate_inner_task, create_request, ReqData, clear_inner_task
 
@@ -291,8 +292,12 @@ class TestIconScoreStepCounter(unittest.TestCase):
             },
         }
 
+        # The last block is read along with the states on the query context
+        def get(context, key: bytes) -> Optional[bytes]:
+            return None if key == IcxStorage.LAST_BLOCK_KEY else b'1' * 100
+
         self._inner_task._icon_service_engine. \
-            _icx_context_db.get = Mock(return_value=b'1' * 100)
+            _icx_context_db.get = Mock(side_effect=get)
 
         # noinspection PyUnusedLocal
         def intercept_query(*args, **kwargs):
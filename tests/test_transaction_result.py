@@ -21,7 +21,9 @@ from iconservice.base.exception import ExceptionCode
 from iconservice.base.address import AddressPrefix
 from iconservice.base.block import Block
 from iconservice.base.transaction import Transaction
+from iconservice.base.type_converter import TypeConverter
 from iconservice.iconscore.icon_score_result import TransactionResult
+from iconservice.utils import to_camel_case
 from tests import create_block_hash, create_tx_hash, create_address
 
 
@@ -74,3 +76,16 @@ class TestTransactionResult(unittest.TestCase):
         print(d)
         print(hex(tx_result.failure.code))
 
+    def test_to_response(self):
+        tx_result = self.tx_result
+        tx_result.step_used = 1234
+        tx_result.step_price = 10 ** 10
+        tx_result.cumulative_step_used = 5678
+
+        for status in (TransactionResult.FAILURE, TransactionResult.SUCCESS):
+            tx_result.status = status
+            expected = TypeConverter.convert_type_reverse(tx_result.to_dict(to_camel_case))
+            self.assertEqual(expected, tx_result.to_response())
+
+        self.assertNotIn('failure', tx_result.to_response())
+